@@ -1,4 +1,5 @@
 from pydantic_settings import BaseSettings
+from typing import Dict
 
 class Settings(BaseSettings):
     ENVIRONMENT: str = "development"
@@ -14,6 +15,7 @@ class Settings(BaseSettings):
     
     MAX_FILE_SIZE: int = 10485760
     UPLOAD_DIR: str = "uploads"
+    UPLOAD_CHUNK_SIZE: int = 1048576
     
     RESEND_API_KEY: str = ""
     RESEND_FROM_EMAIL: str = "noreply@church.org"
@@ -23,6 +25,44 @@ class Settings(BaseSettings):
     ICECAST_SOURCE_PASSWORD: str = "churchsource123"
     ICECAST_ADMIN_USER: str = "admin"
     ICECAST_ADMIN_PASSWORD: str = "churchadmin123"
+    ICECAST_STATUS_TTL: float = 2
+    ICECAST_POLL_INTERVAL: float = 5
+    ICECAST_HISTORY_SIZE: int = 720
+    
+    WS_SEND_QUEUE_SIZE: int = 100
+    WS_SLOW_CONSUMER_POLICY: str = "coalesce"
+    WS_JSON_ENCODER: str = "json"
+    WS_BACKPLANE: str = "memory"
+    WS_STATS_MIN_INTERVAL: float = 1
+    WS_STATS_FIELD_INTERVALS: Dict[str, float] = {"listeners": 5}
+    WS_STATS_RESYNC_INTERVAL: float = 30
+    
+    CHAT_FLUSH_INTERVAL: float = 0.5
+    CHAT_FLUSH_BATCH_SIZE: int = 200
+    CHAT_BUFFER_LIMIT: int = 5000
+    CHAT_HISTORY_SIZE: int = 200
+    
+    PRESENCE_FLUSH_INTERVAL: float = 15
+    
+    DASHBOARD_CACHE_TTL: float = 60
+    
+    COUNTER_FLUSH_INTERVAL: float = 5
+    COUNTER_FLUSH_BATCH_SIZE: int = 500
+    
+    SERMON_SUGGEST_TIMEOUT_MS: int = 250
+    
+    COUNT_CACHE_TTL: float = 300
+    COUNT_EXACT_THRESHOLD: int = 1000
+    
+    EXPORT_BATCH_SIZE: int = 1000
+    PDF_WORKERS: int = 2
+    EXPORT_DIR: str = "exports"
+    EXPORT_WORKERS: int = 2
+    EXPORT_POLL_INTERVAL: float = 5
+    EXPORT_PROGRESS_INTERVAL: float = 1
+    EXPORT_CACHE_TTL: float = 300
+    EXPORT_RESULT_TTL: float = 3600
+    EXPORT_JOB_TIMEOUT: float = 3600
     
     class Config:
         env_file = ".env"
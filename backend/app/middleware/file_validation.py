@@ -1,57 +1,77 @@
 from fastapi import UploadFile, HTTPException
+from typing import List, Optional, Tuple
 from app.core.constants import HTTPStatus, MAX_FILE_SIZE
 
-ALLOWED_IMAGE_TYPES = ["image/jpeg", "image/png", "image/jpg", "image/webp"]
+ALLOWED_IMAGE_TYPES = ["image/jpeg", "image/png", "image/jpg", "image/webp", "image/gif"]
 ALLOWED_AUDIO_TYPES = ["audio/mpeg", "audio/mp3", "audio/wav"]
 ALLOWED_VIDEO_TYPES = ["video/mp4", "video/mpeg", "video/quicktime"]
 
+# Each signature is the extension the file is stored with and the (offset, bytes) pairs
+# that must all match the start of the file
+Signature = Tuple[str, List[Tuple[int, bytes]]]
+
+IMAGE_SIGNATURES: List[Signature] = [
+    (".jpg", [(0, b"\xff\xd8\xff")]),
+    (".png", [(0, b"\x89PNG\r\n\x1a\n")]),
+    (".webp", [(0, b"RIFF"), (8, b"WEBP")]),
+    (".gif", [(0, b"GIF87a")]), (".gif", [(0, b"GIF89a")])
+]
+AUDIO_SIGNATURES: List[Signature] = [
+    (".mp3", [(0, b"ID3")]),
+    (".mp3", [(0, b"\xff\xfb")]), (".mp3", [(0, b"\xff\xf3")]), (".mp3", [(0, b"\xff\xf2")]), (".mp3", [(0, b"\xff\xfa")]),
+    (".wav", [(0, b"RIFF"), (8, b"WAVE")])
+]
+VIDEO_SIGNATURES: List[Signature] = [
+    (".mp4", [(4, b"ftyp")]), (".mov", [(4, b"moov")]), (".mov", [(4, b"mdat")]), (".mov", [(4, b"wide")]), (".mov", [(4, b"free")]),
+    (".mpg", [(0, b"\x00\x00\x01\xba")]), (".mpg", [(0, b"\x00\x00\x01\xb3")])
+]
+
+def _bad_request(message: str):
+    return HTTPException(status_code=HTTPStatus.BAD_REQUEST, detail={"error": message})
+
+class FileRule:
+    """What an upload of one kind may be; applied by storage_service while the file is streamed.
+
+    ``check_declared`` runs before anything is written, ``check_head`` on the first chunk
+    (returning the extension to store the file with), and ``max_size`` against the running
+    byte count. Without ``types`` and ``signatures`` only the size is checked.
+    """
+
+    def __init__(self, kind: str, types: Optional[List[str]] = None, signatures: Optional[List[Signature]] = None, max_size: int = MAX_FILE_SIZE):
+        self.kind = kind
+        self.types = types
+        self.signatures = signatures
+        self.max_size = max_size
+
+    def check_declared(self, file: UploadFile):
+        if self.types and file.content_type not in self.types:
+            raise _bad_request(f"Invalid {self.kind} type. Allowed: {', '.join(self.types)}")
+        if file.size is not None and file.size > self.max_size:
+            raise _bad_request(f"File size exceeds {self.max_size} bytes")
+
+    def check_head(self, head: bytes) -> Optional[str]:
+        if not self.signatures:
+            return None
+        for extension, signature in self.signatures:
+            if all(head[offset:offset + len(magic)] == magic for offset, magic in signature):
+                return extension
+        raise _bad_request(f"File content is not a valid {self.kind}")
+
+IMAGE_RULE = FileRule("image", ALLOWED_IMAGE_TYPES, IMAGE_SIGNATURES, MAX_FILE_SIZE)
+AUDIO_RULE = FileRule("audio", ALLOWED_AUDIO_TYPES, AUDIO_SIGNATURES, MAX_FILE_SIZE * 10)
+VIDEO_RULE = FileRule("video", ALLOWED_VIDEO_TYPES, VIDEO_SIGNATURES, MAX_FILE_SIZE * 50)
+
+# Sermon audio arrives in more formats than AUDIO_RULE knows, so only its size is checked
+AUDIO_UPLOAD_RULE = FileRule("audio", max_size=MAX_FILE_SIZE * 10)
+
 async def validate_image_file(file: UploadFile) -> UploadFile:
-    if file.content_type not in ALLOWED_IMAGE_TYPES:
-        raise HTTPException(
-            status_code=HTTPStatus.BAD_REQUEST,
-            detail={"error": f"Invalid image type. Allowed: {', '.join(ALLOWED_IMAGE_TYPES)}"}
-        )
-    
-    content = await file.read()
-    if len(content) > MAX_FILE_SIZE:
-        raise HTTPException(
-            status_code=HTTPStatus.BAD_REQUEST,
-            detail={"error": f"File size exceeds {MAX_FILE_SIZE} bytes"}
-        )
-    
-    await file.seek(0)
+    IMAGE_RULE.check_declared(file)
     return file
 
 async def validate_audio_file(file: UploadFile) -> UploadFile:
-    if file.content_type not in ALLOWED_AUDIO_TYPES:
-        raise HTTPException(
-            status_code=HTTPStatus.BAD_REQUEST,
-            detail={"error": f"Invalid audio type. Allowed: {', '.join(ALLOWED_AUDIO_TYPES)}"}
-        )
-    
-    content = await file.read()
-    if len(content) > MAX_FILE_SIZE * 10:
-        raise HTTPException(
-            status_code=HTTPStatus.BAD_REQUEST,
-            detail={"error": f"File size exceeds {MAX_FILE_SIZE * 10} bytes"}
-        )
-    
-    await file.seek(0)
+    AUDIO_RULE.check_declared(file)
     return file
 
 async def validate_video_file(file: UploadFile) -> UploadFile:
-    if file.content_type not in ALLOWED_VIDEO_TYPES:
-        raise HTTPException(
-            status_code=HTTPStatus.BAD_REQUEST,
-            detail={"error": f"Invalid video type. Allowed: {', '.join(ALLOWED_VIDEO_TYPES)}"}
-        )
-    
-    content = await file.read()
-    if len(content) > MAX_FILE_SIZE * 50:
-        raise HTTPException(
-            status_code=HTTPStatus.BAD_REQUEST,
-            detail={"error": f"File size exceeds {MAX_FILE_SIZE * 50} bytes"}
-        )
-    
-    await file.seek(0)
+    VIDEO_RULE.check_declared(file)
     return file
@@ -15,3 +15,5 @@ from app.models.audit import AuditLog, TokenBlacklist
 from app.models.permission import Permission, RolePermission
 from app.models.service_time import ServiceTime
 from app.models.stream import StreamViewer, SermonDownload, ModerationLog
+from app.models.rollup import GivingDaily, GivingMemberTotal, AttendanceDaily, AttendanceMember, SermonDaily
+from app.models.export_job import ExportJob
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Date, Text, ForeignKey, TIMESTAMP, Boolean, CheckConstraint
+from sqlalchemy import Column, String, Date, Text, ForeignKey, TIMESTAMP, Boolean, Integer, CheckConstraint
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -18,6 +18,7 @@ class Announcement(Base):
     created_by = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="SET NULL"))
     send_email = Column(Boolean, default=False)
     send_sms = Column(Boolean, default=False)
+    views = Column(Integer, default=0)
     created_at = Column(TIMESTAMP, default=datetime.utcnow)
     updated_at = Column(TIMESTAMP, default=datetime.utcnow, onupdate=datetime.utcnow)
     
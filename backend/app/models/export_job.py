@@ -0,0 +1,28 @@
+from sqlalchemy import Column, String, Text, Integer, ForeignKey, TIMESTAMP, CheckConstraint
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from datetime import datetime
+import uuid
+from app.core.database import Base
+
+class ExportJob(Base):
+    __tablename__ = "export_jobs"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    kind = Column(String(50), nullable=False)
+    format = Column(String(10), nullable=False)
+    params = Column(JSONB, nullable=False, default=dict)
+    status = Column(String(20), nullable=False, default="queued", index=True)
+    progress = Column(Integer, nullable=False, default=0)
+    total = Column(Integer)
+    filename = Column(String(255))
+    file_path = Column(Text)
+    error = Column(Text)
+    created_by = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="SET NULL"), index=True)
+    created_at = Column(TIMESTAMP, default=datetime.utcnow, index=True)
+    started_at = Column(TIMESTAMP)
+    finished_at = Column(TIMESTAMP)
+    expires_at = Column(TIMESTAMP)
+    
+    __table_args__ = (
+        CheckConstraint("status IN ('queued', 'running', 'done', 'failed', 'expired')", name='export_jobs_status_check'),
+    )
@@ -0,0 +1,46 @@
+from sqlalchemy import Column, String, Date, Integer, Numeric, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID
+from app.core.database import Base
+
+# Reporting rollups, kept current by app.services.rollup_service on every write
+# and rebuilt from the source tables by migrations/002_rollup_tables.py.
+
+class GivingDaily(Base):
+    __tablename__ = "giving_daily"
+
+    day = Column(Date, primary_key=True)
+    type = Column(String(50), primary_key=True)
+    total = Column(Numeric(14, 2), nullable=False, default=0)
+    gifts = Column(Integer, nullable=False, default=0)
+
+class GivingMemberTotal(Base):
+    __tablename__ = "giving_member_totals"
+
+    member_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    type = Column(String(50), primary_key=True)
+    total = Column(Numeric(14, 2), nullable=False, default=0)
+    gifts = Column(Integer, nullable=False, default=0)
+    last_given = Column(Date)
+
+class AttendanceDaily(Base):
+    __tablename__ = "attendance_daily"
+
+    day = Column(Date, primary_key=True)
+    service_type = Column(String(100), primary_key=True)
+    attendees = Column(Integer, nullable=False, default=0)
+
+class AttendanceMember(Base):
+    __tablename__ = "attendance_members"
+
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    first_day = Column(Date, nullable=False, index=True)
+    last_day = Column(Date, nullable=False, index=True)
+    services = Column(Integer, nullable=False, default=0)
+
+class SermonDaily(Base):
+    __tablename__ = "sermon_daily"
+
+    day = Column(Date, primary_key=True)
+    sermon_id = Column(UUID(as_uuid=True), ForeignKey("sermons.id", ondelete="CASCADE"), primary_key=True)
+    plays = Column(Integer, nullable=False, default=0)
+    downloads = Column(Integer, nullable=False, default=0)
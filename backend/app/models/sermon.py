@@ -1,5 +1,6 @@
-from sqlalchemy import Column, String, Date, Text, Integer, ForeignKey, TIMESTAMP, ARRAY
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, String, Date, Text, Integer, ForeignKey, TIMESTAMP, Computed, Index, DDL, event
+from sqlalchemy.dialects.postgresql import UUID, TSVECTOR, ARRAY
+from sqlalchemy.orm import deferred
 from datetime import datetime
 import uuid
 from app.core.database import Base
@@ -13,6 +14,14 @@ class SermonSeries(Base):
     sermon_count = Column(Integer, default=0)
     created_at = Column(TIMESTAMP, default=datetime.utcnow)
 
+# Weighted full-text document: title ranks above speaker, speaker above description.
+# Tags are an array and cannot go in a generated column, so they have their own GIN index.
+SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(speaker, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'C')"
+)
+
 class Sermon(Base):
     __tablename__ = "sermons"
     
@@ -31,3 +40,13 @@ class Sermon(Base):
     tags = Column(ARRAY(String))
     created_at = Column(TIMESTAMP, default=datetime.utcnow)
     updated_at = Column(TIMESTAMP, default=datetime.utcnow, onupdate=datetime.utcnow)
+    search_vector = deferred(Column(TSVECTOR, Computed(SEARCH_VECTOR_SQL, persisted=True)))
+    
+    __table_args__ = (
+        Index("ix_sermons_search_vector", "search_vector", postgresql_using="gin"),
+        Index("ix_sermons_speaker_trgm", "speaker", postgresql_using="gin", postgresql_ops={"speaker": "gin_trgm_ops"}),
+        Index("ix_sermons_tags", "tags", postgresql_using="gin"),
+    )
+
+# The trigram index needs pg_trgm before the table is created
+event.listen(Sermon.__table__, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
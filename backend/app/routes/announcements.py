@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
 from app.core.database import get_db
 from app.core.deps import get_current_user
 from app.schemas.announcement import AnnouncementCreate, AnnouncementUpdate, AnnouncementResponse
@@ -9,8 +10,8 @@ from app.models.user import User
 router = APIRouter(prefix="/announcements", tags=["Announcements"])
 
 @router.get("")
-async def get_announcements(page: int = 1, limit: int = 10, db: AsyncSession = Depends(get_db)):
-    return await announcement_service.get_announcements(db, page, limit)
+async def get_announcements(page: int = 1, limit: int = 10, cursor: Optional[str] = None, include_total: bool = False, db: AsyncSession = Depends(get_db)):
+    return await announcement_service.get_announcements(db, page, limit, cursor=cursor, include_total=include_total)
 
 @router.get("/{announcement_id}", response_model=AnnouncementResponse)
 async def get_announcement(announcement_id: str, db: AsyncSession = Depends(get_db)):
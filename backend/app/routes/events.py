@@ -14,9 +14,11 @@ async def get_events(
     page: int = 1,
     limit: int = 10,
     upcoming: Optional[bool] = None,
+    cursor: Optional[str] = None,
+    include_total: bool = False,
     db: AsyncSession = Depends(get_db)
 ):
-    return await event_service.get_events(db, page, limit, upcoming)
+    return await event_service.get_events(db, page, limit, upcoming, cursor, include_total)
 
 @router.get("/member/{member_id}")
 async def get_member_events(member_id: str, db: AsyncSession = Depends(get_db)):
@@ -0,0 +1,16 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import get_db
+from app.core.deps import get_current_user
+from app.services.export_service import export_runner, job_to_dict
+from app.models.user import User
+
+router = APIRouter(prefix="/exports", tags=["Exports"])
+
+@router.get("/{job_id}")
+async def get_export_job(job_id: str, db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)):
+    return job_to_dict(await export_runner.get_job(db, job_id, current_user))
+
+@router.get("/{job_id}/download")
+async def download_export(job_id: str, db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)):
+    return await export_runner.download(db, job_id, current_user)
@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List, Dict
+from typing import List, Dict, Optional
 from app.core.database import get_db
 from app.core.deps import get_current_user
 from app.schemas.form import FormCreate, FormUpdate, FormResponse, FormResponseCreate
@@ -10,8 +10,8 @@ from app.models.user import User
 router = APIRouter(prefix="/forms", tags=["Forms"])
 
 @router.get("")
-async def get_forms(page: int = 1, limit: int = 10, db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)):
-    return await form_service.get_forms(db, page, limit)
+async def get_forms(page: int = 1, limit: int = 10, cursor: Optional[str] = None, include_total: bool = False, db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)):
+    return await form_service.get_forms(db, page, limit, cursor=cursor, include_total=include_total)
 
 @router.get("/{form_id}", response_model=FormResponse)
 async def get_form(form_id: str, db: AsyncSession = Depends(get_db)):
@@ -36,8 +36,8 @@ async def delete_forms(ids: List[str], db: AsyncSession = Depends(get_db), curre
     return {"message": "Forms deleted"}
 
 @router.post("/export")
-async def export_forms(db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)):
-    return await form_service.export_forms(db)
+async def export_forms(background: bool = False, db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)):
+    return await form_service.export_forms(db, background, current_user.get("userId"))
 
 @router.post("/{form_id}/responses", status_code=201)
 async def submit_form_response(form_id: str, data: FormResponseCreate, db: AsyncSession = Depends(get_db)):
@@ -48,5 +48,5 @@ async def get_form_responses(form_id: str, page: int = 1, limit: int = 10, db: A
     return await form_service.get_form_responses(db, form_id, page, limit)
 
 @router.get("/{form_id}/responses/export")
-async def export_form_responses(form_id: str, db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)):
-    return await form_service.export_form_responses(db, form_id)
+async def export_form_responses(form_id: str, background: bool = False, db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)):
+    return await form_service.export_form_responses(db, form_id, background, current_user.get("userId"))
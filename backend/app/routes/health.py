@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 from app.core.database import get_db
+from app.websocket.manager import manager
 
 router = APIRouter(prefix="/health", tags=["Health"])
 
@@ -12,3 +13,7 @@ async def health_check(db: AsyncSession = Depends(get_db)):
         return {"status": "healthy", "database": "connected"}
     except Exception as e:
         return {"status": "unhealthy", "database": "disconnected", "error": str(e)}
+
+@router.get("/websocket")
+async def websocket_health():
+    return manager.get_metrics()
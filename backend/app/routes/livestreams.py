@@ -1,11 +1,12 @@
-from fastapi import APIRouter, Depends, Request
+from fastapi import APIRouter, Depends, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.database import get_db
 from app.core.deps import get_current_user
 from app.schemas.livestream import LivestreamCreate, LivestreamUpdate, LivestreamResponse
-from typing import Dict
+from typing import Dict, Optional
 from app.services import livestream_service
 from app.services.icecast_service import icecast_service
+from app.websocket.icecast_monitor import icecast_monitor
 from app.models.user import User
 
 router = APIRouter(prefix="/livestreams", tags=["Livestreams"])
@@ -32,8 +33,11 @@ async def get_stream_history(db: AsyncSession = Depends(get_db), current_user: d
     return await livestream_service.get_stream_history(db)
 
 @router.get("/{livestream_id}/chat")
-async def get_chat_messages(livestream_id: str, limit: int = 50, db: AsyncSession = Depends(get_db)):
-    return await livestream_service.get_chat_messages(db, livestream_id, limit)
+async def get_chat_messages(livestream_id: str, response: Response, limit: int = 50, before: Optional[str] = None, db: AsyncSession = Depends(get_db)):
+    messages, next_cursor = await livestream_service.get_chat_messages(db, livestream_id, limit, before)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return messages
 
 @router.delete("/{livestream_id}/chat/{message_id}")
 async def delete_chat_message(livestream_id: str, message_id: str, db: AsyncSession = Depends(get_db), current_user: dict = Depends(get_current_user)):
@@ -82,14 +86,19 @@ async def get_source_url(livestream_id: str, db: AsyncSession = Depends(get_db),
 
 @router.get("/icecast/status")
 async def check_icecast_status(current_user: dict = Depends(get_current_user)):
-    is_connected = await icecast_service.check_connection()
-    source_connected = await icecast_service.is_source_connected()
+    status = await icecast_monitor.current()
     return {
-        "connected": is_connected,
-        "source_connected": source_connected,
+        "connected": status.reachable,
+        "source_connected": status.source_connected,
+        "listeners": status.listeners,
+        "checked_at": status.at.isoformat(),
         "stream_url": icecast_service.get_stream_url()
     }
 
+@router.get("/icecast/history")
+async def get_icecast_history(limit: Optional[int] = None, current_user: dict = Depends(get_current_user)):
+    return icecast_monitor.history(limit)
+
 @router.get("/icecast/butt-config")
 async def get_butt_config(current_user: dict = Depends(get_current_user)):
     return icecast_service.get_butt_config()
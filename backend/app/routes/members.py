@@ -10,8 +10,8 @@ from app.models.user import User
 router = APIRouter(prefix="/members", tags=["Members"])
 
 @router.get("/export")
-async def export_members(format: str = 'csv', db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)):
-    return await member_service.export_members(db, format)
+async def export_members(format: str = 'csv', background: bool = False, db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)):
+    return await member_service.export_members(db, format, background, current_user.get("userId"))
 
 @router.get("")
 async def get_members(
@@ -19,10 +19,12 @@ async def get_members(
     limit: int = 10,
     search: Optional[str] = None,
     role: Optional[str] = None,
+    cursor: Optional[str] = None,
+    include_total: bool = False,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    return await member_service.get_members(db, page, limit, search, role)
+    return await member_service.get_members(db, page, limit, search, role, cursor, include_total)
 
 
 
@@ -10,8 +10,8 @@ from app.models.user import User
 router = APIRouter(prefix="/prayers", tags=["Prayers"])
 
 @router.get("")
-async def get_prayer_requests(status: Optional[str] = None, page: int = 1, limit: int = 10, db: AsyncSession = Depends(get_db)):
-    return await prayer_service.get_prayer_requests(db, page, limit, status)
+async def get_prayer_requests(status: Optional[str] = None, page: int = 1, limit: int = 10, cursor: Optional[str] = None, include_total: bool = False, db: AsyncSession = Depends(get_db)):
+    return await prayer_service.get_prayer_requests(db, page, limit, status, cursor=cursor, include_total=include_total)
 
 @router.get("/member/{member_id}")
 async def get_member_prayer_requests(member_id: str, db: AsyncSession = Depends(get_db)):
@@ -33,7 +33,8 @@ async def change_password(user_id: str, data: PasswordChange, db: AsyncSession =
 @router.post("/{user_id}/photo")
 async def upload_profile_photo(user_id: str, photo: UploadFile = File(...), db: AsyncSession = Depends(get_db), current_user: dict = Depends(get_current_user)):
     from app.services.storage_service import save_file
-    photo_url = await save_file(photo, "profiles")
+    from app.middleware.file_validation import IMAGE_RULE
+    photo_url = await save_file(photo, "profiles", IMAGE_RULE)
     await auth_service.update_user(db, user_id, UserUpdate(profile_photo=photo_url))
     return {"photo_url": photo_url}
 
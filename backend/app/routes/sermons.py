@@ -1,6 +1,6 @@
-from fastapi import APIRouter, Depends, UploadFile, File, Form
+from fastapi import APIRouter, Depends, UploadFile, File, Form, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Optional
+from typing import Optional, List
 from app.core.database import get_db
 from app.core.deps import get_current_user
 from app.schemas.sermon import SermonCreate, SermonUpdate, SermonResponse
@@ -15,9 +15,17 @@ async def get_sermons(
     limit: int = 10,
     search: Optional[str] = None,
     series_id: Optional[str] = None,
+    speaker: Optional[str] = None,
+    tags: Optional[List[str]] = Query(None),
+    cursor: Optional[str] = None,
+    include_total: bool = False,
     db: AsyncSession = Depends(get_db)
 ):
-    return await sermon_service.get_sermons(db, page, limit, search, series_id)
+    return await sermon_service.get_sermons(db, page, limit, search, series_id, speaker, tags, cursor, include_total)
+
+@router.get("/suggest")
+async def suggest_sermons(q: str, limit: int = 8, db: AsyncSession = Depends(get_db)):
+    return await sermon_service.suggest_sermons(db, q, min(max(limit, 1), 20))
 
 @router.post("", response_model=SermonResponse, status_code=201)
 async def create_sermon(
@@ -57,6 +65,10 @@ async def increment_plays(sermon_id: str, db: AsyncSession = Depends(get_db)):
     await sermon_service.increment_plays(db, sermon_id)
     return {"message": "Play count incremented"}
 
+@router.get("/{sermon_id}/engagement")
+async def get_sermon_engagement(sermon_id: str, days: int = 30, db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)):
+    return await sermon_service.get_sermon_engagement(db, sermon_id, min(max(days, 1), 366))
+
 @router.post("/{sermon_id}/download")
 async def increment_downloads(sermon_id: str, db: AsyncSession = Depends(get_db)):
     await sermon_service.increment_downloads(db, sermon_id)
@@ -24,10 +24,12 @@ async def get_users(
     search: Optional[str] = None,
     role: Optional[str] = None,
     status: Optional[str] = None,
+    cursor: Optional[str] = None,
+    include_total: bool = False,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_admin_user)
 ):
-    return await auth_service.get_users(db, page, limit, search, role, status)
+    return await auth_service.get_users(db, page, limit, search, role, status, cursor, include_total)
 
 @router.get("/{user_id}", response_model=UserResponse)
 async def get_user(user_id: str, db: AsyncSession = Depends(get_db), current_user: User = Depends(get_admin_user)):
@@ -1,16 +1,12 @@
-from fastapi import APIRouter, WebSocket, Depends
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import APIRouter, WebSocket
 from app.websocket.handlers import handle_websocket
-from app.core.database import AsyncSessionLocal
 
 router = APIRouter()
 
 @router.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
-    async with AsyncSessionLocal() as db:
-        await handle_websocket(websocket, db)
+    await handle_websocket(websocket)
 
 @router.websocket("/")
 async def websocket_root(websocket: WebSocket):
-    async with AsyncSessionLocal() as db:
-        await handle_websocket(websocket, db)
+    await handle_websocket(websocket)
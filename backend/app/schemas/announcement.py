@@ -30,6 +30,7 @@ class AnnouncementResponse(BaseModel):
     expiry_date: Optional[date]
     status: str
     created_by: Optional[UUID]
+    views: Optional[int] = 0
     created_at: datetime
     
     class Config:
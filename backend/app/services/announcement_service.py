@@ -1,39 +1,35 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select
 from app.models.announcement import Announcement
 from app.schemas.announcement import AnnouncementCreate, AnnouncementUpdate
-from app.utils.pagination import format_pagination_response
+from app.utils.pagination import paginate
 from app.core.exceptions import NotFoundException
+from app.services.dashboard_service import invalidate_dashboard
+from app.services.counter_service import counters
 
-async def get_announcements(db: AsyncSession, page: int, limit: int, status: str = None):
-    offset = (page - 1) * limit
+async def get_announcements(db: AsyncSession, page: int, limit: int, status: str = None, cursor: str = None, include_total: bool = False):
     query = select(Announcement)
     
     if status:
         query = query.where(Announcement.status == status)
     
-    query = query.order_by(Announcement.publish_date.desc()).offset(offset).limit(limit)
-    result = await db.execute(query)
-    announcements = result.scalars().all()
-    
-    count_query = select(func.count(Announcement.id))
-    if status:
-        count_query = count_query.where(Announcement.status == status)
-    total = await db.scalar(count_query)
-    
-    return format_pagination_response(announcements, total, page, limit)
+    result = await paginate(db, query, [Announcement.publish_date, Announcement.id], page, limit, cursor, include_total)
+    counters.overlay(result["data"], Announcement.views)
+    return result
 
 async def get_announcement(db: AsyncSession, announcement_id: str):
     result = await db.execute(select(Announcement).where(Announcement.id == announcement_id))
     announcement = result.scalar_one_or_none()
     if not announcement:
         raise NotFoundException("Announcement not found")
+    counters.overlay([announcement], Announcement.views)
     return announcement
 
 async def create_announcement(db: AsyncSession, data: AnnouncementCreate, created_by: str):
     announcement = Announcement(**data.model_dump(), created_by=created_by)
     db.add(announcement)
     await db.commit()
+    await invalidate_dashboard()
     await db.refresh(announcement)
     return announcement
 
@@ -42,6 +38,7 @@ async def update_announcement(db: AsyncSession, announcement_id: str, data: Anno
     for key, value in data.model_dump(exclude_unset=True).items():
         setattr(announcement, key, value)
     await db.commit()
+    await invalidate_dashboard()
     await db.refresh(announcement)
     return announcement
 
@@ -49,3 +46,7 @@ async def delete_announcement(db: AsyncSession, announcement_id: str):
     announcement = await get_announcement(db, announcement_id)
     await db.delete(announcement)
     await db.commit()
+    await invalidate_dashboard()
+
+async def increment_views(db: AsyncSession, announcement_id: str):
+    await counters.add_existing(db, Announcement.views, announcement_id)
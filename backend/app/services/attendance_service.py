@@ -2,22 +2,46 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
 from datetime import datetime, timedelta
 from app.models.attendance import Attendance
+from app.models.rollup import AttendanceDaily, AttendanceMember
 from app.schemas.attendance import AttendanceCreate
+from app.services.dashboard_service import invalidate_dashboard
+from app.services import rollup_service
 
 async def create_attendance(db: AsyncSession, data: AttendanceCreate):
     attendance = Attendance(**data.model_dump())
     db.add(attendance)
+    await db.flush()
+    await rollup_service.record_attendance(db, attendance)
     await db.commit()
+    await invalidate_dashboard()
     await db.refresh(attendance)
     return attendance
 
 async def get_attendance_stats(db: AsyncSession, start_date: datetime = None, end_date: datetime = None):
-    query = select(func.count(func.distinct(Attendance.user_id))).where(Attendance.present == True)
+    # Distinct attendees: open-ended ranges are exact from each member's first/last attendance;
+    # a bounded range falls back to the date index on attendance, so it costs the range, not the history
+    if start_date and end_date:
+        query = select(func.count(func.distinct(Attendance.user_id))).where(
+            Attendance.present == True,
+            Attendance.date >= start_date.date(),
+            Attendance.date <= end_date.date()
+        )
+    else:
+        query = select(func.count()).select_from(AttendanceMember)
+        if start_date:
+            query = query.where(AttendanceMember.last_day >= start_date.date())
+        if end_date:
+            query = query.where(AttendanceMember.first_day <= end_date.date())
+    total = await db.scalar(query) or 0
     
+    by_service = select(AttendanceDaily.service_type, func.sum(AttendanceDaily.attendees)).group_by(AttendanceDaily.service_type)
     if start_date:
-        query = query.where(Attendance.date >= start_date.date())
+        by_service = by_service.where(AttendanceDaily.day >= start_date.date())
     if end_date:
-        query = query.where(Attendance.date <= end_date.date())
+        by_service = by_service.where(AttendanceDaily.day <= end_date.date())
+    result = await db.execute(by_service)
     
-    total = await db.scalar(query) or 0
-    return {"total_attendance": total}
+    return {
+        "total_attendance": total,
+        "by_service_type": {service_type: int(count or 0) for service_type, count in result.all()}
+    }
@@ -6,6 +6,8 @@ from app.utils.auth import hash_password, verify_password, create_access_token,
 from app.utils.auth import decode_token
 from jose import JWTError
 from app.core.exceptions import UnauthorizedException, ConflictException
+from app.services.dashboard_service import invalidate_dashboard
+from app.utils.counts import invalidate_counts
 
 async def register_user(db: AsyncSession, name: str, email: str, password: str, phone: str = None):
     """Register a new user"""
@@ -23,6 +25,8 @@ async def register_user(db: AsyncSession, name: str, email: str, password: str,
     )
     db.add(user)
     await db.commit()
+    await invalidate_dashboard()
+    await invalidate_counts("users")
     await db.refresh(user)
     
     access_token = create_access_token(str(user.id), user.email, user.role)
@@ -68,9 +72,9 @@ async def get_login_history(db: AsyncSession, user_id: str):
     )
     return result.scalars().all()
 
-async def get_users(db: AsyncSession, page: int, limit: int, search: str = None, role: str = None, status: str = None):
-    from app.utils.pagination import parse_pagination_params, format_pagination_response
-    offset = (page - 1) * limit
+async def get_users(db: AsyncSession, page: int, limit: int, search: str = None, role: str = None, status: str = None, cursor: str = None, include_total: bool = False):
+    from app.utils.pagination import paginate
+    from app.utils.counts import ESTIMATED, CACHED
     query = select(User)
     if search:
         query = query.where(User.name.ilike(f"%{search}%") | User.email.ilike(f"%{search}%"))
@@ -78,12 +82,10 @@ async def get_users(db: AsyncSession, page: int, limit: int, search: str = None,
         query = query.where(User.role == role)
     if status:
         query = query.where(User.status == status)
-    result = await db.execute(query.offset(offset).limit(limit))
-    users = result.scalars().all()
-    from sqlalchemy import func
-    count_result = await db.execute(select(func.count()).select_from(User))
-    total = count_result.scalar()
-    return format_pagination_response(users, total, page, limit)
+    return await paginate(
+        db, query, [User.created_at, User.id], page, limit, cursor, include_total,
+        count=ESTIMATED if search else CACHED
+    )
 
 async def get_user(db: AsyncSession, user_id: str):
     from app.core.exceptions import NotFoundException
@@ -108,6 +110,8 @@ async def create_user(db: AsyncSession, data):
     )
     db.add(user)
     await db.commit()
+    await invalidate_dashboard()
+    await invalidate_counts("users")
     await db.refresh(user)
     return user
 
@@ -116,13 +120,19 @@ async def update_user(db: AsyncSession, user_id: str, data):
     for key, value in data.model_dump(exclude_unset=True).items():
         setattr(user, key, value)
     await db.commit()
+    await invalidate_dashboard()
+    await invalidate_counts("users")
     await db.refresh(user)
     return user
 
 async def delete_user(db: AsyncSession, user_id: str):
     from sqlalchemy import delete as sql_delete
+    from app.services import rollup_service
+    await rollup_service.forget_member(db, user_id)
     await db.execute(sql_delete(User).where(User.id == user_id))
     await db.commit()
+    await invalidate_dashboard()
+    await invalidate_counts("users")
 
 async def reset_password(db: AsyncSession, user_id: str):
     user = await get_user(db, user_id)
@@ -148,10 +158,13 @@ async def update_notification_preferences(db: AsyncSession, user_id: str, prefer
     await db.commit()
 
 async def get_user_stats(db: AsyncSession):
-    from sqlalchemy import func
-    total = await db.execute(select(func.count()).select_from(User))
-    active = await db.execute(select(func.count()).select_from(User).where(User.status == "active"))
-    return {"total": total.scalar(), "active": active.scalar()}
+    from app.utils.aggregates import AggregateQuery
+    return await (
+        AggregateQuery()
+        .count("total", User.id)
+        .count("active", User.id, User.status == "active")
+        .execute(db)
+    )
 
 async def refresh_token(db: AsyncSession, refresh_token: str):
     try:
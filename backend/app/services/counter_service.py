@@ -0,0 +1,134 @@
+from sqlalchemy import select, update, values, column, literal, Integer, func
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Awaitable, Callable, Dict, List, Optional
+import asyncio
+import uuid
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.exceptions import NotFoundException
+
+FlushHook = Callable[[AsyncSession, Dict[uuid.UUID, int]], Awaitable[None]]
+
+class CounterBuffer:
+    """Write-behind buffer for hit counters such as sermon plays.
+
+    ``add`` only bumps an in-memory delta per (column, row id). Every ``flush_interval``
+    seconds the deltas are applied with ``UPDATE ... SET x = x + n`` over a VALUES list,
+    one statement per ``batch_size`` rows, so concurrent hits never overwrite each other.
+    ``overlay`` adds the unflushed deltas to rows being returned, and ``stop`` flushes
+    whatever is left on shutdown.
+    """
+
+    def __init__(self):
+        self.columns: Dict[str, object] = {}
+        self.hooks: Dict[str, List[FlushHook]] = {}
+        self.pending: Dict[str, Dict[uuid.UUID, int]] = {}
+        self.flush_interval = settings.COUNTER_FLUSH_INTERVAL
+        self.batch_size = settings.COUNTER_FLUSH_BATCH_SIZE
+        self.lock = asyncio.Lock()
+        self.task: Optional[asyncio.Task] = None
+
+    def _key(self, counter) -> str:
+        key = f"{counter.class_.__tablename__}.{counter.key}"
+        self.columns.setdefault(key, counter)
+        return key
+
+    def on_flush(self, counter, hook: FlushHook):
+        """Run ``hook(db, deltas)`` in the same transaction as each batch written for ``counter``."""
+        self.hooks.setdefault(self._key(counter), []).append(hook)
+
+    def add(self, counter, row_id, amount: int = 1):
+        try:
+            row_id = uuid.UUID(str(row_id))
+        except ValueError:
+            raise NotFoundException(f"{counter.class_.__name__} not found")
+        deltas = self.pending.setdefault(self._key(counter), {})
+        deltas[row_id] = deltas.get(row_id, 0) + amount
+
+    async def add_existing(self, db: AsyncSession, counter, row_id, amount: int = 1):
+        """``add``, raising NotFoundException for ids with no row; ids with unflushed hits skip the lookup."""
+        model = counter.class_
+        try:
+            row_id = uuid.UUID(str(row_id))
+        except ValueError:
+            raise NotFoundException(f"{model.__name__} not found")
+        if not self.get_pending(counter, row_id):
+            if await db.scalar(select(literal(1)).where(model.id == row_id)) is None:
+                raise NotFoundException(f"{model.__name__} not found")
+        self.add(counter, row_id, amount)
+
+    def get_pending(self, counter, row_id) -> int:
+        return self.pending.get(self._key(counter), {}).get(row_id, 0)
+
+    def overlay(self, rows, *counters):
+        """Add unflushed deltas to loaded rows without marking them dirty in the session."""
+        for counter in counters:
+            deltas = self.pending.get(self._key(counter))
+            if not deltas:
+                continue
+            for row in rows:
+                delta = deltas.get(row.id)
+                if delta:
+                    set_committed_value(row, counter.key, (getattr(row, counter.key) or 0) + delta)
+        return rows
+
+    async def flush(self):
+        async with self.lock:
+            pending, self.pending = self.pending, {}
+            try:
+                while pending:
+                    key = next(iter(pending))
+                    deltas = pending[key]
+                    batch = dict(list(deltas.items())[:self.batch_size])
+                    await self._write(key, batch)
+                    for row_id in batch:
+                        del deltas[row_id]
+                    if not deltas:
+                        del pending[key]
+            finally:
+                # Put back anything that was not written, merged with hits that arrived meanwhile
+                for key, deltas in pending.items():
+                    current = self.pending.setdefault(key, {})
+                    for row_id, amount in deltas.items():
+                        current[row_id] = current.get(row_id, 0) + amount
+
+    async def _write(self, key: str, batch: Dict[uuid.UUID, int]):
+        counter = self.columns[key]
+        model = counter.class_
+        increments = values(
+            column("id", UUID(as_uuid=True)), column("amount", Integer), name="increments"
+        ).data(list(batch.items()))
+        async with AsyncSessionLocal() as db:
+            # Rows deleted since the hit simply match nothing
+            await db.execute(
+                update(model)
+                .where(model.id == increments.c.id)
+                .values({counter.key: func.coalesce(counter, 0) + increments.c.amount})
+            )
+            for hook in self.hooks.get(key, []):
+                await hook(db, batch)
+            await db.commit()
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"Counter flush error: {e}")
+
+    def start(self):
+        self.task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+        await self.flush()
+
+counters = CounterBuffer()
@@ -1,74 +1,78 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select, func, exists
 from datetime import datetime, timedelta
+from app.core.config import settings
 from app.models.user import User
 from app.models.sermon import Sermon
 from app.models.event import Event
 from app.models.announcement import Announcement
 from app.models.livestream import Livestream
 from app.models.attendance import Attendance
+from app.utils.aggregates import AggregateQuery
+from app.utils.cache import TTLCache
+from app.websocket.manager import manager
+
+dashboard_cache = TTLCache(settings.DASHBOARD_CACHE_TTL)
+
+async def invalidate_dashboard():
+    """Drop cached dashboard aggregates on this and every other worker; call after writes they depend on."""
+    dashboard_cache.invalidate()
+    await manager.publish_event("cache-invalidate", "dashboard", "")
+
+def on_remote_invalidate(op: str, target: str, message):
+    if op == "cache-invalidate" and target == "dashboard":
+        dashboard_cache.invalidate()
+
+manager.remote_listeners.append(on_remote_invalidate)
 
 async def get_dashboard_stats(db: AsyncSession):
-    # Total members
-    total_members = await db.scalar(
-        select(func.count(User.id)).where(User.role == "member", User.membership_status == "active")
-    )
-    
-    # New members this week
+    return await dashboard_cache.get_or_load("stats", lambda: load_dashboard_stats(db))
+
+async def load_dashboard_stats(db: AsyncSession):
     week_ago = datetime.utcnow() - timedelta(days=7)
-    new_members = await db.scalar(
-        select(func.count(User.id)).where(User.role == "member", User.date_joined >= week_ago.date())
-    )
-    
-    # Total sermons
-    total_sermons = await db.scalar(select(func.count(Sermon.id)))
+    today = datetime.utcnow().date()
     
-    # Sermon downloads
-    sermon_downloads = await db.scalar(select(func.sum(Sermon.downloads))) or 0
-    
-    # Upcoming events
-    upcoming_events = await db.scalar(
-        select(func.count(Event.id)).where(Event.date >= datetime.utcnow().date())
-    )
-    
-    # Active announcements
-    active_announcements = await db.scalar(
-        select(func.count(Announcement.id)).where(Announcement.status == "published")
-    )
-    
-    # Current livestream
-    livestream = await db.execute(
-        select(Livestream).where(Livestream.is_live == True).order_by(Livestream.created_at.desc()).limit(1)
+    row = await (
+        AggregateQuery()
+        .count("total_members", User.id, User.role == "member", User.membership_status == "active")
+        .count("new_members", User.id, User.role == "member", User.date_joined >= week_ago.date())
+        .count("total_sermons", Sermon.id)
+        .sum("sermon_downloads", Sermon.downloads)
+        .count("upcoming_events", Event.id, Event.date >= today)
+        .count("active_announcements", Announcement.id, Announcement.status == "published")
+        .count_distinct("weekly_attendance", Attendance.user_id, Attendance.date >= week_ago.date(), Attendance.present == True)
+        .scalar(
+            "live_viewers",
+            select(Livestream.viewers)
+            .where(Livestream.is_live == True)
+            .order_by(Livestream.created_at.desc())
+            .limit(1)
+        )
+        .scalar("is_live", exists().where(Livestream.is_live == True))
+        .execute(db)
     )
-    current_stream = livestream.scalar_one_or_none()
-    
-    # Weekly attendance
-    this_week_attendance = await db.scalar(
-        select(func.count(func.distinct(Attendance.user_id)))
-        .where(Attendance.date >= week_ago.date(), Attendance.present == True)
-    ) or 0
     
     return {
-        "totalMembers": total_members or 0,
-        "newMembersThisWeek": new_members or 0,
-        "weeklyAttendance": this_week_attendance,
-        "sermonDownloads": int(sermon_downloads),
-        "liveViewers": current_stream.viewers if current_stream else 0,
-        "isLive": current_stream.is_live if current_stream else False,
-        "totalSermons": total_sermons or 0,
-        "upcomingEvents": upcoming_events or 0,
-        "activeAnnouncements": active_announcements or 0
+        "totalMembers": row["total_members"] or 0,
+        "newMembersThisWeek": row["new_members"] or 0,
+        "weeklyAttendance": row["weekly_attendance"] or 0,
+        "sermonDownloads": int(row["sermon_downloads"] or 0),
+        "liveViewers": row["live_viewers"] or 0,
+        "isLive": bool(row["is_live"]),
+        "totalSermons": row["total_sermons"] or 0,
+        "upcomingEvents": row["upcoming_events"] or 0,
+        "activeAnnouncements": row["active_announcements"] or 0
     }
 
 async def get_recent_activity(db: AsyncSession):
     return []
 
 async def get_member_stats(db: AsyncSession, member_id: str):
-    from app.models.giving import Giving
+    from app.models.rollup import GivingMemberTotal
     from app.models.event import EventRegistration
     
     total_giving = await db.scalar(
-        select(func.sum(Giving.amount)).where(Giving.member_id == member_id)
+        select(func.sum(GivingMemberTotal.total)).where(GivingMemberTotal.member_id == member_id)
     ) or 0
     
     events_attended = await db.scalar(
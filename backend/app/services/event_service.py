@@ -1,27 +1,18 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select
 from app.models.event import Event, EventRegistration
 from app.schemas.event import EventCreate, EventUpdate
-from app.utils.pagination import format_pagination_response
+from app.utils.pagination import paginate
 from app.core.exceptions import NotFoundException, ConflictException
+from app.services.dashboard_service import invalidate_dashboard
 
-async def get_events(db: AsyncSession, page: int, limit: int, status: str = None):
-    offset = (page - 1) * limit
+async def get_events(db: AsyncSession, page: int, limit: int, status: str = None, cursor: str = None, include_total: bool = False):
     query = select(Event)
     
     if status:
         query = query.where(Event.status == status)
     
-    query = query.order_by(Event.date.desc()).offset(offset).limit(limit)
-    result = await db.execute(query)
-    events = result.scalars().all()
-    
-    count_query = select(func.count(Event.id))
-    if status:
-        count_query = count_query.where(Event.status == status)
-    total = await db.scalar(count_query)
-    
-    return format_pagination_response(events, total, page, limit)
+    return await paginate(db, query, [Event.date, Event.id], page, limit, cursor, include_total)
 
 async def get_event(db: AsyncSession, event_id: str):
     result = await db.execute(select(Event).where(Event.id == event_id))
@@ -34,6 +25,7 @@ async def create_event(db: AsyncSession, data: EventCreate):
     event = Event(**data.model_dump())
     db.add(event)
     await db.commit()
+    await invalidate_dashboard()
     await db.refresh(event)
     return event
 
@@ -42,6 +34,7 @@ async def update_event(db: AsyncSession, event_id: str, data: EventUpdate):
     for key, value in data.model_dump(exclude_unset=True).items():
         setattr(event, key, value)
     await db.commit()
+    await invalidate_dashboard()
     await db.refresh(event)
     return event
 
@@ -49,6 +42,7 @@ async def delete_event(db: AsyncSession, event_id: str):
     event = await get_event(db, event_id)
     await db.delete(event)
     await db.commit()
+    await invalidate_dashboard()
 
 async def register_for_event(db: AsyncSession, event_id: str, member_id: str):
     event = await get_event(db, event_id)
@@ -0,0 +1,232 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update, and_, or_, cast
+from sqlalchemy.dialects.postgresql import JSONB
+from fastapi.responses import StreamingResponse
+from typing import Awaitable, Callable, Dict, List, Optional
+from datetime import datetime, timedelta
+import asyncio
+import os
+import time
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.exceptions import NotFoundException, BadRequestException, ForbiddenException
+from app.models.export_job import ExportJob
+from app.utils.pdf_export import stream_file
+from app.websocket.manager import manager
+
+# handler(params, format, path, progress) writes the export to ``path`` and returns the download filename;
+# progress(done, total=None) reports rows written so far
+Progress = Callable[..., Awaitable[None]]
+ExportHandler = Callable[[dict, str, str, Progress], Awaitable[str]]
+
+MEDIA_TYPES = {"csv": "text/csv", "pdf": "application/pdf"}
+
+def job_to_dict(job: ExportJob) -> dict:
+    return {
+        "id": str(job.id),
+        "kind": job.kind,
+        "format": job.format,
+        "status": job.status,
+        "progress": job.progress,
+        "total": job.total,
+        "filename": job.filename,
+        "error": job.error,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "expires_at": job.expires_at.isoformat() if job.expires_at else None,
+        "download_url": f"/api/exports/{job.id}/download" if job.status == "done" else None
+    }
+
+class ExportRunner:
+    """Background exports backed by the export_jobs table.
+
+    ``submit`` records a queued job; each worker process runs up to ``EXPORT_WORKERS`` jobs at
+    a time, claiming them with ``FOR UPDATE SKIP LOCKED`` so any worker can pick up any job.
+    Progress is saved on the row and pushed to the job owner's notification socket. Result
+    files live in ``EXPORT_DIR`` until ``EXPORT_RESULT_TTL`` passes; an identical request
+    within ``EXPORT_CACHE_TTL`` of a finished job reuses its file.
+    """
+
+    def __init__(self):
+        self.handlers: Dict[str, ExportHandler] = {}
+        self.directory = settings.EXPORT_DIR
+        self.workers = settings.EXPORT_WORKERS
+        self.poll_interval = settings.EXPORT_POLL_INTERVAL
+        self.progress_interval = settings.EXPORT_PROGRESS_INTERVAL
+        self.wake: asyncio.Queue = asyncio.Queue()
+        self.tasks: List[asyncio.Task] = []
+
+    def register(self, kind: str, handler: ExportHandler):
+        self.handlers[kind] = handler
+
+    async def submit(self, db: AsyncSession, kind: str, format: str, params: dict, user_id: str = None) -> dict:
+        if kind not in self.handlers:
+            raise BadRequestException(f"Unknown export: {kind}")
+
+        now = datetime.utcnow()
+        result = await db.execute(
+            select(ExportJob)
+            .where(
+                ExportJob.kind == kind,
+                ExportJob.format == format,
+                ExportJob.params == cast(params, JSONB),
+                ExportJob.created_by == user_id,
+                or_(
+                    ExportJob.status.in_(["queued", "running"]),
+                    and_(ExportJob.status == "done", ExportJob.finished_at >= now - timedelta(seconds=settings.EXPORT_CACHE_TTL))
+                )
+            )
+            .order_by(ExportJob.created_at.desc())
+            .limit(1)
+        )
+        job = result.scalar_one_or_none()
+        if job is None:
+            job = ExportJob(kind=kind, format=format, params=params, created_by=user_id)
+            db.add(job)
+            await db.commit()
+            await db.refresh(job)
+            self.wake.put_nowait(None)
+        return job_to_dict(job)
+
+    async def get_job(self, db: AsyncSession, job_id: str, current_user: dict) -> ExportJob:
+        job = await db.get(ExportJob, job_id)
+        if not job:
+            raise NotFoundException("Export job not found")
+        if str(job.created_by) != str(current_user.get("userId")) and current_user.get("role") not in ["admin", "superadmin"]:
+            raise ForbiddenException("Not your export")
+        return job
+
+    async def download(self, db: AsyncSession, job_id: str, current_user: dict) -> StreamingResponse:
+        job = await self.get_job(db, job_id, current_user)
+        if job.status != "done" or not job.file_path or not os.path.exists(job.file_path):
+            raise BadRequestException(f"Export job is {job.status}")
+        return StreamingResponse(
+            stream_file(job.file_path), media_type=MEDIA_TYPES.get(job.format, "application/octet-stream"),
+            headers={'Content-Disposition': f'attachment; filename={job.filename}'}
+        )
+
+    async def _claim(self) -> Optional[ExportJob]:
+        next_job = (
+            select(ExportJob.id)
+            .where(ExportJob.status == "queued")
+            .order_by(ExportJob.created_at)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                update(ExportJob)
+                .where(ExportJob.id == next_job)
+                .values(status="running", started_at=datetime.utcnow())
+                .returning(ExportJob)
+                .execution_options(synchronize_session=False)
+            )
+            job = result.scalar_one_or_none()
+            await db.commit()
+            return job
+
+    async def _save(self, job: ExportJob, **values):
+        for key, value in values.items():
+            setattr(job, key, value)
+        async with AsyncSessionLocal() as db:
+            await db.execute(update(ExportJob).where(ExportJob.id == job.id).values(**values))
+            await db.commit()
+        if job.created_by:
+            await manager.send_notification(str(job.created_by), {"type": "export-progress", "job": job_to_dict(job)})
+
+    async def _run(self, job: ExportJob):
+        handler = self.handlers.get(job.kind)
+        path = os.path.join(self.directory, f"{job.id}.{job.format}")
+        last_sent = 0.0
+
+        async def progress(done: int, total: int = None):
+            nonlocal last_sent
+            job.progress = done
+            if total is not None:
+                job.total = total
+            if time.monotonic() - last_sent >= self.progress_interval:
+                last_sent = time.monotonic()
+                await self._save(job, progress=job.progress, total=job.total)
+
+        try:
+            if handler is None:
+                raise ValueError(f"No handler for {job.kind} exports")
+            filename = await handler(job.params or {}, job.format, path, progress)
+        except asyncio.CancelledError:
+            # Shutting down: hand the job back to the queue for the next worker
+            if os.path.exists(path):
+                os.unlink(path)
+            await self._save(job, status="queued", progress=0, started_at=None)
+            raise
+        except Exception as e:
+            print(f"Export {job.id} failed: {e}")
+            if os.path.exists(path):
+                os.unlink(path)
+            await self._save(job, status="failed", error=str(e), finished_at=datetime.utcnow())
+            return
+
+        now = datetime.utcnow()
+        await self._save(
+            job, status="done", progress=job.total or job.progress, filename=filename, file_path=path,
+            finished_at=now, expires_at=now + timedelta(seconds=settings.EXPORT_RESULT_TTL)
+        )
+
+    async def worker(self):
+        while True:
+            try:
+                job = await self._claim()
+            except Exception as e:
+                print(f"Export claim error: {e}")
+                job = None
+            if job is None:
+                try:
+                    await asyncio.wait_for(self.wake.get(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self._run(job)
+
+    async def expire(self):
+        """Delete expired result files, and fail jobs whose worker died while running them."""
+        now = datetime.utcnow()
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                update(ExportJob)
+                .where(ExportJob.status == "done", ExportJob.expires_at < now)
+                .values(status="expired", file_path=None)
+                .returning(ExportJob.id, ExportJob.format)
+                .execution_options(synchronize_session=False)
+            )
+            expired = result.all()
+            await db.execute(
+                update(ExportJob)
+                .where(ExportJob.status == "running", ExportJob.started_at < now - timedelta(seconds=settings.EXPORT_JOB_TIMEOUT))
+                .values(status="failed", error="Interrupted", finished_at=now)
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+        for job_id, format in expired:
+            path = os.path.join(self.directory, f"{job_id}.{format}")
+            if os.path.exists(path):
+                os.unlink(path)
+
+    async def expire_task(self):
+        while True:
+            try:
+                await self.expire()
+            except Exception as e:
+                print(f"Export expiry error: {e}")
+            await asyncio.sleep(60)
+
+    def start(self):
+        os.makedirs(self.directory, exist_ok=True)
+        self.tasks = [asyncio.create_task(self.worker()) for _ in range(self.workers)]
+        self.tasks.append(asyncio.create_task(self.expire_task()))
+
+    async def stop(self):
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+
+export_runner = ExportRunner()
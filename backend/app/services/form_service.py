@@ -2,26 +2,23 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
 from app.models.form import Form, FormResponse
 from app.schemas.form import FormCreate, FormUpdate
-from app.utils.pagination import format_pagination_response
+from app.utils.pagination import paginate
+from app.utils.csv_export import stream_csv, csv_response, write_chunks
+from app.core.database import AsyncSessionLocal
 from app.core.exceptions import NotFoundException
+from app.services.export_service import export_runner
+from typing import List, Tuple
+import json
 
-async def get_forms(db: AsyncSession, page: int, limit: int, status: str = None):
-    offset = (page - 1) * limit
+FORM_EXPORT_HEADERS = ['Title', 'Type', 'Status', 'Responses', 'Public', 'Deadline', 'Created At']
+
+async def get_forms(db: AsyncSession, page: int, limit: int, status: str = None, cursor: str = None, include_total: bool = False):
     query = select(Form)
     
     if status:
         query = query.where(Form.status == status)
     
-    query = query.order_by(Form.created_at.desc()).offset(offset).limit(limit)
-    result = await db.execute(query)
-    forms = result.scalars().all()
-    
-    count_query = select(func.count(Form.id))
-    if status:
-        count_query = count_query.where(Form.status == status)
-    total = await db.scalar(count_query)
-    
-    return format_pagination_response(forms, total, page, limit)
+    return await paginate(db, query, [Form.created_at, Form.id], page, limit, cursor, include_total)
 
 async def get_form(db: AsyncSession, form_id: str):
     result = await db.execute(select(Form).where(Form.id == form_id))
@@ -44,3 +41,64 @@ async def update_form(db: AsyncSession, form_id: str, data: FormUpdate):
     await db.commit()
     await db.refresh(form)
     return form
+
+def form_columns(fields) -> List[Tuple[str, str]]:
+    """(field id, label) for each field, whether ``fields`` is a list of field dicts or a dict keyed by id."""
+    if isinstance(fields, dict):
+        fields = fields.get('fields') or [{'label': key, **(value if isinstance(value, dict) else {}), 'id': key} for key, value in fields.items()]
+    return [(str(field.get('id')), field.get('label') or str(field.get('id'))) for field in fields if isinstance(field, dict)]
+
+def _cell(value):
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return value
+
+def form_export_query():
+    return select(
+        Form.title, Form.type, Form.status, Form.responses, Form.is_public, Form.deadline, Form.created_at
+    ).order_by(Form.created_at.desc())
+
+def form_responses_export(form: Form):
+    columns = form_columns(form.fields)
+    headers = ['Submitted At', 'Member ID'] + [label for _, label in columns]
+    query = (
+        select(FormResponse.submitted_at, FormResponse.member_id, FormResponse.responses)
+        .where(FormResponse.form_id == form.id)
+        .order_by(FormResponse.submitted_at)
+    )
+    
+    def transform(row) -> list:
+        submitted_at, member_id, responses = row
+        responses = responses or {}
+        return [submitted_at, member_id] + [_cell(responses.get(field_id)) for field_id, _ in columns]
+    
+    return query, headers, transform
+
+async def export_forms(db: AsyncSession, background: bool = False, user_id: str = None):
+    if background:
+        return await export_runner.submit(db, "forms", "csv", {}, user_id)
+    return csv_response(stream_csv(form_export_query(), FORM_EXPORT_HEADERS), 'forms.csv')
+
+async def export_form_responses(db: AsyncSession, form_id: str, background: bool = False, user_id: str = None):
+    form = await get_form(db, form_id)
+    if background:
+        return await export_runner.submit(db, "form-responses", "csv", {"form_id": str(form.id)}, user_id)
+    query, headers, transform = form_responses_export(form)
+    return csv_response(stream_csv(query, headers, transform=transform), f'form-{form.id}-responses.csv')
+
+async def write_forms_export(params: dict, format: str, path: str, progress) -> str:
+    async with AsyncSessionLocal() as db:
+        await progress(0, await db.scalar(select(func.count(Form.id))))
+    await write_chunks(path, stream_csv(form_export_query(), FORM_EXPORT_HEADERS, on_rows=progress))
+    return 'forms.csv'
+
+async def write_form_responses_export(params: dict, format: str, path: str, progress) -> str:
+    async with AsyncSessionLocal() as db:
+        form = await get_form(db, params["form_id"])
+        await progress(0, await db.scalar(select(func.count(FormResponse.id)).where(FormResponse.form_id == form.id)))
+    query, headers, transform = form_responses_export(form)
+    await write_chunks(path, stream_csv(query, headers, transform=transform, on_rows=progress))
+    return f'form-{form.id}-responses.csv'
+
+export_runner.register("forms", write_forms_export)
+export_runner.register("form-responses", write_form_responses_export)
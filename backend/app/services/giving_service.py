@@ -1,11 +1,13 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
 from app.models.giving import Giving
+from app.models.rollup import GivingDaily, GivingMemberTotal
 from app.schemas.giving import GivingCreate
-from app.utils.pagination import format_pagination_response
+from app.utils.pagination import paginate
+from app.utils.counts import ESTIMATED
+from app.services import rollup_service
 
-async def get_giving_records(db: AsyncSession, page: int, limit: int, member_id: str = None, type: str = None):
-    offset = (page - 1) * limit
+async def get_giving_records(db: AsyncSession, page: int, limit: int, member_id: str = None, type: str = None, cursor: str = None, include_total: bool = False):
     query = select(Giving)
     
     if member_id:
@@ -13,35 +15,32 @@ async def get_giving_records(db: AsyncSession, page: int, limit: int, member_id:
     if type:
         query = query.where(Giving.type == type)
     
-    query = query.order_by(Giving.date.desc()).offset(offset).limit(limit)
-    result = await db.execute(query)
-    records = result.scalars().all()
-    
-    count_query = select(func.count(Giving.id))
-    if member_id:
-        count_query = count_query.where(Giving.member_id == member_id)
-    if type:
-        count_query = count_query.where(Giving.type == type)
-    total = await db.scalar(count_query)
-    
-    return format_pagination_response(records, total, page, limit)
+    return await paginate(db, query, [Giving.date, Giving.id], page, limit, cursor, include_total, count=ESTIMATED)
 
 async def create_giving_record(db: AsyncSession, data: GivingCreate):
     giving = Giving(**data.model_dump())
     db.add(giving)
+    await db.flush()
+    await rollup_service.record_giving(db, giving)
     await db.commit()
     await db.refresh(giving)
     return giving
 
 async def get_giving_stats(db: AsyncSession, member_id: str = None):
-    query = select(func.sum(Giving.amount))
+    # Read from the rollups so the cost does not grow with years of giving history
     if member_id:
-        query = query.where(Giving.member_id == member_id)
-    total = await db.scalar(query) or 0
-    return {"total": float(total)}
+        query = (
+            select(GivingMemberTotal.type, GivingMemberTotal.total)
+            .where(GivingMemberTotal.member_id == member_id)
+        )
+    else:
+        query = select(GivingDaily.type, func.sum(GivingDaily.total)).group_by(GivingDaily.type)
+    result = await db.execute(query)
+    by_type = {type: float(total or 0) for type, total in result.all()}
+    return {"total": sum(by_type.values()), "by_type": by_type}
 
-async def get_member_giving(db: AsyncSession, member_id: str, page: int, limit: int):
-    return await get_giving_records(db, page, limit, member_id=member_id)
+async def get_member_giving(db: AsyncSession, member_id: str, page: int, limit: int, cursor: str = None, include_total: bool = False):
+    return await get_giving_records(db, page, limit, member_id=member_id, cursor=cursor, include_total=include_total)
 
 async def get_member_giving_summary(db: AsyncSession, member_id: str):
     return await get_giving_stats(db, member_id=member_id)
@@ -1,7 +1,19 @@
 import os
-import requests
+import time
 import asyncio
+import httpx
 import xml.etree.ElementTree as ET
+from typing import Optional
+from app.core.config import settings
+
+class IcecastStatus:
+    """One parsed view of the Icecast server, shared by every status check until it expires."""
+
+    def __init__(self, reachable: bool = False, source_connected: bool = False, listeners: int = 0):
+        self.reachable = reachable
+        self.source_connected = source_connected
+        self.listeners = listeners
+        self.fetched_at = time.monotonic()
 
 class IcecastService:
     def __init__(self):
@@ -11,6 +23,27 @@ class IcecastService:
         self.admin_user = os.getenv("ICECAST_ADMIN_USER", "admin")
         self.admin_password = os.getenv("ICECAST_ADMIN_PASSWORD", "churchadmin123")
         self.mount_point = "/live"
+        self.status_ttl = settings.ICECAST_STATUS_TTL
+        self.timeout = 5.0
+        self.client: Optional[httpx.AsyncClient] = None
+        self.status: Optional[IcecastStatus] = None
+        self.status_lock = asyncio.Lock()
+
+    def get_client(self) -> httpx.AsyncClient:
+        """Shared keep-alive client; created on first use so it binds to the running loop."""
+        if self.client is None or self.client.is_closed:
+            self.client = httpx.AsyncClient(
+                base_url=f"http://{self.icecast_host}:{self.icecast_port}",
+                auth=(self.admin_user, self.admin_password),
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=10, max_keepalive_connections=5)
+            )
+        return self.client
+
+    async def close(self):
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
 
     def get_stream_url(self) -> str:
         """Get public Icecast stream URL"""
@@ -26,82 +59,87 @@ class IcecastService:
             "stream_url": self.get_stream_url()
         }
 
+    def _parse_listeners(self, data: dict) -> int:
+        sources = data.get("icestats", {}).get("source", [])
+        if isinstance(sources, dict):
+            sources = [sources]
+        for source in sources:
+            if source.get("listenurl", "").endswith(self.mount_point):
+                return int(source.get("listeners", 0) or 0)
+        return 0
+
+    def _parse_source_connected(self, text: str) -> bool:
+        root = ET.fromstring(text)
+        return any(source.get("mount") == self.mount_point for source in root.findall(".//source"))
+
+    async def _fetch_status(self) -> IcecastStatus:
+        client = self.get_client()
+        public, admin = await asyncio.gather(
+            client.get("/status-json.xsl"),
+            client.get("/admin/stats.xml"),
+            return_exceptions=True
+        )
+
+        status = IcecastStatus()
+        if isinstance(public, httpx.Response):
+            status.reachable = public.status_code == 200
+            if status.reachable:
+                try:
+                    status.listeners = self._parse_listeners(public.json())
+                except ValueError as e:
+                    print(f"Error parsing Icecast status: {e}")
+        else:
+            print(f"Error getting Icecast status: {public}")
+
+        if isinstance(admin, httpx.Response):
+            status.reachable = status.reachable or admin.status_code == 200
+            if admin.status_code == 200:
+                try:
+                    status.source_connected = self._parse_source_connected(admin.text)
+                except ET.ParseError as e:
+                    print(f"Error parsing Icecast stats: {e}")
+        else:
+            print(f"Error checking source: {admin}")
+        return status
+
+    async def get_status(self, max_age: float = None) -> IcecastStatus:
+        """Cached server status; concurrent callers share a single refresh."""
+        max_age = self.status_ttl if max_age is None else max_age
+        status = self.status
+        if status and time.monotonic() - status.fetched_at < max_age:
+            return status
+
+        async with self.status_lock:
+            status = self.status
+            if status and time.monotonic() - status.fetched_at < max_age:
+                return status
+            self.status = await self._fetch_status()
+            return self.status
+
     async def get_listener_count(self) -> int:
         """Get current listener count from Icecast stats"""
-        try:
-            url = f"http://{self.icecast_host}:{self.icecast_port}/status-json.xsl"
-            response = await asyncio.to_thread(
-                requests.get,
-                url,
-                auth=(self.admin_user, self.admin_password),
-                timeout=5
-            )
-            if response.status_code == 200:
-                data = response.json()
-                sources = data.get("icestats", {}).get("source", [])
-                if isinstance(sources, dict):
-                    sources = [sources]
-                for source in sources:
-                    if source.get("listenurl", "").endswith(self.mount_point):
-                        return source.get("listeners", 0)
-            return 0
-        except Exception as e:
-            print(f"Error getting listener count: {e}")
-            return 0
+        return (await self.get_status()).listeners
 
     async def is_source_connected(self) -> bool:
         """Check if a source is connected to the mount point"""
-        try:
-            url = f"http://{self.icecast_host}:{self.icecast_port}/admin/stats.xml"
-            response = await asyncio.to_thread(
-                requests.get,
-                url,
-                auth=(self.admin_user, self.admin_password),
-                timeout=5
-            )
-            if response.status_code == 200:
-                root = ET.fromstring(response.text)
-                for source in root.findall(".//source"):
-                    mount = source.get("mount")
-                    if mount == self.mount_point:
-                        return True
-            return False
-        except Exception as e:
-            print(f"Error checking source: {e}")
-            return False
+        return (await self.get_status()).source_connected
 
     async def update_metadata(self, title: str, description: str = "") -> bool:
         """Update stream metadata"""
         try:
-            url = f"http://{self.icecast_host}:{self.icecast_port}/admin/metadata"
             params = {
                 "mount": self.mount_point,
                 "mode": "updinfo",
                 "song": title
             }
-            response = await asyncio.to_thread(
-                requests.get,
-                url,
-                params=params,
-                auth=(self.admin_user, self.admin_password),
-                timeout=5
-            )
+            response = await self.get_client().get("/admin/metadata", params=params)
             return response.status_code == 200
-        except Exception as e:
+        except httpx.HTTPError as e:
             print(f"Error updating metadata: {e}")
             return False
 
     async def check_connection(self) -> bool:
         """Check if Icecast server is reachable"""
-        try:
-            url = f"http://{self.icecast_host}:{self.icecast_port}/status.xsl"
-            response = await asyncio.to_thread(
-                requests.get,
-                url,
-                timeout=5
-            )
-            return response.status_code == 200
-        except Exception:
-            return False
+        return (await self.get_status()).reachable
 
 icecast_service = IcecastService()
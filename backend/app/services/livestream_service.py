@@ -1,10 +1,19 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, delete
+from sqlalchemy import select, func, delete, tuple_
 from datetime import datetime
+import uuid
 from app.models.stream import StreamViewer
 from app.models.livestream import Livestream, ChatMessage
 from app.schemas.livestream import LivestreamCreate, LivestreamUpdate
-from app.core.exceptions import NotFoundException
+from app.core.exceptions import NotFoundException, BadRequestException
+from app.utils.pagination import encode_cursor, decode_cursor
+from app.utils.aggregates import AggregateQuery
+from app.utils.auth import create_viewer_token
+from app.websocket.stats import stats_engine
+from app.websocket.chat_buffer import chat_buffer
+from app.websocket.chat_history import chat_history, chat_message_to_dict
+from app.websocket.presence import presence
+from app.services.dashboard_service import invalidate_dashboard
 
 async def get_current_livestream(db: AsyncSession):
     result = await db.execute(
@@ -27,6 +36,7 @@ async def create_livestream(db: AsyncSession, data: LivestreamCreate):
     livestream = Livestream(**data.model_dump(), is_live=True, start_time=datetime.utcnow())
     db.add(livestream)
     await db.commit()
+    await invalidate_dashboard()
     await db.refresh(livestream)
     return livestream
 
@@ -35,6 +45,7 @@ async def update_livestream(db: AsyncSession, livestream_id: str, data: Livestre
     for key, value in data.model_dump(exclude_unset=True).items():
         setattr(livestream, key, value)
     await db.commit()
+    await invalidate_dashboard()
     await db.refresh(livestream)
     return livestream
 
@@ -44,7 +55,9 @@ async def start_livestream(db: AsyncSession, livestream_id: str):
     livestream.is_live = True
     livestream.start_time = datetime.utcnow()
     await db.commit()
+    await invalidate_dashboard()
     await db.refresh(livestream)
+    stats_engine.stream_started(livestream_id, livestream.start_time)
     return livestream
 
 async def stop_livestream(db: AsyncSession, livestream_id: str):
@@ -54,24 +67,59 @@ async def stop_livestream(db: AsyncSession, livestream_id: str):
     livestream.end_time = datetime.utcnow()
     
     # Remove all viewers when stream ends
-    await db.execute(delete(StreamViewer).where(StreamViewer.livestream_id == livestream_id))
+    await presence.end_stream(db, livestream_id)
     
     await db.commit()
+    await invalidate_dashboard()
     await db.refresh(livestream)
+    stats_engine.stream_ended(livestream_id)
+    chat_history.drop(livestream_id)
     return livestream
 
-async def get_chat_messages(db: AsyncSession, livestream_id: str, limit: int = 50):
-    result = await db.execute(
-        select(ChatMessage)
-        .where(ChatMessage.livestream_id == livestream_id)
-        .order_by(ChatMessage.created_at.desc())
-        .limit(limit)
-    )
-    return result.scalars().all()
+async def get_chat_messages(db: AsyncSession, livestream_id: str, limit: int = 50, before: str = None):
+    """Newest-first chat page and the cursor for the next (older) page."""
+    messages = None
+    if not before:
+        messages = await chat_history.recent(db, livestream_id, limit)
+    
+    if messages is None:
+        query = (
+            select(ChatMessage)
+            .where(ChatMessage.livestream_id == livestream_id)
+            .order_by(ChatMessage.created_at.desc(), ChatMessage.id.desc())
+            .limit(limit)
+        )
+        if before:
+            try:
+                created_at, message_id = decode_cursor(before)
+                key = (datetime.fromisoformat(created_at), uuid.UUID(message_id))
+            except (TypeError, ValueError, KeyError, AttributeError):
+                raise BadRequestException("Invalid cursor")
+            query = query.where(tuple_(ChatMessage.created_at, ChatMessage.id) < key)
+        result = await db.execute(query)
+        messages = [chat_message_to_dict(message) for message in result.scalars().all()]
+    
+    next_cursor = None
+    if messages and len(messages) == limit:
+        next_cursor = encode_cursor(messages[-1]["created_at"], messages[-1]["id"])
+    return messages, next_cursor
 
 async def delete_chat_message(db: AsyncSession, message_id: str):
-    await db.execute(delete(ChatMessage).where(ChatMessage.id == message_id))
-    await db.commit()
+    pending = chat_buffer.discard(message_id)
+    if pending:
+        livestream_id = pending["livestream_id"]
+    else:
+        result = await db.execute(
+            delete(ChatMessage).where(ChatMessage.id == message_id).returning(ChatMessage.livestream_id)
+        )
+        livestream_id = result.scalar_one_or_none()
+        await db.commit()
+    
+    if livestream_id:
+        stats_engine.chat_message_removed(livestream_id)
+        chat_history.remove(livestream_id, message_id)
+        from app.websocket.handlers import broadcast_chat_message_deleted
+        await broadcast_chat_message_deleted(str(livestream_id), message_id)
 
 async def get_stream_history(db: AsyncSession):
     result = await db.execute(
@@ -80,101 +128,73 @@ async def get_stream_history(db: AsyncSession):
     return result.scalars().all()
 
 async def get_viewers(db: AsyncSession, livestream_id: str):
-    from app.models.stream import StreamViewer
-    result = await db.execute(
-        select(StreamViewer).where(StreamViewer.livestream_id == livestream_id)
-    )
-    return result.scalars().all()
+    return await presence.list_viewers(db, livestream_id)
 
 async def add_viewer(db: AsyncSession, livestream_id: str, data: dict):
-    from app.models.stream import StreamViewer
-    
-    # Check if user already has an active viewer session
-    if data.get('user_id'):
-        result = await db.execute(
-            select(StreamViewer).where(
-                StreamViewer.livestream_id == livestream_id,
-                StreamViewer.user_id == data['user_id'],
-                StreamViewer.status == 'active'
-            )
-        )
-        existing = result.scalar_one_or_none()
-        if existing:
-            return existing
-    
-    viewer = StreamViewer(livestream_id=livestream_id, **data)
-    db.add(viewer)
-    await db.commit()
-    await db.refresh(viewer)
-    return viewer
+    # Returns the existing active session if the user is already watching
+    viewer = await presence.join(db, livestream_id, data)
+    return {**viewer, "viewer_token": create_viewer_token(viewer["livestream_id"], viewer["id"])}
 
 async def remove_viewer(db: AsyncSession, viewer_id: str):
-    from sqlalchemy import delete
-    from app.models.stream import StreamViewer
-    result = await db.execute(select(StreamViewer).where(StreamViewer.id == int(viewer_id)))
-    viewer = result.scalar_one_or_none()
-    user_id = str(viewer.user_id) if viewer and viewer.user_id else None
-    
-    await db.execute(delete(StreamViewer).where(StreamViewer.id == int(viewer_id)))
-    await db.commit()
+    viewer = await presence.leave(db, int(viewer_id))
     
-    if user_id:
+    if viewer and viewer["user_id"]:
         from app.websocket.handlers import broadcast_viewer_kicked
-        await broadcast_viewer_kicked(user_id)
+        await broadcast_viewer_kicked(viewer["user_id"])
 
 async def ban_viewer(db: AsyncSession, viewer_id: str):
-    from app.models.stream import StreamViewer
-    result = await db.execute(select(StreamViewer).where(StreamViewer.id == int(viewer_id)))
-    viewer = result.scalar_one_or_none()
-    if viewer:
-        user_id = str(viewer.user_id) if viewer.user_id else None
-        viewer.status = 'kicked'
-        await db.commit()
-        
-        if user_id:
-            from app.websocket.handlers import broadcast_viewer_kicked
-            await broadcast_viewer_kicked(user_id)
+    viewer = await presence.set_status(db, int(viewer_id), 'kicked')
+    if viewer and viewer["user_id"]:
+        from app.websocket.handlers import broadcast_viewer_kicked
+        await broadcast_viewer_kicked(viewer["user_id"])
 
 async def unban_viewer(db: AsyncSession, viewer_id: str):
-    from app.models.stream import StreamViewer
-    result = await db.execute(select(StreamViewer).where(StreamViewer.id == int(viewer_id)))
-    viewer = result.scalar_one_or_none()
-    if viewer:
-        viewer.status = 'active'
-        await db.commit()
+    await presence.set_status(db, int(viewer_id), 'active')
 
 async def bulk_viewer_action(db: AsyncSession, data: dict):
-    from app.models.stream import StreamViewer
+    from app.models.stream import ModerationLog
     action = data.get('action')
-    viewer_ids = data.get('viewer_ids', [])
+    viewer_ids = [int(viewer_id) for viewer_id in data.get('viewer_ids', [])]
+    if action not in ('disconnect', 'ban') or not viewer_ids:
+        return
     
+    # Presence rows are written by the next presence flush in one statement per stream
     if action == 'disconnect':
-        for viewer_id in viewer_ids:
-            await remove_viewer(db, str(viewer_id))
-    elif action == 'ban':
-        for viewer_id in viewer_ids:
-            await ban_viewer(db, str(viewer_id))
+        viewers = await presence.leave_many(db, viewer_ids)
+    else:
+        viewers = await presence.set_status_many(db, viewer_ids, 'kicked')
     
-    from app.websocket.handlers import broadcast_viewers_update
+    db.add(ModerationLog(action=action, viewer_ids=[str(viewer_id) for viewer_id in viewer_ids], note=data.get('note')))
+    await db.commit()
+    
+    from app.websocket.handlers import broadcast_viewers_kicked, broadcast_viewers_update
+    user_ids = list(dict.fromkeys(viewer["user_id"] for viewer in viewers if viewer["user_id"]))
+    if user_ids:
+        await broadcast_viewers_kicked(user_ids)
     await broadcast_viewers_update()
 
 async def get_stream_stats(db: AsyncSession, livestream_id: str):
-    from app.models.stream import StreamViewer
-    livestream = await get_livestream(db, livestream_id)
-    result = await db.execute(
-        select(func.count()).select_from(StreamViewer).where(StreamViewer.livestream_id == livestream_id).where(StreamViewer.status == 'active')
-    )
-    current_viewers = result.scalar()
-    chat_result = await db.execute(
-        select(func.count()).select_from(ChatMessage).where(ChatMessage.livestream_id == livestream_id)
+    row = await (
+        AggregateQuery()
+        .scalar("is_live", select(Livestream.is_live).where(Livestream.id == livestream_id))
+        .scalar("peak_viewers", select(Livestream.viewers).where(Livestream.id == livestream_id))
+        .scalar(
+            "current_viewers",
+            select(func.count(StreamViewer.id))
+            .where(StreamViewer.livestream_id == livestream_id, StreamViewer.status == 'active')
+        )
+        .scalar("chat_messages", select(func.count(ChatMessage.id)).where(ChatMessage.livestream_id == livestream_id))
+        .execute(db)
     )
-    chat_messages = chat_result.scalar()
-    return {
-        "current_viewers": current_viewers,
-        "peak_viewers": livestream.viewers,
-        "chat_messages": chat_messages,
-        "is_live": livestream.is_live
-    }
+    if row["is_live"] is None:
+        raise NotFoundException("Livestream not found")
+    
+    # Presence is ahead of stream_viewers between flushes
+    live_counts = presence.get_counts(livestream_id)
+    if live_counts:
+        row["current_viewers"] = live_counts[0]
+        row["peak_viewers"] = max(row["peak_viewers"] or 0, live_counts[1])
+    return row
 
 async def stream_audio(db: AsyncSession, data: dict):
     return {"message": "Audio streaming endpoint"}
@@ -1,16 +1,18 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, or_
-from fastapi.responses import StreamingResponse
-import csv
-import io
 from app.models.user import User
 from app.schemas.user import UserUpdate
-from app.utils.pagination import format_pagination_response
+from app.utils.pagination import paginate
+from app.utils.counts import invalidate_counts, ESTIMATED, CACHED
 from app.core.exceptions import NotFoundException
-from app.utils.pdf_export import generate_pdf_report
+from app.core.database import AsyncSessionLocal
+from app.utils.pdf_export import render_pdf_report, pdf_response
+from app.utils.csv_export import stream_csv, csv_response, write_chunks
+from app.services.export_service import export_runner
+from app.services.dashboard_service import invalidate_dashboard
+from app.services import rollup_service
 
-async def get_members(db: AsyncSession, page: int, limit: int, search: str = None, role: str = None):
-    offset = (page - 1) * limit
+async def get_members(db: AsyncSession, page: int, limit: int, search: str = None, role: str = None, cursor: str = None, include_total: bool = False):
     query = select(User)
     
     if search:
@@ -21,21 +23,10 @@ async def get_members(db: AsyncSession, page: int, limit: int, search: str = Non
     if role:
         query = query.where(User.role == role)
     
-    query = query.order_by(User.created_at.desc()).offset(offset).limit(limit)
-    result = await db.execute(query)
-    members = result.scalars().all()
-    
-    count_query = select(func.count(User.id))
-    if search:
-        count_query = count_query.where(or_(
-            User.name.ilike(f"%{search}%"),
-            User.email.ilike(f"%{search}%")
-        ))
-    if role:
-        count_query = count_query.where(User.role == role)
-    total = await db.scalar(count_query)
-    
-    return format_pagination_response(members, total, page, limit)
+    return await paginate(
+        db, query, [User.created_at, User.id], page, limit, cursor, include_total,
+        count=ESTIMATED if search else CACHED
+    )
 
 async def get_member(db: AsyncSession, member_id: str):
     result = await db.execute(select(User).where(User.id == member_id))
@@ -49,28 +40,55 @@ async def update_member(db: AsyncSession, member_id: str, data: UserUpdate):
     for key, value in data.model_dump(exclude_unset=True).items():
         setattr(member, key, value)
     await db.commit()
+    await invalidate_dashboard()
+    await invalidate_counts("users")
     await db.refresh(member)
     return member
 
 async def delete_member(db: AsyncSession, member_id: str):
     member = await get_member(db, member_id)
+    await rollup_service.forget_member(db, member.id)
     await db.delete(member)
     await db.commit()
+    await invalidate_dashboard()
+    await invalidate_counts("users")
 
-async def export_members(db: AsyncSession, format: str = 'csv'):
-    result = await db.execute(select(User).order_by(User.created_at.desc()))
-    members = result.scalars().all()
-    
+MEMBER_EXPORT_HEADERS = ['Name', 'Email', 'Phone', 'Role', 'Status', 'Created At']
+
+def member_export_query():
+    return (
+        select(User.name, User.email, User.phone, User.role, User.status, User.created_at)
+        .order_by(User.created_at.desc())
+    )
+
+async def member_pdf_rows(db: AsyncSession) -> list:
+    result = await db.execute(member_export_query())
+    return [[name, email, phone or '', role, status, str(created_at)] for name, email, phone, role, status, created_at in result.all()]
+
+async def export_members(db: AsyncSession, format: str = 'csv', background: bool = False, user_id: str = None):
+    if background:
+        return await export_runner.submit(db, "members", format, {}, user_id)
     if format == 'csv':
-        output = io.StringIO()
-        writer = csv.writer(output)
-        writer.writerow(['Name', 'Email', 'Phone', 'Role', 'Status', 'Created At'])
-        for member in members:
-            writer.writerow([member.name, member.email, member.phone or '', member.role, member.status, member.created_at])
-        output.seek(0)
-        return StreamingResponse(iter([output.getvalue()]), media_type='text/csv', headers={'Content-Disposition': 'attachment; filename=members.csv'})
+        return csv_response(stream_csv(member_export_query(), MEMBER_EXPORT_HEADERS), 'members.csv')
     else:
-        headers = ['Name', 'Email', 'Phone', 'Role', 'Status', 'Created At']
-        data = [[member.name, member.email, member.phone or '', member.role, member.status, str(member.created_at)] for member in members]
-        buffer = generate_pdf_report('Members Report', headers, data, 'members.pdf')
-        return StreamingResponse(iter([buffer.getvalue()]), media_type='application/pdf', headers={'Content-Disposition': 'attachment; filename=members.pdf'})
+        data = await member_pdf_rows(db)
+        # Release the connection before the (slow) render
+        await db.close()
+        path = await render_pdf_report('Members Report', MEMBER_EXPORT_HEADERS, data)
+        return pdf_response(path, 'members.pdf')
+
+async def write_members_export(params: dict, format: str, path: str, progress) -> str:
+    async with AsyncSessionLocal() as db:
+        if format == 'csv':
+            await progress(0, await db.scalar(select(func.count(User.id))))
+        else:
+            data = await member_pdf_rows(db)
+    
+    if format == 'csv':
+        await write_chunks(path, stream_csv(member_export_query(), MEMBER_EXPORT_HEADERS, on_rows=progress))
+        return 'members.csv'
+    await progress(0, len(data))
+    await render_pdf_report('Members Report', MEMBER_EXPORT_HEADERS, data, path)
+    return 'members.pdf'
+
+export_runner.register("members", write_members_export)
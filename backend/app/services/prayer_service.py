@@ -1,12 +1,13 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select
 from app.models.prayer import PrayerRequest
 from app.schemas.prayer import PrayerRequestCreate, PrayerRequestUpdate
-from app.utils.pagination import format_pagination_response
+from app.utils.pagination import paginate
+from app.utils.counts import ESTIMATED
 from app.core.exceptions import NotFoundException
+from app.services.counter_service import counters
 
-async def get_prayer_requests(db: AsyncSession, page: int, limit: int, status: str = None, is_private: bool = None):
-    offset = (page - 1) * limit
+async def get_prayer_requests(db: AsyncSession, page: int, limit: int, status: str = None, is_private: bool = None, cursor: str = None, include_total: bool = False):
     query = select(PrayerRequest)
     
     if status:
@@ -14,24 +15,16 @@ async def get_prayer_requests(db: AsyncSession, page: int, limit: int, status: s
     if is_private is not None:
         query = query.where(PrayerRequest.is_private == is_private)
     
-    query = query.order_by(PrayerRequest.date.desc()).offset(offset).limit(limit)
-    result = await db.execute(query)
-    prayers = result.scalars().all()
-    
-    count_query = select(func.count(PrayerRequest.id))
-    if status:
-        count_query = count_query.where(PrayerRequest.status == status)
-    if is_private is not None:
-        count_query = count_query.where(PrayerRequest.is_private == is_private)
-    total = await db.scalar(count_query)
-    
-    return format_pagination_response(prayers, total, page, limit)
+    result = await paginate(db, query, [PrayerRequest.date, PrayerRequest.id], page, limit, cursor, include_total, count=ESTIMATED)
+    counters.overlay(result["data"], PrayerRequest.prayers)
+    return result
 
 async def get_prayer_request(db: AsyncSession, prayer_id: str):
     result = await db.execute(select(PrayerRequest).where(PrayerRequest.id == prayer_id))
     prayer = result.scalar_one_or_none()
     if not prayer:
         raise NotFoundException("Prayer request not found")
+    counters.overlay([prayer], PrayerRequest.prayers)
     return prayer
 
 async def create_prayer_request(db: AsyncSession, data: PrayerRequestCreate, member_id: str = None):
@@ -53,15 +46,13 @@ async def update_prayer_request(db: AsyncSession, prayer_id: str, data: PrayerRe
     return prayer
 
 async def increment_prayers(db: AsyncSession, prayer_id: str):
-    prayer = await get_prayer_request(db, prayer_id)
-    prayer.prayers += 1
-    await db.commit()
+    await counters.add_existing(db, PrayerRequest.prayers, prayer_id)
 
 async def get_member_prayer_requests(db: AsyncSession, member_id: str):
     result = await db.execute(
         select(PrayerRequest).where(PrayerRequest.member_id == member_id).order_by(PrayerRequest.date.desc())
     )
-    return result.scalars().all()
+    return counters.overlay(result.scalars().all(), PrayerRequest.prayers)
 
 async def delete_prayer_request(db: AsyncSession, prayer_id: str):
     from sqlalchemy import delete
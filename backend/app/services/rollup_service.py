@@ -0,0 +1,132 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete, update, func, exists, values, column, literal, Integer
+from sqlalchemy.dialects.postgresql import insert, UUID
+from typing import Dict
+from datetime import date
+import uuid
+from app.models.giving import Giving
+from app.models.attendance import Attendance
+from app.models.sermon import Sermon
+from app.models.rollup import GivingDaily, GivingMemberTotal, AttendanceDaily, AttendanceMember, SermonDaily
+
+def _upsert_add(model, keys: dict, values: dict, **extra):
+    """INSERT the row, or add ``values`` onto the existing one; ``extra`` overrides the update for other columns."""
+    stmt = insert(model).values(**keys, **values, **{name: value for name, (value, _) in extra.items()})
+    set_ = {name: getattr(model, name) + stmt.excluded[name] for name in values}
+    set_.update({name: merge(getattr(model, name), stmt.excluded[name]) for name, (_, merge) in extra.items()})
+    return stmt.on_conflict_do_update(index_elements=list(keys), set_=set_)
+
+async def record_giving(db: AsyncSession, giving: Giving):
+    """Add a new giving row to the rollups; call in the same transaction, after it has been flushed."""
+    await db.execute(_upsert_add(
+        GivingDaily, {"day": giving.date, "type": giving.type}, {"total": giving.amount, "gifts": 1}
+    ))
+    await db.execute(_upsert_add(
+        GivingMemberTotal, {"member_id": giving.member_id, "type": giving.type}, {"total": giving.amount, "gifts": 1},
+        last_given=(giving.date, func.greatest)
+    ))
+
+async def record_attendance(db: AsyncSession, attendance: Attendance):
+    """Add a new attendance row to the rollups; call in the same transaction, after it has been flushed."""
+    if not attendance.present:
+        return
+    already_counted = await db.scalar(select(exists().where(
+        Attendance.user_id == attendance.user_id,
+        Attendance.date == attendance.date,
+        Attendance.service_type == attendance.service_type,
+        Attendance.present == True,
+        Attendance.id != attendance.id
+    )))
+    if already_counted:
+        return
+
+    await db.execute(_upsert_add(
+        AttendanceDaily, {"day": attendance.date, "service_type": attendance.service_type}, {"attendees": 1}
+    ))
+    await db.execute(_upsert_add(
+        AttendanceMember, {"user_id": attendance.user_id}, {"services": 1},
+        first_day=(attendance.date, func.least),
+        last_day=(attendance.date, func.greatest)
+    ))
+
+async def record_sermon_activity(db: AsyncSession, deltas: Dict[uuid.UUID, int], counter: str, day: date = None):
+    """Add a batch of ``plays`` or ``downloads`` increments to today's sermon_daily rows."""
+    increments = values(
+        column("sermon_id", UUID(as_uuid=True)), column("amount", Integer), name="increments"
+    ).data(list(deltas.items()))
+    # Joining sermons drops increments for sermons deleted since the hit
+    source = (
+        select(literal(day or date.today()), increments.c.sermon_id, increments.c.amount)
+        .join(Sermon, Sermon.id == increments.c.sermon_id)
+    )
+    stmt = insert(SermonDaily).from_select(["day", "sermon_id", counter], source)
+    await db.execute(stmt.on_conflict_do_update(
+        index_elements=["day", "sermon_id"],
+        set_={counter: getattr(SermonDaily, counter) + stmt.excluded[counter]}
+    ))
+
+async def forget_member(db: AsyncSession, member_id):
+    """Take a member's history out of the church-wide rollups before the member is deleted.
+
+    Per-member rollups go with the user row through ON DELETE CASCADE.
+    """
+    given = (
+        select(Giving.date, Giving.type, func.sum(Giving.amount).label("total"), func.count().label("gifts"))
+        .where(Giving.member_id == member_id)
+        .group_by(Giving.date, Giving.type)
+        .subquery()
+    )
+    await db.execute(
+        update(GivingDaily)
+        .where(GivingDaily.day == given.c.date, GivingDaily.type == given.c.type)
+        .values(total=GivingDaily.total - given.c.total, gifts=GivingDaily.gifts - given.c.gifts)
+    )
+
+    attended = (
+        select(Attendance.date, Attendance.service_type)
+        .where(Attendance.user_id == member_id, Attendance.present == True)
+        .distinct()
+        .subquery()
+    )
+    await db.execute(
+        update(AttendanceDaily)
+        .where(AttendanceDaily.day == attended.c.date, AttendanceDaily.service_type == attended.c.service_type)
+        .values(attendees=AttendanceDaily.attendees - 1)
+    )
+
+async def rebuild(db: AsyncSession):
+    """Recompute the giving and attendance rollups from their source tables; the caller commits.
+
+    Sermon activity has no per-day source to rebuild from, so ``sermon_daily`` is left alone.
+    """
+    await db.execute(delete(GivingDaily))
+    await db.execute(insert(GivingDaily).from_select(
+        ["day", "type", "total", "gifts"],
+        select(Giving.date, Giving.type, func.sum(Giving.amount), func.count()).group_by(Giving.date, Giving.type)
+    ))
+
+    await db.execute(delete(GivingMemberTotal))
+    await db.execute(insert(GivingMemberTotal).from_select(
+        ["member_id", "type", "total", "gifts", "last_given"],
+        select(Giving.member_id, Giving.type, func.sum(Giving.amount), func.count(), func.max(Giving.date))
+        .group_by(Giving.member_id, Giving.type)
+    ))
+
+    present = (
+        select(Attendance.user_id, Attendance.date, Attendance.service_type)
+        .where(Attendance.present == True)
+        .distinct()
+        .subquery()
+    )
+    await db.execute(delete(AttendanceDaily))
+    await db.execute(insert(AttendanceDaily).from_select(
+        ["day", "service_type", "attendees"],
+        select(present.c.date, present.c.service_type, func.count()).group_by(present.c.date, present.c.service_type)
+    ))
+
+    await db.execute(delete(AttendanceMember))
+    await db.execute(insert(AttendanceMember).from_select(
+        ["user_id", "first_day", "last_day", "services"],
+        select(present.c.user_id, func.min(present.c.date), func.max(present.c.date), func.count())
+        .group_by(present.c.user_id)
+    ))
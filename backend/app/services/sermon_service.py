@@ -1,58 +1,101 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, or_
+from sqlalchemy import select, func, or_, text, type_coerce, Float
+from sqlalchemy.exc import DBAPIError
+from typing import List
+from datetime import date, timedelta
+import re
+from app.core.config import settings
 from app.models.sermon import Sermon, SermonSeries
+from app.models.rollup import SermonDaily
 from app.schemas.sermon import SermonCreate, SermonUpdate
-from app.utils.pagination import format_pagination_response
+from app.utils.pagination import paginate
+from app.utils.counts import invalidate_counts, ESTIMATED, CACHED
 from app.core.exceptions import NotFoundException
+from app.services.dashboard_service import invalidate_dashboard
+from app.services import rollup_service
+from app.services.counter_service import counters
+from functools import partial
 
-async def get_sermons(db: AsyncSession, page: int, limit: int, search: str = None, series_id: str = None, speaker: str = None):
-    offset = (page - 1) * limit
-    query = select(Sermon)
-    
+counters.on_flush(Sermon.plays, partial(rollup_service.record_sermon_activity, counter="plays"))
+counters.on_flush(Sermon.downloads, partial(rollup_service.record_sermon_activity, counter="downloads"))
+
+def _search_filters(search: str = None, series_id: str = None, speaker: str = None, tags: List[str] = None):
+    filters = []
     if search:
-        query = query.where(or_(
-            Sermon.title.ilike(f"%{search}%"),
-            Sermon.speaker.ilike(f"%{search}%"),
-            Sermon.description.ilike(f"%{search}%")
+        # websearch syntax: quoted phrases, "or", and -exclusions; speaker names also match fuzzily
+        filters.append(or_(
+            Sermon.search_vector.op("@@")(func.websearch_to_tsquery("english", search)),
+            Sermon.speaker.op("%>")(search)
         ))
     if series_id:
-        query = query.where(Sermon.series_id == series_id)
+        filters.append(Sermon.series_id == series_id)
     if speaker:
-        query = query.where(Sermon.speaker.ilike(f"%{speaker}%"))
-    
-    query = query.order_by(Sermon.date.desc()).offset(offset).limit(limit)
+        # Served by the trigram index rather than a sequential scan
+        filters.append(Sermon.speaker.ilike(f"%{speaker}%"))
+    if tags:
+        filters.append(Sermon.tags.contains(tags))
+    return filters
+
+def _search_rank(tsquery, search: str):
+    # Typed as Float so the rank can be a cursor key
+    return type_coerce(func.ts_rank_cd(Sermon.search_vector, tsquery) + func.word_similarity(search, Sermon.speaker), Float)
+
+async def get_sermons(db: AsyncSession, page: int, limit: int, search: str = None, series_id: str = None, speaker: str = None, tags: List[str] = None, cursor: str = None, include_total: bool = False):
+    query = select(Sermon).where(*_search_filters(search, series_id, speaker, tags))
+    keys = [Sermon.date, Sermon.id]
+    if search:
+        keys.insert(0, _search_rank(func.websearch_to_tsquery("english", search), search))
     
-    result = await db.execute(query)
-    sermons = result.scalars().all()
+    result = await paginate(db, query, keys, page, limit, cursor, include_total, count=ESTIMATED if search else CACHED)
+    counters.overlay(result["data"], Sermon.plays, Sermon.downloads)
+    return result
+
+async def suggest_sermons(db: AsyncSession, q: str, limit: int = 8):
+    """Search-as-you-type: prefix-match every word typed so far, bounded by SERMON_SUGGEST_TIMEOUT_MS."""
+    terms = re.findall(r"\w+", q.lower())[:8]
+    if not terms or len(q.strip()) < 2:
+        return []
     
-    count_query = select(func.count(Sermon.id))
-    if search:
-        count_query = count_query.where(or_(
-            Sermon.title.ilike(f"%{search}%"),
-            Sermon.speaker.ilike(f"%{search}%")
-        ))
-    if series_id:
-        count_query = count_query.where(Sermon.series_id == series_id)
+    tsquery = func.to_tsquery("english", " & ".join(f"{term}:*" for term in terms))
+    query = (
+        select(Sermon.id, Sermon.title, Sermon.speaker, Sermon.date)
+        .where(or_(Sermon.search_vector.op("@@")(tsquery), Sermon.speaker.op("%>")(q)))
+        .order_by(_search_rank(tsquery, q).desc(), Sermon.date.desc())
+        .limit(limit)
+    )
     
-    total = await db.scalar(count_query)
+    await db.execute(text(f"SET LOCAL statement_timeout = {int(settings.SERMON_SUGGEST_TIMEOUT_MS)}"))
+    try:
+        result = await db.execute(query)
+    except DBAPIError as e:
+        # A slow suggestion is worse than none; the next keystroke will try again
+        if getattr(e.orig, "sqlstate", None) != "57014":
+            raise
+        await db.rollback()
+        return []
     
-    return format_pagination_response(sermons, total, page, limit)
+    return [
+        {"id": str(id), "title": title, "speaker": speaker, "date": day.isoformat()}
+        for id, title, speaker, day in result.all()
+    ]
 
 async def get_sermon(db: AsyncSession, sermon_id: str):
     result = await db.execute(select(Sermon).where(Sermon.id == sermon_id))
     sermon = result.scalar_one_or_none()
     if not sermon:
         raise NotFoundException("Sermon not found")
+    counters.overlay([sermon], Sermon.plays, Sermon.downloads)
     return sermon
 
 async def create_sermon(db: AsyncSession, data: SermonCreate, audio=None, thumbnail=None):
     from app.services.storage_service import save_file
+    from app.middleware.file_validation import AUDIO_UPLOAD_RULE, IMAGE_RULE
     
     sermon_data = data.model_dump()
     if audio:
-        sermon_data['audio_url'] = await save_file(audio, 'sermons/audio')
+        sermon_data['audio_url'] = await save_file(audio, 'sermons/audio', AUDIO_UPLOAD_RULE)
     if thumbnail:
-        sermon_data['thumbnail_url'] = await save_file(thumbnail, 'sermons/thumbnails')
+        sermon_data['thumbnail_url'] = await save_file(thumbnail, 'sermons/thumbnails', IMAGE_RULE)
     
     sermon = Sermon(**sermon_data)
     db.add(sermon)
@@ -63,6 +106,8 @@ async def create_sermon(db: AsyncSession, data: SermonCreate, audio=None, thumbn
             series.sermon_count += 1
     
     await db.commit()
+    await invalidate_dashboard()
+    await invalidate_counts("sermons")
     await db.refresh(sermon)
     return sermon
 
@@ -71,6 +116,8 @@ async def update_sermon(db: AsyncSession, sermon_id: str, data: SermonUpdate):
     for key, value in data.model_dump(exclude_unset=True).items():
         setattr(sermon, key, value)
     await db.commit()
+    await invalidate_dashboard()
+    await invalidate_counts("sermons")
     await db.refresh(sermon)
     return sermon
 
@@ -84,13 +131,27 @@ async def delete_sermon(db: AsyncSession, sermon_id: str):
     
     await db.delete(sermon)
     await db.commit()
+    await invalidate_dashboard()
+    await invalidate_counts("sermons")
 
 async def increment_plays(db: AsyncSession, sermon_id: str):
-    sermon = await get_sermon(db, sermon_id)
-    sermon.plays += 1
-    await db.commit()
+    await counters.add_existing(db, Sermon.plays, sermon_id)
 
 async def increment_downloads(db: AsyncSession, sermon_id: str):
+    await counters.add_existing(db, Sermon.downloads, sermon_id)
+
+async def get_sermon_engagement(db: AsyncSession, sermon_id: str, days: int = 30):
     sermon = await get_sermon(db, sermon_id)
-    sermon.downloads += 1
-    await db.commit()
+    since = date.today() - timedelta(days=days - 1)
+    result = await db.execute(
+        select(SermonDaily.day, SermonDaily.plays, SermonDaily.downloads)
+        .where(SermonDaily.sermon_id == sermon.id, SermonDaily.day >= since)
+        .order_by(SermonDaily.day)
+    )
+    daily = [{"date": day.isoformat(), "plays": plays, "downloads": downloads} for day, plays, downloads in result.all()]
+    return {
+        "plays": sermon.plays or 0,
+        "downloads": sermon.downloads or 0,
+        "days": days,
+        "daily": daily
+    }
@@ -93,33 +93,30 @@ async def get_system_status(db: AsyncSession):
     }
 
 async def get_security_stats(db: AsyncSession):
-    from sqlalchemy import func
     from app.models.audit import AuditLog
     from app.models.user import User
     from datetime import datetime, timedelta
     
-    # Active sessions (users logged in within last 30 minutes)
-    thirty_min_ago = datetime.utcnow() - timedelta(minutes=30)
-    active_sessions_result = await db.execute(
-        select(func.count()).select_from(User).where(User.status == 'active')
-    )
-    active_sessions = active_sessions_result.scalar() or 0
+    from app.utils.aggregates import AggregateQuery
     
-    # Security alerts (failed login attempts in last 24 hours)
     twenty_four_hours_ago = datetime.utcnow() - timedelta(hours=24)
-    alerts_result = await db.execute(
-        select(func.count()).select_from(AuditLog)
-        .where(AuditLog.event.in_(['failed_login', 'suspicious_activity']))
-        .where(AuditLog.created_at >= twenty_four_hours_ago)
-    )
-    security_alerts = alerts_result.scalar() or 0
-    
-    # Blocked attempts (all failed logins)
-    blocked_result = await db.execute(
-        select(func.count()).select_from(AuditLog)
-        .where(AuditLog.event == 'failed_login')
+    row = await (
+        AggregateQuery()
+        # Active sessions (active users)
+        .count("active_sessions", User.id, User.status == 'active')
+        # Security alerts (failed logins and suspicious activity in last 24 hours)
+        .count(
+            "security_alerts", AuditLog.id,
+            AuditLog.event.in_(['failed_login', 'suspicious_activity']),
+            AuditLog.created_at >= twenty_four_hours_ago
+        )
+        # Blocked attempts (all failed logins)
+        .count("blocked_attempts", AuditLog.id, AuditLog.event == 'failed_login')
+        .execute(db)
     )
-    blocked_attempts = blocked_result.scalar() or 0
+    active_sessions = row["active_sessions"] or 0
+    security_alerts = row["security_alerts"] or 0
+    blocked_attempts = row["blocked_attempts"] or 0
     
     # Calculate security score (0-100)
     score = 100
@@ -1,23 +1,53 @@
 import os
 import uuid
+import aiofiles
+import aiofiles.os
 from pathlib import Path
+from typing import Optional
 from fastapi import UploadFile
 from app.core.config import settings
+from app.core.exceptions import BadRequestException
+from app.middleware.file_validation import FileRule
 
 UPLOAD_DIR = Path(settings.UPLOAD_DIR)
 
-async def save_file(file: UploadFile, subfolder: str) -> str:
-    """Save uploaded file and return relative path"""
+async def save_file(file: UploadFile, subfolder: str, rule: Optional[FileRule] = None) -> str:
+    """Stream an upload to disk in UPLOAD_CHUNK_SIZE chunks and return its relative path.
+
+    With a ``rule``, the declared type and size are checked before anything is written, the
+    first chunk's magic bytes must match the rule (and pick the stored extension), and the
+    running byte count is held to the rule's limit. The file is written to a ``.part`` file
+    and renamed into place once complete, so a rejected or failed upload leaves nothing behind.
+    """
+    if rule:
+        rule.check_declared(file)
+    max_size = rule.max_size if rule else settings.MAX_FILE_SIZE
     folder = UPLOAD_DIR / subfolder
     folder.mkdir(parents=True, exist_ok=True)
     
-    ext = Path(file.filename).suffix
-    filename = f"{uuid.uuid4()}{ext}"
-    filepath = folder / filename
+    name = str(uuid.uuid4())
+    ext = Path(file.filename or "").suffix
+    temp_path = folder / f".{name}.part"
     
-    content = await file.read()
-    with open(filepath, "wb") as f:
-        f.write(content)
+    size = 0
+    try:
+        async with aiofiles.open(temp_path, "wb") as f:
+            # The first chunk must be long enough to hold any magic bytes
+            while chunk := await file.read(max(settings.UPLOAD_CHUNK_SIZE, 64)):
+                if rule and size == 0:
+                    ext = rule.check_head(chunk) or ext
+                size += len(chunk)
+                if size > max_size:
+                    raise BadRequestException(f"File size exceeds {max_size} bytes")
+                await f.write(chunk)
+        if rule and size == 0:
+            raise BadRequestException("File is empty")
+        filename = f"{name}{ext}"
+        await aiofiles.os.replace(temp_path, folder / filename)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
     
     return f"/{settings.UPLOAD_DIR}/{subfolder}/{filename}"
 
@@ -0,0 +1,69 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, and_, true, inspect
+from sqlalchemy.sql import ColumnElement
+from typing import Any, Dict, List, Tuple
+
+class AggregateQuery:
+    """Collects named scalar aggregates and runs them as one SELECT.
+
+    Aggregates over the same table are folded into a single scan with FILTER
+    clauses, which suits table-wide statistics. ``scalar`` adds any other one-value
+    expression (a scalar subquery, EXISTS, ...) as its own column; use it for
+    selective lookups such as per-stream counts so they keep using their index.
+
+        stats = await (
+            AggregateQuery()
+            .count("total", User.id)
+            .count("active", User.id, User.status == "active")
+            .execute(db)
+        )
+    """
+
+    def __init__(self):
+        self.groups: Dict[Any, List[Tuple[str, ColumnElement]]] = {}
+        self.scalars: List[Tuple[str, ColumnElement]] = []
+
+    def aggregate(self, name: str, expression: ColumnElement, source, *where) -> "AggregateQuery":
+        """Add an aggregate over ``source`` (a model or table), restricted to rows matching ``where``."""
+        if where:
+            expression = expression.filter(and_(*where))
+        table = inspect(source).local_table if hasattr(source, "__table__") else source
+        self.groups.setdefault(table, []).append((name, expression))
+        return self
+
+    def count(self, name: str, column, *where) -> "AggregateQuery":
+        return self.aggregate(name, func.count(column), column.table, *where)
+
+    def count_distinct(self, name: str, column, *where) -> "AggregateQuery":
+        return self.aggregate(name, func.count(func.distinct(column)), column.table, *where)
+
+    def sum(self, name: str, column, *where) -> "AggregateQuery":
+        return self.aggregate(name, func.sum(column), column.table, *where)
+
+    def scalar(self, name: str, expression) -> "AggregateQuery":
+        if hasattr(expression, "scalar_subquery"):
+            expression = expression.scalar_subquery()
+        self.scalars.append((name, expression))
+        return self
+
+    def statement(self):
+        columns = []
+        froms = []
+        for table, aggregates in self.groups.items():
+            group = select(*[expression.label(name) for name, expression in aggregates]).select_from(table).subquery()
+            froms.append(group)
+            columns.extend(group.c[name] for name, _ in aggregates)
+        columns.extend(expression.label(name) for name, expression in self.scalars)
+
+        stmt = select(*columns)
+        if froms:
+            # Each group yields exactly one row, so joining them ON true keeps a single row
+            joined = froms[0]
+            for group in froms[1:]:
+                joined = joined.join(group, true())
+            stmt = stmt.select_from(joined)
+        return stmt
+
+    async def execute(self, db: AsyncSession) -> Dict[str, Any]:
+        result = await db.execute(self.statement())
+        return dict(result.one()._mapping)
@@ -1,4 +1,6 @@
 from datetime import datetime, timedelta
+import hashlib
+import hmac
 from jose import jwt
 from argon2 import PasswordHasher
 from argon2.exceptions import VerifyMismatchError
@@ -40,3 +42,10 @@ def create_refresh_token(user_id: str) -> str:
 
 def decode_token(token: str) -> dict:
     return jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM])
+
+def create_viewer_token(stream_id: str, viewer_id: int) -> str:
+    """Proof that a viewer session was issued to the holder; required to bind it to a socket."""
+    return hmac.new(settings.JWT_SECRET.encode(), f"viewer:{stream_id}:{viewer_id}".encode(), hashlib.sha256).hexdigest()
+
+def verify_viewer_token(stream_id: str, viewer_id: int, token: str) -> bool:
+    return hmac.compare_digest(create_viewer_token(stream_id, viewer_id), str(token or ""))
@@ -0,0 +1,45 @@
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+import asyncio
+import time
+
+class TTLCache:
+    """In-process cache of computed values.
+
+    Entries expire after ``ttl`` seconds or when invalidated. Concurrent misses for the
+    same key share one load, and a load that was running when the key was invalidated
+    is returned to its callers but not stored.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self.entries: Dict[str, Tuple[float, Any]] = {}
+        self.generations: Dict[str, int] = {}
+        self.locks: Dict[str, asyncio.Lock] = {}
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self.entries.get(key)
+        if entry and time.monotonic() < entry[0]:
+            return entry[1]
+        return None
+
+    async def get_or_load(self, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        lock = self.locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            value = self.get(key)
+            if value is not None:
+                return value
+            generation = self.generations.get(key, 0)
+            value = await loader()
+            if self.generations.get(key, 0) == generation:
+                self.entries[key] = (time.monotonic() + self.ttl, value)
+        return value
+
+    def invalidate(self, key: str = None):
+        keys = list(self.entries) + list(self.locks) if key is None else [key]
+        for name in keys:
+            self.entries.pop(name, None)
+            self.generations[name] = self.generations.get(name, 0) + 1
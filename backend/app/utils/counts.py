@@ -0,0 +1,83 @@
+from sqlalchemy import func, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+from typing import Dict, Optional, Tuple
+import json
+from app.core.config import settings
+from app.utils.cache import TTLCache
+from app.websocket.manager import manager
+
+# How a list endpoint gets its total:
+#   exact     - COUNT(*) with the list's filters
+#   estimated - the planner's row estimate (pg_class.reltuples when unfiltered, EXPLAIN otherwise),
+#               falling back to an exact count when the estimate is under COUNT_EXACT_THRESHOLD
+#   cached    - an exact count kept for COUNT_CACHE_TTL seconds or until the table is written to;
+#               use it for filters with a bounded set of values, not free-text search
+EXACT = "exact"
+ESTIMATED = "estimated"
+CACHED = "cached"
+
+count_caches: Dict[str, TTLCache] = {}
+
+class explain(Executable, ClauseElement):
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+@compiles(explain, "postgresql")
+def _compile_explain(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+def _count_query(query):
+    return query.with_only_columns(func.count(), maintain_column_froms=True).order_by(None)
+
+def _table_name(query) -> str:
+    return query.get_final_froms()[0].name
+
+async def estimate_rows(db: AsyncSession, query) -> Optional[int]:
+    if query.whereclause is None and len(query.get_final_froms()) == 1:
+        reltuples = await db.scalar(
+            text("SELECT reltuples FROM pg_class WHERE oid = to_regclass(:name)"), {"name": _table_name(query)}
+        )
+        # -1 until the table has been analyzed
+        return int(reltuples) if reltuples is not None and reltuples >= 0 else None
+    plan = await db.scalar(explain(query.order_by(None)))
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+async def count_rows(db: AsyncSession, query, strategy: str = EXACT) -> Tuple[int, bool]:
+    """Total rows ``query`` would return under ``strategy``, and whether that total is an estimate."""
+    if strategy == ESTIMATED:
+        estimate = await estimate_rows(db, query)
+        if estimate is not None and estimate >= settings.COUNT_EXACT_THRESHOLD:
+            return estimate, True
+
+    count_query = _count_query(query)
+    if strategy == CACHED:
+        compiled = count_query.compile()
+        key = f"{compiled}:{sorted(compiled.params.items(), key=str)}"
+        cache = count_caches.setdefault(_table_name(query), TTLCache(settings.COUNT_CACHE_TTL))
+        return await cache.get_or_load(key, lambda: db.scalar(count_query)), False
+
+    return await db.scalar(count_query), False
+
+async def invalidate_counts(*tables: str):
+    """Drop cached counts for ``tables`` on this and every other worker; call after writes that add,
+    remove or re-filter rows."""
+    for table in tables:
+        _invalidate_local(table)
+        await manager.publish_event("cache-invalidate", f"counts:{table}", "")
+
+def _invalidate_local(table: str):
+    cache = count_caches.get(table)
+    if cache:
+        cache.invalidate()
+
+def on_remote_invalidate(op: str, target: str, message):
+    if op == "cache-invalidate" and target.startswith("counts:"):
+        _invalidate_local(target[len("counts:"):])
+
+manager.remote_listeners.append(on_remote_invalidate)
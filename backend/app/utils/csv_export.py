@@ -0,0 +1,51 @@
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, Awaitable, Callable, List
+import aiofiles
+import csv
+import io
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+
+async def stream_csv(
+    query,
+    headers: List[str],
+    batch_size: int = None,
+    transform: Callable[[tuple], list] = None,
+    on_rows: Callable[[int], Awaitable[None]] = None
+) -> AsyncIterator[str]:
+    """Yield CSV text one batch of rows at a time, reading ``query`` through a server-side cursor.
+
+    Select only the exported columns; each row is written as-is (None becomes an empty cell)
+    unless ``transform`` maps it to a list of cells. ``on_rows`` is awaited with the running
+    row count after each batch. The export uses its own session so it does not depend on the
+    request's lifetime.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    
+    def drain() -> str:
+        text = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return text
+    
+    writer.writerow(headers)
+    yield drain()
+    
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(query.execution_options(yield_per=batch_size or settings.EXPORT_BATCH_SIZE))
+        written = 0
+        async for rows in result.partitions():
+            writer.writerows(map(transform, rows) if transform else rows)
+            written += len(rows)
+            yield drain()
+            if on_rows:
+                await on_rows(written)
+
+async def write_chunks(path: str, chunks: AsyncIterator[str]):
+    async with aiofiles.open(path, 'w', newline='') as file:
+        async for chunk in chunks:
+            await file.write(chunk)
+
+def csv_response(chunks: AsyncIterator[str], filename: str) -> StreamingResponse:
+    return StreamingResponse(chunks, media_type='text/csv', headers={'Content-Disposition': f'attachment; filename={filename}'})
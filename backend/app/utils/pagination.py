@@ -1,5 +1,15 @@
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
+from datetime import date, datetime
+from decimal import Decimal
 from fastapi import Query
+from sqlalchemy import tuple_, literal
+from sqlalchemy.ext.asyncio import AsyncSession
+import base64
+import binascii
+import json
+import uuid
+from app.core.exceptions import BadRequestException
+from app.utils.counts import count_rows, EXACT
 
 def parse_pagination_params(
     page: int = Query(1, ge=1),
@@ -20,3 +30,75 @@ def format_pagination_response(
         "limit": limit,
         "pages": (total + limit - 1) // limit
     }
+
+def encode_cursor(*values: Any) -> str:
+    """Opaque, URL-safe cursor over the sort key values of the last row returned."""
+    raw = json.dumps([value.isoformat() if isinstance(value, (date, datetime)) else str(value) for value in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> List[str]:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (ValueError, binascii.Error):
+        raise BadRequestException("Invalid cursor")
+    if not isinstance(values, list):
+        raise BadRequestException("Invalid cursor")
+    return values
+
+def _parse_key(key, value: str):
+    # encode_cursor writes every value as a string
+    if not isinstance(value, str):
+        raise TypeError("Cursor values must be strings")
+    python_type = key.type.python_type
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    if python_type in (uuid.UUID, float, int, Decimal):
+        return python_type(value)
+    return value
+
+async def paginate(
+    db: AsyncSession,
+    query,
+    keys: List[Any],
+    page: int = 1,
+    limit: int = 10,
+    cursor: Optional[str] = None,
+    include_total: bool = False,
+    count: str = EXACT
+) -> Dict[str, Any]:
+    """Run ``query`` ordered by ``keys`` descending; the last key must be unique (the primary key).
+
+    With a ``cursor`` the page starts after the row it points at (keyset pagination), so
+    deep pages cost the same as the first and rows do not shift under concurrent inserts.
+    Cursor pages skip the COUNT unless ``include_total`` is set. Without a cursor the
+    response is the usual page/offset shape. Both carry ``next_cursor`` (None on the last page).
+    ``count`` picks how the total is computed (see app.utils.counts); ``estimated`` says
+    whether it is a planner estimate.
+    """
+    rows_query = query
+    query = query.add_columns(*keys).order_by(*[key.desc() for key in keys]).limit(limit + 1)
+    
+    if cursor:
+        values = decode_cursor(cursor)
+        if len(values) != len(keys):
+            raise BadRequestException("Invalid cursor")
+        try:
+            after = [literal(_parse_key(key, value), key.type) for key, value in zip(keys, values)]
+        except (TypeError, ValueError, AttributeError, ArithmeticError):
+            raise BadRequestException("Invalid cursor")
+        query = query.where(tuple_(*keys) < tuple_(*after))
+    else:
+        query = query.offset((page - 1) * limit)
+    
+    rows = (await db.execute(query)).all()
+    data = [row[0] for row in rows[:limit]]
+    next_cursor = encode_cursor(*rows[limit - 1][1:]) if len(rows) > limit else None
+    
+    if cursor:
+        total, estimated = await count_rows(db, rows_query, count) if include_total else (None, False)
+        return {"data": data, "total": total, "estimated": estimated, "limit": limit, "next_cursor": next_cursor}
+    
+    total, estimated = await count_rows(db, rows_query, count)
+    return {**format_pagination_response(data, total, page, limit), "estimated": estimated, "next_cursor": next_cursor}
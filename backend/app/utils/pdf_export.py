@@ -4,11 +4,29 @@ from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
 from reportlab.lib.enums import TA_CENTER, TA_LEFT
+from fastapi.responses import StreamingResponse
+from concurrent.futures import ProcessPoolExecutor
+from typing import AsyncIterator, Optional
 from datetime import datetime
+import multiprocessing
+import tempfile
+import aiofiles
+import aiofiles.os
+import asyncio
 import io
+import os
+from app.core.config import settings
 
-def generate_pdf_report(title: str, headers: list, data: list, filename: str = "report.pdf"):
-    buffer = io.BytesIO()
+# Rows per platypus Table. Splitting one huge Table across pages is quadratic in ReportLab;
+# page-sized tables keep layout linear in the number of rows.
+ROWS_PER_TABLE = 40
+
+def generate_pdf_report(title: str, headers: list, data: list, filename: str = "report.pdf", output=None):
+    """Build the report into ``output`` (a path or binary file); without one, return it in a BytesIO.
+
+    CPU-bound: call ``render_pdf_report`` from request handlers instead.
+    """
+    buffer = output or io.BytesIO()
     doc = SimpleDocTemplate(buffer, pagesize=letter, topMargin=0.5*inch, bottomMargin=0.5*inch)
     elements = []
     styles = getSampleStyleSheet()
@@ -26,11 +44,8 @@ def generate_pdf_report(title: str, headers: list, data: list, filename: str = "
     elements.append(Paragraph(title, title_style))
     elements.append(Spacer(1, 0.2*inch))
     
-    table_data = [headers] + data
     col_widths = [letter[0] / len(headers)] * len(headers)
-    table = Table(table_data, colWidths=col_widths)
-    
-    table.setStyle(TableStyle([
+    table_style = TableStyle([
         ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#4a5568')),
         ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
         ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
@@ -46,9 +61,12 @@ def generate_pdf_report(title: str, headers: list, data: list, filename: str = "
         ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
         ('LEFTPADDING', (0, 0), (-1, -1), 8),
         ('RIGHTPADDING', (0, 0), (-1, -1), 8),
-    ]))
+    ])
     
-    elements.append(table)
+    for start in range(0, max(len(data), 1), ROWS_PER_TABLE):
+        table = Table([headers] + data[start:start + ROWS_PER_TABLE], colWidths=col_widths, repeatRows=1)
+        table.setStyle(table_style)
+        elements.append(table)
     elements.append(Spacer(1, 0.3*inch))
     
     footer_style = ParagraphStyle(
@@ -61,5 +79,54 @@ def generate_pdf_report(title: str, headers: list, data: list, filename: str = "
     elements.append(Paragraph(f"Generated on {datetime.now().strftime('%B %d, %Y at %I:%M %p')}", footer_style))
     
     doc.build(elements)
-    buffer.seek(0)
-    return buffer
+    if output is None:
+        buffer.seek(0)
+        return buffer
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # spawn: workers start clean instead of forking the event loop and open DB connections
+        _pool = ProcessPoolExecutor(max_workers=settings.PDF_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    return _pool
+
+async def render_pdf_report(title: str, headers: list, data: list, path: str = None) -> str:
+    """Build the report in a worker process into ``path``, or a temp file the caller removes; returns the path."""
+    if path is None:
+        fd, path = tempfile.mkstemp(prefix="report-", suffix=".pdf")
+        os.close(fd)
+    future = _get_pool().submit(generate_pdf_report, title, headers, data, None, path)
+    try:
+        await asyncio.wrap_future(future)
+    except BaseException:
+        # On cancellation the worker may still be writing; remove the file once it has actually stopped
+        future.add_done_callback(lambda _: _remove(path))
+        raise
+    return path
+
+def _remove(path: str):
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+async def stream_file(path: str, delete: bool = False, chunk_size: int = 64 * 1024) -> AsyncIterator[bytes]:
+    try:
+        async with aiofiles.open(path, 'rb') as file:
+            while chunk := await file.read(chunk_size):
+                yield chunk
+    finally:
+        if delete:
+            await aiofiles.os.remove(path)
+
+def pdf_response(path: str, filename: str, delete: bool = True) -> StreamingResponse:
+    return StreamingResponse(
+        stream_file(path, delete), media_type='application/pdf',
+        headers={'Content-Disposition': f'attachment; filename={filename}'}
+    )
+
+async def shutdown():
+    if _pool:
+        _pool.shutdown(cancel_futures=True)
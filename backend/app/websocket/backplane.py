@@ -0,0 +1,115 @@
+from typing import Awaitable, Callable, List, Optional, Tuple
+import asyncio
+import asyncpg
+from app.core.config import settings
+
+EnvelopeHandler = Callable[[str], Awaitable[None]]
+
+# Postgres rejects NOTIFY payloads of 8000 bytes or more
+MAX_NOTIFY_PAYLOAD = 7999
+
+def pack_envelope(origin: str, op: str, target: str, message_type: Optional[str], text: str) -> str:
+    # Encoded JSON never contains a raw newline, so the header can be newline separated
+    return f"{origin}\n{op}\n{target}\n{message_type or ''}\n{text}"
+
+def unpack_envelope(envelope: str) -> Tuple[str, str, str, Optional[str], str]:
+    origin, op, target, message_type, text = envelope.split("\n", 4)
+    return origin, op, target, message_type or None, text
+
+class Backplane:
+    """Carries WebSocket broadcasts between worker processes."""
+
+    async def start(self, handler: EnvelopeHandler):
+        raise NotImplementedError
+
+    async def publish(self, envelope: str):
+        raise NotImplementedError
+
+    async def stop(self):
+        pass
+
+class InMemoryBackplane(Backplane):
+    """Hub shared by every manager in one process; used for single-worker runs and local testing."""
+
+    def __init__(self):
+        self.handlers: List[EnvelopeHandler] = []
+
+    async def start(self, handler: EnvelopeHandler):
+        self.handlers.append(handler)
+
+    async def publish(self, envelope: str):
+        for handler in list(self.handlers):
+            await handler(envelope)
+
+    async def stop(self):
+        self.handlers.clear()
+
+class PostgresBackplane(Backplane):
+    """LISTEN/NOTIFY backplane so every uvicorn worker and node sees every broadcast."""
+
+    def __init__(self, dsn: str, channel: str = "church_ws"):
+        self.dsn = dsn
+        self.channel = channel
+        self.handler: Optional[EnvelopeHandler] = None
+        self.listen_conn: Optional[asyncpg.Connection] = None
+        self.pool: Optional[asyncpg.Pool] = None
+        self.inbox: asyncio.Queue = asyncio.Queue()
+        self.consumer: Optional[asyncio.Task] = None
+        self.reconnect_delay = 2
+
+    async def start(self, handler: EnvelopeHandler):
+        self.handler = handler
+        self.pool = await asyncpg.create_pool(self.dsn, min_size=1, max_size=2)
+        await self._listen()
+        self.consumer = asyncio.create_task(self._consume())
+
+    async def _listen(self):
+        self.listen_conn = await asyncpg.connect(self.dsn)
+        await self.listen_conn.add_listener(self.channel, self._on_notify)
+        self.listen_conn.add_termination_listener(self._on_terminated)
+
+    def _on_notify(self, connection, pid, channel, payload):
+        self.inbox.put_nowait(payload)
+
+    def _on_terminated(self, connection):
+        asyncio.create_task(self._reconnect())
+
+    async def _reconnect(self):
+        while True:
+            await asyncio.sleep(self.reconnect_delay)
+            try:
+                await self._listen()
+                print("WebSocket backplane reconnected")
+                return
+            except Exception as e:
+                print(f"WebSocket backplane reconnect failed: {e}")
+
+    async def _consume(self):
+        while True:
+            envelope = await self.inbox.get()
+            try:
+                await self.handler(envelope)
+            except Exception as e:
+                print(f"WebSocket backplane handler error: {e}")
+
+    async def publish(self, envelope: str):
+        if len(envelope.encode()) > MAX_NOTIFY_PAYLOAD:
+            print(f"WebSocket backplane payload too large ({len(envelope)} chars), delivered to this worker only")
+            return
+        async with self.pool.acquire() as conn:
+            await conn.execute("SELECT pg_notify($1, $2)", self.channel, envelope)
+
+    async def stop(self):
+        if self.consumer:
+            self.consumer.cancel()
+        if self.listen_conn and not self.listen_conn.is_closed():
+            self.listen_conn.remove_termination_listener(self._on_terminated)
+            await self.listen_conn.close()
+        if self.pool:
+            await self.pool.close()
+
+def create_backplane(name: str = None) -> Backplane:
+    name = name or settings.WS_BACKPLANE
+    if name == "postgres":
+        return PostgresBackplane(settings.DATABASE_URL)
+    return InMemoryBackplane()
@@ -0,0 +1,144 @@
+from sqlalchemy import insert
+from sqlalchemy.exc import DataError, DBAPIError, IntegrityError
+from typing import List, Optional
+from datetime import datetime
+import asyncio
+import uuid
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.livestream import ChatMessage
+
+USER_NAME_LENGTH = ChatMessage.__table__.c.user_name.type.length
+
+class ChatWriteBuffer:
+    """Write-behind buffer for live chat.
+
+    Messages get their id and timestamp here so they can be broadcast right away;
+    rows are written to chat_messages in multi-row INSERTs when a batch fills up or
+    the flush interval passes. When the buffer is full, ``add`` waits for a flush.
+    ``add`` raises ValueError for a message that could never be written, and rows the
+    database still rejects are dropped one by one so they cannot hold up the rest.
+    """
+
+    def __init__(self):
+        self.pending: List[dict] = []
+        self.batch_size = settings.CHAT_FLUSH_BATCH_SIZE
+        self.flush_interval = settings.CHAT_FLUSH_INTERVAL
+        self.max_pending = settings.CHAT_BUFFER_LIMIT
+        self.wake = asyncio.Event()
+        self.has_room = asyncio.Event()
+        self.has_room.set()
+        self.lock = asyncio.Lock()
+        self.task: Optional[asyncio.Task] = None
+
+    async def add(self, livestream_id: str, user_name: str, text: str, user_id: str = None) -> dict:
+        try:
+            livestream_id = uuid.UUID(str(livestream_id))
+        except ValueError:
+            raise ValueError("Invalid stream id")
+        if not isinstance(user_name, str) or not user_name.strip():
+            raise ValueError("Invalid user name")
+        if not isinstance(text, str) or not text.strip():
+            raise ValueError("Invalid message text")
+        try:
+            user_id = uuid.UUID(str(user_id)) if user_id else None
+        except ValueError:
+            user_id = None
+
+        while len(self.pending) >= self.max_pending:
+            self.has_room.clear()
+            self.wake.set()
+            await self.has_room.wait()
+
+        row = {
+            "id": uuid.uuid4(),
+            "livestream_id": livestream_id,
+            "user_id": user_id,
+            # Postgres text cannot hold NUL, and user_name is a String(255)
+            "user_name": user_name.replace("\x00", "")[:USER_NAME_LENGTH],
+            "text": text.replace("\x00", ""),
+            "created_at": datetime.utcnow()
+        }
+        self.pending.append(row)
+        if len(self.pending) >= self.batch_size:
+            self.wake.set()
+        return row
+
+    def discard(self, message_id: str) -> Optional[dict]:
+        """Drop a message that has not been written yet, e.g. when it is moderated."""
+        for index, row in enumerate(self.pending):
+            if str(row["id"]) == str(message_id):
+                return self.pending.pop(index)
+        return None
+
+    async def flush(self):
+        async with self.lock:
+            while self.pending:
+                batch = self.pending[:self.batch_size]
+                del self.pending[:self.batch_size]
+                try:
+                    await self._write(batch)
+                except BaseException:
+                    self.pending[:0] = batch
+                    raise
+                finally:
+                    if len(self.pending) < self.max_pending:
+                        self.has_room.set()
+
+    async def _write(self, batch: List[dict]):
+        async with AsyncSessionLocal() as db:
+            try:
+                await db.execute(insert(ChatMessage).values(batch))
+                await db.commit()
+                return
+            except DBAPIError:
+                await db.rollback()
+
+            # One bad row (e.g. a deleted livestream) must not block the rest of the batch
+            for index, row in enumerate(batch):
+                try:
+                    await db.execute(insert(ChatMessage).values(row))
+                    await db.commit()
+                except (IntegrityError, DataError) as e:
+                    await db.rollback()
+                    print(f"Dropping chat message {row['id']}: {e.orig}")
+                except BaseException:
+                    # Anything else is not the row's fault; flush re-queues what is left
+                    del batch[:index]
+                    raise
+
+    async def run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self.wake.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self.wake.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"Chat flush error: {e}")
+
+    def start(self):
+        self.task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+        await self.flush()
+
+def serialize_chat_message(row: dict) -> dict:
+    return {
+        "id": str(row["id"]),
+        "livestream_id": str(row["livestream_id"]),
+        "user_id": str(row["user_id"]) if row["user_id"] else None,
+        "user_name": row["user_name"],
+        "text": row["text"],
+        "created_at": row["created_at"].isoformat()
+    }
+
+chat_buffer = ChatWriteBuffer()
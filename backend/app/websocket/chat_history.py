@@ -0,0 +1,110 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from typing import Deque, Dict, List, Optional
+from collections import OrderedDict, deque
+import asyncio
+from app.core.config import settings
+from app.models.livestream import ChatMessage
+from app.websocket.chat_buffer import chat_buffer, serialize_chat_message
+
+def chat_message_to_dict(message: ChatMessage) -> dict:
+    return serialize_chat_message({
+        "id": message.id,
+        "livestream_id": message.livestream_id,
+        "user_id": message.user_id,
+        "user_name": message.user_name,
+        "text": message.text,
+        "created_at": message.created_at
+    })
+
+class ChatHistory:
+    """Ring buffer of the most recent chat messages per stream, oldest first.
+
+    A stream is loaded from the database (plus messages still waiting in the write
+    buffer) the first time it is read; after that it is kept current by the chat
+    path and moderation deletes.
+    """
+
+    def __init__(self):
+        self.capacity = settings.CHAT_HISTORY_SIZE
+        self.max_streams = 20
+        self.streams: "OrderedDict[str, Deque[dict]]" = OrderedDict()
+        self.complete: Dict[str, bool] = {}
+        self.loading: Dict[str, Deque[dict]] = {}
+        self.locks: Dict[str, asyncio.Lock] = {}
+
+    def append(self, stream_id: str, message: dict):
+        stream_id = str(stream_id)
+        messages = self.streams.get(stream_id)
+        if messages is None:
+            messages = self.loading.get(stream_id)
+        if messages is not None:
+            if len(messages) == messages.maxlen:
+                # The oldest message now only exists in the database
+                self.complete[stream_id] = False
+            messages.append(message)
+
+    def remove(self, stream_id: str, message_id: str):
+        messages = self.streams.get(str(stream_id))
+        if messages is None:
+            return
+        for message in messages:
+            if message["id"] == str(message_id):
+                messages.remove(message)
+                return
+
+    def drop(self, stream_id: str):
+        self.streams.pop(str(stream_id), None)
+        self.complete.pop(str(stream_id), None)
+        self.locks.pop(str(stream_id), None)
+
+    async def _load(self, db: AsyncSession, stream_id: str):
+        # Messages appended while the query runs land in this deque and are merged below
+        messages = self.loading[stream_id] = deque(maxlen=self.capacity)
+        try:
+            result = await db.execute(
+                select(ChatMessage)
+                .where(ChatMessage.livestream_id == stream_id)
+                .order_by(ChatMessage.created_at.desc(), ChatMessage.id.desc())
+                .limit(self.capacity)
+            )
+            rows = result.scalars().all()
+        finally:
+            self.loading.pop(stream_id, None)
+
+        merged = {message["id"]: message for message in map(chat_message_to_dict, rows)}
+        for row in chat_buffer.pending:
+            if str(row["livestream_id"]) == stream_id:
+                merged.setdefault(str(row["id"]), serialize_chat_message(row))
+        for message in messages:
+            merged.setdefault(message["id"], message)
+
+        ordered = sorted(merged.values(), key=lambda message: (message["created_at"], message["id"]))
+        self.streams[stream_id] = deque(ordered, maxlen=self.capacity)
+        self.complete[stream_id] = len(rows) < self.capacity and len(ordered) <= self.capacity
+
+        while len(self.streams) > self.max_streams:
+            oldest, _ = self.streams.popitem(last=False)
+            self.complete.pop(oldest, None)
+            self.locks.pop(oldest, None)
+
+    async def recent(self, db: AsyncSession, stream_id: str, limit: int) -> Optional[List[dict]]:
+        """Newest-first messages, or None when the buffer cannot answer and the caller should query the DB."""
+        stream_id = str(stream_id)
+        if limit > self.capacity:
+            return None
+
+        if stream_id not in self.streams:
+            lock = self.locks.setdefault(stream_id, asyncio.Lock())
+            async with lock:
+                if stream_id not in self.streams:
+                    await self._load(db, stream_id)
+        else:
+            self.streams.move_to_end(stream_id)
+
+        messages = self.streams[stream_id]
+        if len(messages) < limit and not self.complete.get(stream_id):
+            return None
+        return list(reversed(messages))[:limit]
+
+chat_history = ChatHistory()
@@ -0,0 +1,36 @@
+import json
+from typing import Callable, Optional
+from app.core.config import settings
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+class EncodedMessage:
+    """A WebSocket message serialized once and shared by every recipient."""
+
+    __slots__ = ("text", "type")
+
+    def __init__(self, text: str, type: Optional[str] = None):
+        self.text = text
+        self.type = type
+
+def _dumps_json(message: dict) -> str:
+    return json.dumps(message, separators=(",", ":"), default=str)
+
+def _dumps_orjson(message: dict) -> str:
+    return orjson.dumps(message, default=str).decode()
+
+def get_encoder(name: str) -> Callable[[dict], str]:
+    if name == "orjson":
+        if orjson is None:
+            print("orjson is not installed, falling back to json for WebSocket messages")
+            return _dumps_json
+        return _dumps_orjson
+    return _dumps_json
+
+dumps = get_encoder(settings.WS_JSON_ENCODER)
+
+def encode_message(message: dict) -> EncodedMessage:
+    return EncodedMessage(dumps(message), message.get("type"))
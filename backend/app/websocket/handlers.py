@@ -1,48 +1,22 @@
 from fastapi import WebSocket, WebSocketDisconnect
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from typing import List
+from app.core.database import AsyncSessionLocal
 from app.websocket.manager import manager
-from app.models.livestream import Livestream, ChatMessage
-from app.models.stream import StreamViewer
+from app.websocket.encoding import encode_message
+from app.websocket.stats import stats_engine
+from app.websocket.chat_buffer import chat_buffer, serialize_chat_message
+from app.websocket.chat_history import chat_history
+from app.websocket.presence import presence
+from app.utils.auth import verify_viewer_token
 import json
 import asyncio
-from datetime import datetime
 
-async def get_stream_stats(db: AsyncSession, stream_id: str):
-    result = await db.execute(
-        select(
-            Livestream.is_live,
-            Livestream.start_time,
-            func.coalesce(func.count(StreamViewer.id).filter(StreamViewer.status == 'active'), 0).label('current_viewers'),
-            func.coalesce(Livestream.viewers, 0).label('peak_viewers'),
-            func.coalesce(func.count(ChatMessage.id), 0).label('chat_messages')
-        )
-        .outerjoin(StreamViewer, StreamViewer.livestream_id == Livestream.id)
-        .outerjoin(ChatMessage, ChatMessage.livestream_id == Livestream.id)
-        .where(Livestream.id == stream_id)
-        .group_by(Livestream.id, Livestream.start_time)
-    )
-    row = result.first()
-    
-    if not row or not row.is_live:
-        return None
-    
-    duration = 0
-    if row.start_time:
-        duration = int((datetime.utcnow() - row.start_time).total_seconds())
-    
-    return {
-        "current_viewers": int(row.current_viewers),
-        "peak_viewers": int(row.peak_viewers),
-        "duration": duration,
-        "chat_messages": int(row.chat_messages),
-        "is_live": row.is_live
-    }
+# Keeps each replicated "viewer-kicked" message under the Postgres NOTIFY payload limit
+KICK_BATCH_SIZE = 150
 
-async def handle_websocket(websocket: WebSocket, db: AsyncSession):
+async def handle_websocket(websocket: WebSocket):
+    # No session is held for the socket's lifetime; the few lookups below borrow one briefly
     await websocket.accept()
-    stream_id = None
-    user_id = None
     
     try:
         while True:
@@ -51,7 +25,7 @@ async def handle_websocket(websocket: WebSocket, db: AsyncSession):
             manager.update_activity(websocket)
             
             if message["type"] == "ping":
-                await websocket.send_json({"type": "pong"})
+                await manager.send_personal(websocket, {"type": "pong"})
             
             elif message["type"] == "subscribe-stream-status":
                 manager.connect_stream_status(websocket)
@@ -60,33 +34,45 @@ async def handle_websocket(websocket: WebSocket, db: AsyncSession):
                 stream_id = message["streamId"]
                 connected = await manager.connect_stream(websocket, stream_id)
                 if connected:
-                    stats = await get_stream_stats(db, stream_id)
+                    stats = stats_engine.published_snapshot(stream_id)
+                    if stats is None:
+                        async with AsyncSessionLocal() as db:
+                            stats = await stats_engine.get_snapshot(db, stream_id)
                     if stats:
-                        await websocket.send_json({"type": "stats", "stats": stats})
+                        await manager.send_personal(websocket, {"type": "stats", "stats": stats})
             
             elif message["type"] == "chat-message" and message.get("streamId"):
-                chat_msg = ChatMessage(
-                    livestream_id=message["streamId"],
-                    user_id=message.get("userId"),
-                    user_name=message["userName"],
-                    text=message["text"]
-                )
-                db.add(chat_msg)
-                await db.commit()
-                await db.refresh(chat_msg)
+                try:
+                    chat_msg = await chat_buffer.add(
+                        livestream_id=message["streamId"],
+                        user_id=message.get("userId"),
+                        user_name=message.get("userName"),
+                        text=message.get("text")
+                    )
+                except ValueError as e:
+                    await manager.send_personal(websocket, {"type": "error", "message": str(e)})
+                    continue
+                payload = serialize_chat_message(chat_msg)
+                stats_engine.chat_message_added(message["streamId"])
+                chat_history.append(message["streamId"], payload)
                 
                 await manager.broadcast_to_stream(
                     message["streamId"],
-                    {"type": "new-message", "message": {
-                        "id": str(chat_msg.id),
-                        "livestream_id": str(chat_msg.livestream_id),
-                        "user_id": str(chat_msg.user_id) if chat_msg.user_id else None,
-                        "user_name": chat_msg.user_name,
-                        "text": chat_msg.text,
-                        "created_at": chat_msg.created_at.isoformat()
-                    }}
+                    {"type": "new-message", "message": payload}
                 )
             
+            elif message["type"] == "watch" and message.get("streamId") and message.get("viewerId"):
+                # Only the client the viewer session was issued to may tie it to its socket
+                try:
+                    viewer_id = int(message["viewerId"])
+                except (TypeError, ValueError):
+                    viewer_id = None
+                if viewer_id is None or not verify_viewer_token(str(message["streamId"]), viewer_id, message.get("viewerToken")):
+                    await manager.send_personal(websocket, {"type": "error", "message": "Invalid viewer"})
+                    continue
+                async with AsyncSessionLocal() as db:
+                    await presence.bind(db, websocket, message["streamId"], viewer_id)
+            
             elif message["type"] == "subscribe-notifications" and message.get("userId"):
                 user_id = message["userId"]
                 manager.connect_notifications(websocket, user_id)
@@ -94,11 +80,8 @@ async def handle_websocket(websocket: WebSocket, db: AsyncSession):
     except WebSocketDisconnect:
         pass
     finally:
-        if stream_id:
-            manager.disconnect_stream(websocket, stream_id)
-        manager.disconnect_stream_status(websocket)
-        if user_id:
-            manager.disconnect_notifications(websocket, user_id)
+        manager.disconnect(websocket)
+        await presence.release(websocket)
 
 async def broadcast_stream_status_change():
     await manager.broadcast_stream_status({"type": "stream-status-change"})
@@ -112,33 +95,44 @@ async def broadcast_viewers_update():
 async def broadcast_viewer_kicked(user_id: str):
     await manager.broadcast_stream_status({"type": "viewer-kicked", "userId": user_id})
 
+async def broadcast_viewers_kicked(user_ids: List[str]):
+    for start in range(0, len(user_ids), KICK_BATCH_SIZE):
+        await manager.broadcast_stream_status({"type": "viewer-kicked", "userIds": user_ids[start:start + KICK_BATCH_SIZE]})
+
+async def broadcast_chat_message_deleted(stream_id: str, message_id: str):
+    await manager.broadcast_to_stream(stream_id, {"type": "chat-message-deleted", "messageId": str(message_id)})
+
 async def broadcast_notification(user_id: str):
     await manager.send_notification(user_id, {"type": "new-notification"})
 
 async def broadcast_to_all_users():
     await manager.broadcast_notifications({"type": "new-notification"})
 
-async def stats_broadcast_task(db: AsyncSession):
-    for stream_id in list(manager.stream_subscriptions.keys()):
-        stats = await get_stream_stats(db, stream_id)
-        if stats:
-            await manager.broadcast_to_stream(stream_id, {"type": "stats", "stats": stats})
+def on_remote_broadcast(op: str, target: str, message):
+    # Keep this worker's chat history and counters in step with chat handled by other workers
+    if op != "stream" or message.type not in ("new-message", "chat-message-deleted"):
+        return
+    data = json.loads(message.text)
+    if message.type == "new-message":
+        stats_engine.chat_message_added(target)
+        chat_history.append(target, data["message"])
+    else:
+        stats_engine.chat_message_removed(target)
+        chat_history.remove(target, data["messageId"])
+
+manager.remote_listeners.append(on_remote_broadcast)
+
+async def stats_broadcast_task():
+    messages = await stats_engine.tick(list(manager.stream_subscriptions.keys()))
+    for stream_id, message in messages.items():
+        await manager.broadcast_to_stream(stream_id, message, local=True)
 
 async def heartbeat_task():
+    # Each socket is pinged every manager.heartbeat_interval; ticking every second spreads the pings out
+    ping = encode_message({"type": "ping"})
     while True:
-        await asyncio.sleep(30)
-        all_websockets = set()
-        for clients in manager.stream_subscriptions.values():
-            all_websockets.update(clients)
-        all_websockets.update(manager.stream_status_subscribers)
-        for clients in manager.notification_subscribers.values():
-            all_websockets.update(clients)
-        
-        for ws in all_websockets:
-            try:
-                await ws.send_json({"type": "ping"})
-            except:
-                pass
+        await asyncio.sleep(1)
+        manager.send_heartbeats(ping)
 
 async def cleanup_task():
     while True:
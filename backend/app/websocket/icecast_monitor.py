@@ -0,0 +1,84 @@
+from typing import Deque, List, Optional
+from collections import deque
+from datetime import datetime
+import asyncio
+from app.core.config import settings
+from app.services.icecast_service import icecast_service
+from app.websocket.encoding import encode_message
+from app.websocket.manager import manager
+
+class IcecastSample:
+    __slots__ = ("at", "reachable", "source_connected", "listeners")
+
+    def __init__(self, at: datetime, reachable: bool, source_connected: bool, listeners: int):
+        self.at = at
+        self.reachable = reachable
+        self.source_connected = source_connected
+        self.listeners = listeners
+
+    def state(self) -> tuple:
+        return self.reachable, self.source_connected, self.listeners
+
+    def as_dict(self) -> dict:
+        return {
+            "at": self.at.isoformat(),
+            "connected": self.reachable,
+            "source_connected": self.source_connected,
+            "listeners": self.listeners
+        }
+
+class IcecastMonitor:
+    """Samples Icecast every ``poll_interval`` seconds and keeps the recent history in memory.
+
+    Each worker polls for its own sockets; a change in reachability, source state or
+    listener count is pushed to stream-status subscribers as ``icecast-status``.
+    """
+
+    def __init__(self):
+        self.poll_interval = settings.ICECAST_POLL_INTERVAL
+        self.samples: Deque[IcecastSample] = deque(maxlen=settings.ICECAST_HISTORY_SIZE)
+        self.task: Optional[asyncio.Task] = None
+
+    @property
+    def latest(self) -> Optional[IcecastSample]:
+        return self.samples[-1] if self.samples else None
+
+    async def sample(self) -> IcecastSample:
+        status = await icecast_service.get_status(max_age=0)
+        sample = IcecastSample(datetime.utcnow(), status.reachable, status.source_connected, status.listeners)
+        previous = self.latest
+        self.samples.append(sample)
+        if previous is None or previous.state() != sample.state():
+            manager.deliver_stream_status(encode_message({"type": "icecast-status", "status": sample.as_dict()}))
+        return sample
+
+    async def current(self) -> IcecastSample:
+        """Latest sample, polling once if the monitor has not produced one yet."""
+        return self.latest or await self.sample()
+
+    def history(self, limit: int = None) -> List[dict]:
+        samples = list(self.samples)
+        if limit:
+            samples = samples[-limit:]
+        return [sample.as_dict() for sample in samples]
+
+    async def run(self):
+        while True:
+            try:
+                await self.sample()
+            except Exception as e:
+                print(f"Icecast poll error: {e}")
+            await asyncio.sleep(self.poll_interval)
+
+    def start(self):
+        self.task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+
+icecast_monitor = IcecastMonitor()
@@ -1,124 +1,409 @@
 from fastapi import WebSocket
-from typing import Dict, Set
-import json
+from typing import Callable, Deque, Dict, List, Optional, Sequence, Set, Tuple, Union
+from collections import deque
+import time
+import uuid
 import asyncio
-from datetime import datetime, timedelta
+from app.core.config import settings
+from app.websocket.encoding import EncodedMessage, encode_message
+from app.websocket.backplane import Backplane, create_backplane, pack_envelope, unpack_envelope
+from app.websocket.registry import DeadlineQueue
 
-class ConnectionManager:
+# (kind, key) pairs recorded per socket: ("stream", stream_id), ("status", ""), ("notifications", user_id)
+Subscription = Tuple[str, str]
+
+# Message types where only the latest queued copy matters to a client
+COALESCE_TYPES = {"stats", "ping", "viewers-update", "stream-update", "stream-status-change", "new-notification", "icecast-status"}
+
+class BroadcastLatency:
     def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.last = 0.0
+
+    def record(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        self.last = seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def as_dict(self) -> dict:
+        return {
+            "messages": self.count,
+            "avg_ms": round(self.total / self.count * 1000, 3) if self.count else 0,
+            "max_ms": round(self.max * 1000, 3),
+            "last_ms": round(self.last * 1000, 3)
+        }
+
+class ClientConnection:
+    """Bounded outbound queue for one socket, drained by its own writer task.
+
+    Entries are ``(key, payload, channel, enqueued_at)``; one tuple is shared by every socket
+    in a fan-out. Coalescible entries get a per-socket list instead, which is blanked in place
+    (payload None) when a newer copy arrives, and ``slots`` maps each type to its live entry,
+    so replacing a queued copy never scans the queue.
+    """
+
+    def __init__(self, websocket: WebSocket, manager: "ConnectionManager"):
+        self.websocket = websocket
+        self.manager = manager
+        self.buffer: Deque[Sequence] = deque()
+        self.slots: Dict[str, list] = {}
+        self.size = 0
+        self.waiter: Optional[asyncio.Future] = None
+        self.closed = False
+        self.dropped = 0
+        self.closer: Optional[asyncio.Task] = None
+        self.writer = asyncio.create_task(self.run())
+
+    def enqueue(self, payload: str, channel: str, key: Optional[str] = None) -> bool:
+        """Queue a pre-serialized payload. Returns False when the socket should be dropped."""
+        return self.push((key, payload, channel, time.perf_counter()))
+
+    def push(self, entry: Tuple[Optional[str], str, str, float]) -> bool:
+        if self.closed:
+            return False
+
+        manager = self.manager
+        policy = manager.slow_consumer_policy
+        key = entry[0]
+        coalesce = key is not None and policy == "coalesce"
+
+        if coalesce:
+            entry = list(entry)
+            queued = self.slots.get(key)
+            if queued is not None:
+                # Re-queue at the back so the newer copy keeps its place after anything queued since
+                queued[1] = None
+                self.size -= 1
+                manager.dropped_messages += 1
+
+        if self.size >= manager.send_queue_size:
+            if policy == "disconnect":
+                self.drop()
+                return False
+            self._drop_oldest()
+
+        self.buffer.append(entry)
+        self.size += 1
+        if coalesce:
+            self.slots[key] = entry
+        waiter = self.waiter
+        if waiter is not None and not waiter.done():
+            waiter.set_result(None)
+        return True
+
+    def _drop_oldest(self):
+        while self.buffer:
+            entry = self.buffer.popleft()
+            if entry[1] is not None:
+                self._taken(entry)
+                self.dropped += 1
+                self.manager.dropped_messages += 1
+                return
+
+    def _taken(self, entry: Sequence):
+        self.size -= 1
+        key = entry[0]
+        if key is not None and self.slots.get(key) is entry:
+            del self.slots[key]
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        manager = self.manager
+        buffer = self.buffer
+        try:
+            while True:
+                if not buffer:
+                    self.waiter = loop.create_future()
+                    await self.waiter
+                    self.waiter = None
+                while buffer:
+                    entry = buffer.popleft()
+                    key, payload, channel, enqueued_at = entry
+                    if payload is None:
+                        continue
+                    self.size -= 1
+                    if key is not None and self.slots.get(key) is entry:
+                        del self.slots[key]
+                    await self.websocket.send_text(payload)
+                    manager.record_latency(channel, time.perf_counter() - enqueued_at)
+        except asyncio.CancelledError:
+            pass
+        except Exception:
+            self.closed = True
+
+    def close(self):
+        self.closed = True
+        self.buffer.clear()
+        self.slots.clear()
+        self.size = 0
+        if not self.writer.done():
+            self.writer.cancel()
+
+    def drop(self):
+        """Stop writing and close the socket (1013 try again later) so the client reconnects."""
+        self.close()
+        if self.closer is None:
+            self.closer = asyncio.create_task(self._close_socket())
+
+    async def _close_socket(self):
+        try:
+            await self.websocket.close(code=1013)
+        except Exception:
+            pass
+
+class ConnectionManager:
+    def __init__(self, backplane: Backplane = None):
         self.stream_subscriptions: Dict[str, Set[WebSocket]] = {}
         self.stream_status_subscribers: Set[WebSocket] = set()
         self.notification_subscribers: Dict[str, Set[WebSocket]] = {}
         self.max_connections_per_stream = 1000
-        self.connection_timeout = timedelta(minutes=5)
-        self.last_activity: Dict[WebSocket, datetime] = {}
+        # Reverse index so a socket can be removed without scanning every subscription set
+        self.subscriptions: Dict[WebSocket, Set[Subscription]] = {}
+        self.connection_timeout = 5 * 60
+        self.heartbeat_interval = 30
+        self.last_activity: Dict[WebSocket, float] = {}
+        self.expiry = DeadlineQueue()
+        self.heartbeats = DeadlineQueue()
+        self.connections: Dict[WebSocket, ClientConnection] = {}
+        self.send_queue_size = settings.WS_SEND_QUEUE_SIZE
+        self.slow_consumer_policy = settings.WS_SLOW_CONSUMER_POLICY
+        self.latency: Dict[str, BroadcastLatency] = {}
+        self.dropped_messages = 0
+        self.node_id = uuid.uuid4().hex[:12]
+        self.backplane = backplane or create_backplane()
+        # Called with (op, target, message) for broadcasts that originated on another worker
+        self.remote_listeners: List[Callable[[str, str, EncodedMessage], None]] = []
+
+    async def start(self):
+        await self.backplane.start(self.on_backplane_message)
+
+    async def stop(self):
+        await self.backplane.stop()
+
+    async def _publish(self, op: str, target: str, message: EncodedMessage):
+        try:
+            await self.backplane.publish(pack_envelope(self.node_id, op, target, message.type, message.text))
+        except Exception as e:
+            print(f"WebSocket backplane publish error: {e}")
+
+    async def publish_event(self, op: str, target: str, data: str):
+        """Send non-socket state (e.g. presence) to the other workers' remote listeners."""
+        await self._publish(op, target, EncodedMessage(data))
+
+    async def on_backplane_message(self, envelope: str):
+        origin, op, target, message_type, text = unpack_envelope(envelope)
+        if origin == self.node_id:
+            return
+        message = EncodedMessage(text, message_type)
+        if op == "stream":
+            self.deliver_to_stream(target, message)
+        elif op == "stream-status":
+            self.deliver_stream_status(message)
+        elif op == "notification":
+            self.deliver_notification(target, message)
+        elif op == "notifications":
+            self.deliver_notifications(message)
+        for listener in self.remote_listeners:
+            listener(op, target, message)
+
+    def get_connection(self, websocket: WebSocket) -> ClientConnection:
+        connection = self.connections.get(websocket)
+        if connection is None:
+            connection = ClientConnection(websocket, self)
+            self.connections[websocket] = connection
+        return connection
+
+    def disconnect(self, websocket: WebSocket):
+        """Remove every subscription the socket holds and stop its writer."""
+        for kind, key in self.subscriptions.pop(websocket, ()):
+            if kind == "stream":
+                self._discard(self.stream_subscriptions, key, websocket)
+            elif kind == "notifications":
+                self._discard(self.notification_subscribers, key, websocket)
+            else:
+                self.stream_status_subscribers.discard(websocket)
+        self._forget(websocket)
+        connection = self.connections.pop(websocket, None)
+        if connection:
+            connection.close()
+
+    @staticmethod
+    def _discard(index: Dict[str, Set[WebSocket]], key: str, websocket: WebSocket):
+        clients = index.get(key)
+        if clients is not None:
+            clients.discard(websocket)
+            if not clients:
+                del index[key]
+
+    def _track(self, websocket: WebSocket, subscription: Subscription):
+        subscriptions = self.subscriptions.get(websocket)
+        if subscriptions is None:
+            subscriptions = self.subscriptions[websocket] = set()
+            now = time.monotonic()
+            self.expiry.schedule(websocket, now + self.connection_timeout)
+            self.heartbeats.schedule(websocket, now + self.heartbeat_interval)
+        subscriptions.add(subscription)
+        self.update_activity(websocket)
+
+    def _untrack(self, websocket: WebSocket, subscription: Subscription):
+        subscriptions = self.subscriptions.get(websocket)
+        if subscriptions is None:
+            return
+        subscriptions.discard(subscription)
+        if not subscriptions:
+            del self.subscriptions[websocket]
+            self._forget(websocket)
+
+    def _forget(self, websocket: WebSocket):
+        self.last_activity.pop(websocket, None)
+        self.expiry.cancel(websocket)
+        self.heartbeats.cancel(websocket)
+
+    def record_latency(self, channel: str, seconds: float):
+        latency = self.latency.get(channel)
+        if latency is None:
+            latency = self.latency[channel] = BroadcastLatency()
+        latency.record(seconds)
+
+    def get_metrics(self) -> dict:
+        return {
+            "connections": len(self.connections),
+            "subscribed_sockets": len(self.subscriptions),
+            "streams": {stream_id: len(clients) for stream_id, clients in self.stream_subscriptions.items()},
+            "dropped_messages": self.dropped_messages,
+            "slow_consumer_policy": self.slow_consumer_policy,
+            "latency": {channel: latency.as_dict() for channel, latency in self.latency.items()}
+        }
+
+    def _fan_out(self, websockets: Set[WebSocket], message: Union[dict, EncodedMessage], channel: str) -> Set[WebSocket]:
+        if not isinstance(message, EncodedMessage):
+            message = encode_message(message)
+        payload = message.text
+        key = message.type if message.type in COALESCE_TYPES else None
+        entry = (key, payload, channel, time.perf_counter())
+        connections = self.connections
+        disconnected = set()
+        for websocket in websockets:
+            connection = connections.get(websocket) or self.get_connection(websocket)
+            if not connection.push(entry):
+                disconnected.add(websocket)
+        return disconnected
+
+    async def send_personal(self, websocket: WebSocket, message: Union[dict, EncodedMessage]):
+        self._fan_out({websocket}, message, "personal")
         
     async def connect_stream(self, websocket: WebSocket, stream_id: str):
         if stream_id not in self.stream_subscriptions:
             self.stream_subscriptions[stream_id] = set()
         
         if len(self.stream_subscriptions[stream_id]) >= self.max_connections_per_stream:
-            await websocket.send_json({"type": "error", "message": "Stream capacity reached"})
+            await self.send_personal(websocket, {"type": "error", "message": "Stream capacity reached"})
             return False
             
         self.stream_subscriptions[stream_id].add(websocket)
-        self.last_activity[websocket] = datetime.utcnow()
+        self._track(websocket, ("stream", stream_id))
         return True
     
     def disconnect_stream(self, websocket: WebSocket, stream_id: str):
-        if stream_id in self.stream_subscriptions:
-            self.stream_subscriptions[stream_id].discard(websocket)
-            if not self.stream_subscriptions[stream_id]:
-                del self.stream_subscriptions[stream_id]
-        self.last_activity.pop(websocket, None)
+        self._discard(self.stream_subscriptions, stream_id, websocket)
+        self._untrack(websocket, ("stream", stream_id))
     
     def connect_stream_status(self, websocket: WebSocket):
         self.stream_status_subscribers.add(websocket)
-        self.last_activity[websocket] = datetime.utcnow()
+        self._track(websocket, ("status", ""))
     
     def disconnect_stream_status(self, websocket: WebSocket):
         self.stream_status_subscribers.discard(websocket)
-        self.last_activity.pop(websocket, None)
+        self._untrack(websocket, ("status", ""))
     
     def connect_notifications(self, websocket: WebSocket, user_id: str):
         if user_id not in self.notification_subscribers:
             self.notification_subscribers[user_id] = set()
         self.notification_subscribers[user_id].add(websocket)
-        self.last_activity[websocket] = datetime.utcnow()
+        self._track(websocket, ("notifications", user_id))
     
     def disconnect_notifications(self, websocket: WebSocket, user_id: str):
-        if user_id in self.notification_subscribers:
-            self.notification_subscribers[user_id].discard(websocket)
-            if not self.notification_subscribers[user_id]:
-                del self.notification_subscribers[user_id]
-        self.last_activity.pop(websocket, None)
+        self._discard(self.notification_subscribers, user_id, websocket)
+        self._untrack(websocket, ("notifications", user_id))
     
-    async def broadcast_to_stream(self, stream_id: str, message: dict):
+    def deliver_to_stream(self, stream_id: str, message: EncodedMessage):
         if stream_id in self.stream_subscriptions:
-            disconnected = set()
-            for websocket in self.stream_subscriptions[stream_id]:
-                try:
-                    await websocket.send_json(message)
-                except:
-                    disconnected.add(websocket)
+            disconnected = self._fan_out(self.stream_subscriptions[stream_id], message, stream_id)
             
             for ws in disconnected:
-                self.stream_subscriptions[stream_id].discard(ws)
+                self.disconnect(ws)
     
-    async def broadcast_stream_status(self, message: dict):
-        disconnected = set()
-        for websocket in self.stream_status_subscribers:
-            try:
-                await websocket.send_json(message)
-            except:
-                disconnected.add(websocket)
+    def deliver_stream_status(self, message: EncodedMessage):
+        disconnected = self._fan_out(self.stream_status_subscribers, message, "stream-status")
         
         for ws in disconnected:
-            self.stream_status_subscribers.discard(ws)
+            self.disconnect(ws)
     
-    async def send_notification(self, user_id: str, message: dict):
+    def deliver_notification(self, user_id: str, message: EncodedMessage):
         if user_id in self.notification_subscribers:
-            disconnected = set()
-            for websocket in self.notification_subscribers[user_id]:
-                try:
-                    await websocket.send_json(message)
-                except:
-                    disconnected.add(websocket)
+            disconnected = self._fan_out(self.notification_subscribers[user_id], message, "notifications")
             
             for ws in disconnected:
-                self.notification_subscribers[user_id].discard(ws)
+                self.disconnect(ws)
     
-    async def broadcast_notifications(self, message: dict):
+    def deliver_notifications(self, message: EncodedMessage):
         for user_id in list(self.notification_subscribers.keys()):
-            await self.send_notification(user_id, message)
+            self.deliver_notification(user_id, message)
+
+    async def broadcast_to_stream(self, stream_id: str, message: Union[dict, EncodedMessage], local: bool = False):
+        """Deliver to this worker's subscribers, then to every other worker unless ``local``."""
+        message = message if isinstance(message, EncodedMessage) else encode_message(message)
+        self.deliver_to_stream(stream_id, message)
+        if not local:
+            await self._publish("stream", stream_id, message)
+
+    async def broadcast_stream_status(self, message: Union[dict, EncodedMessage]):
+        message = message if isinstance(message, EncodedMessage) else encode_message(message)
+        self.deliver_stream_status(message)
+        await self._publish("stream-status", "", message)
+
+    async def send_notification(self, user_id: str, message: Union[dict, EncodedMessage]):
+        message = message if isinstance(message, EncodedMessage) else encode_message(message)
+        self.deliver_notification(user_id, message)
+        await self._publish("notification", user_id, message)
+
+    async def broadcast_notifications(self, message: Union[dict, EncodedMessage]):
+        message = message if isinstance(message, EncodedMessage) else encode_message(message)
+        self.deliver_notifications(message)
+        await self._publish("notifications", "", message)
     
     def update_activity(self, websocket: WebSocket):
-        self.last_activity[websocket] = datetime.utcnow()
+        # Only the timestamp moves; the expiry heap re-checks it when the old deadline comes due
+        if websocket in self.subscriptions:
+            self.last_activity[websocket] = time.monotonic()
     
     async def cleanup_stale_connections(self):
-        now = datetime.utcnow()
-        stale = [ws for ws, last in self.last_activity.items() 
-                 if now - last > self.connection_timeout]
+        now = time.monotonic()
+        for ws in self.expiry.pop_due(now):
+            last = self.last_activity.get(ws)
+            if last is not None and now - last < self.connection_timeout:
+                self.expiry.schedule(ws, last + self.connection_timeout)
+                continue
         
-        for ws in stale:
-            for stream_id, clients in list(self.stream_subscriptions.items()):
-                if ws in clients:
-                    clients.discard(ws)
-                    if not clients:
-                        del self.stream_subscriptions[stream_id]
-            
-            self.stream_status_subscribers.discard(ws)
-            
-            for user_id, clients in list(self.notification_subscribers.items()):
-                if ws in clients:
-                    clients.discard(ws)
-                    if not clients:
-                        del self.notification_subscribers[user_id]
-            
-            self.last_activity.pop(ws, None)
+            self.disconnect(ws)
             try:
                 await ws.close()
             except:
                 pass
 
+    def send_heartbeats(self, message: Union[dict, EncodedMessage]) -> int:
+        """Ping the sockets whose heartbeat is due; each socket is pinged every ``heartbeat_interval``."""
+        now = time.monotonic()
+        due = self.heartbeats.pop_due(now)
+        for ws in due:
+            self.heartbeats.schedule(ws, now + self.heartbeat_interval)
+        disconnected = self._fan_out(due, message, "heartbeat")
+        for ws in disconnected:
+            self.disconnect(ws)
+        return len(due)
+
 manager = ConnectionManager()
@@ -0,0 +1,428 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete, update, func, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import DataError, IntegrityError
+from typing import Any, Dict, List, Optional, Set, Tuple
+from datetime import datetime
+import asyncio
+import json
+import uuid
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.exceptions import BadRequestException, NotFoundException
+from app.models.livestream import Livestream
+from app.models.stream import StreamViewer
+from app.websocket.manager import manager
+
+# Mirrors stream_viewers_status_check
+VIEWER_STATUSES = ("active", "inactive", "kicked")
+NAME_LENGTH = StreamViewer.__table__.c.name.type.length
+LOCATION_LENGTH = StreamViewer.__table__.c.location.type.length
+
+class Viewer:
+    __slots__ = ("id", "livestream_id", "user_id", "name", "location", "status", "joined_at")
+
+    def __init__(self, id: int, livestream_id: str, name: str, user_id: str = None, location: str = None,
+                 status: str = "active", joined_at: datetime = None):
+        self.id = id
+        self.livestream_id = str(livestream_id)
+        self.user_id = str(user_id) if user_id else None
+        self.name = name
+        self.location = location
+        self.status = status or "active"
+        self.joined_at = joined_at or datetime.utcnow()
+
+    def as_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "livestream_id": self.livestream_id,
+            "user_id": self.user_id,
+            "name": self.name,
+            "location": self.location,
+            "status": self.status,
+            "joined_at": self.joined_at.isoformat()
+        }
+
+    def as_row(self) -> dict:
+        return {
+            "id": self.id,
+            "livestream_id": uuid.UUID(self.livestream_id),
+            "user_id": uuid.UUID(self.user_id) if self.user_id else None,
+            "name": self.name,
+            "location": self.location,
+            "status": self.status,
+            "joined_at": self.joined_at
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Viewer":
+        return cls(
+            id=data["id"],
+            livestream_id=data["livestream_id"],
+            name=data["name"],
+            user_id=data.get("user_id"),
+            location=data.get("location"),
+            status=data.get("status"),
+            joined_at=datetime.fromisoformat(data["joined_at"]) if data.get("joined_at") else None
+        )
+
+class StreamPresence:
+    def __init__(self, stream_id: str, peak: int = 0):
+        self.stream_id = stream_id
+        self.viewers: Dict[int, Viewer] = {}
+        self.active_by_user: Dict[str, int] = {}
+        self.active_count = 0
+        self.peak = peak
+        self.dirty: Set[int] = set()
+        self.deleted: Set[int] = set()
+        self.peak_dirty = False
+
+    def put(self, viewer: Viewer):
+        previous = self.viewers.get(viewer.id)
+        if previous and previous.status == "active":
+            self.active_count -= 1
+            if previous.user_id:
+                self.active_by_user.pop(previous.user_id, None)
+        self.viewers[viewer.id] = viewer
+        if viewer.status == "active":
+            self.active_count += 1
+            if viewer.user_id:
+                self.active_by_user[viewer.user_id] = viewer.id
+            if self.active_count > self.peak:
+                self.peak = self.active_count
+                self.peak_dirty = True
+
+    def pop(self, viewer_id: int) -> Optional[Viewer]:
+        viewer = self.viewers.pop(viewer_id, None)
+        if viewer and viewer.status == "active":
+            self.active_count -= 1
+            if viewer.user_id and self.active_by_user.get(viewer.user_id) == viewer_id:
+                del self.active_by_user[viewer.user_id]
+        return viewer
+
+class PresenceRegistry:
+    """Live viewer presence per stream, held in memory.
+
+    Joins, leaves and moderation only touch memory; viewer ids are reserved from the
+    stream_viewers sequence in blocks, and rows plus the peak (Livestream.viewers) are
+    written back every ``flush_interval`` seconds and when a stream ends, one transaction
+    per stream. Changes are replicated to other workers over the WebSocket backplane.
+    """
+
+    def __init__(self):
+        self.streams: Dict[str, StreamPresence] = {}
+        self.viewer_streams: Dict[int, str] = {}
+        self.sockets: Dict[Any, Tuple[str, int]] = {}
+        self.reserved_ids: List[int] = []
+        self.id_block_size = 50
+        # Keep replicated "put" and "remove" events under the Postgres NOTIFY payload limit
+        self.event_batch_size = 20
+        self.remove_batch_size = 300
+        self.flush_interval = settings.PRESENCE_FLUSH_INTERVAL
+        self.load_locks: Dict[str, asyncio.Lock] = {}
+        self.id_lock = asyncio.Lock()
+        self.flush_lock = asyncio.Lock()
+        self.task: Optional[asyncio.Task] = None
+
+    async def ensure_loaded(self, db: AsyncSession, stream_id: str) -> StreamPresence:
+        stream_id = str(stream_id)
+        stream = self.streams.get(stream_id)
+        if stream:
+            return stream
+
+        try:
+            uuid.UUID(stream_id)
+        except ValueError:
+            raise NotFoundException("Livestream not found")
+
+        lock = self.load_locks.setdefault(stream_id, asyncio.Lock())
+        async with lock:
+            if stream_id in self.streams:
+                return self.streams[stream_id]
+            peak = await db.scalar(select(func.coalesce(Livestream.viewers, 0)).where(Livestream.id == stream_id))
+            if peak is None:
+                self.load_locks.pop(stream_id, None)
+                raise NotFoundException("Livestream not found")
+            result = await db.execute(select(StreamViewer).where(StreamViewer.livestream_id == stream_id))
+            stream = StreamPresence(stream_id, peak)
+            for row in result.scalars().all():
+                viewer = Viewer(row.id, stream_id, row.name, row.user_id, row.location, row.status, row.joined_at)
+                stream.put(viewer)
+                self.viewer_streams[viewer.id] = stream_id
+            stream.peak_dirty = False
+            self.streams[stream_id] = stream
+        self.load_locks.pop(stream_id, None)
+        return stream
+
+    async def _group_by_stream(self, db: AsyncSession, viewer_ids: List[int]) -> List[Tuple[StreamPresence, List[int]]]:
+        unknown = [viewer_id for viewer_id in viewer_ids if viewer_id not in self.viewer_streams]
+        located = {}
+        if unknown:
+            result = await db.execute(
+                select(StreamViewer.id, StreamViewer.livestream_id).where(StreamViewer.id.in_(unknown))
+            )
+            located = {row.id: str(row.livestream_id) for row in result}
+
+        grouped: Dict[str, List[int]] = {}
+        for viewer_id in viewer_ids:
+            stream_id = self.viewer_streams.get(viewer_id) or located.get(viewer_id)
+            if stream_id:
+                grouped.setdefault(stream_id, []).append(viewer_id)
+
+        groups = []
+        for stream_id, ids in grouped.items():
+            stream = await self.ensure_loaded(db, stream_id)
+            ids = [viewer_id for viewer_id in dict.fromkeys(ids) if viewer_id in stream.viewers]
+            if ids:
+                groups.append((stream, ids))
+        return groups
+
+    async def _next_id(self, db: AsyncSession) -> int:
+        async with self.id_lock:
+            if not self.reserved_ids:
+                result = await db.execute(
+                    text("SELECT nextval(pg_get_serial_sequence('stream_viewers', 'id')) FROM generate_series(1, :n)"),
+                    {"n": self.id_block_size}
+                )
+                self.reserved_ids = [row[0] for row in result]
+                self.reserved_ids.reverse()
+            return self.reserved_ids.pop()
+
+    def get_counts(self, stream_id: str) -> Optional[Tuple[int, int]]:
+        stream = self.streams.get(str(stream_id))
+        if not stream:
+            return None
+        return stream.active_count, stream.peak
+
+    async def list_viewers(self, db: AsyncSession, stream_id: str) -> List[dict]:
+        stream = await self.ensure_loaded(db, stream_id)
+        return [viewer.as_dict() for viewer in stream.viewers.values()]
+
+    async def join(self, db: AsyncSession, stream_id: str, data: dict) -> dict:
+        name = data.get("name")
+        if not isinstance(name, str) or not name.strip():
+            raise BadRequestException("Viewer name is required")
+        location = data.get("location")
+        if location is not None and not isinstance(location, str):
+            raise BadRequestException("Invalid viewer location")
+        status = data.get("status", "active")
+        if status not in VIEWER_STATUSES:
+            raise BadRequestException(f"Invalid viewer status. Allowed: {', '.join(VIEWER_STATUSES)}")
+        try:
+            user_id = str(uuid.UUID(str(data["user_id"]))) if data.get("user_id") else None
+        except ValueError:
+            raise BadRequestException("Invalid user id")
+
+        stream = await self.ensure_loaded(db, stream_id)
+        if user_id and user_id in stream.active_by_user:
+            return stream.viewers[stream.active_by_user[user_id]].as_dict()
+
+        viewer = Viewer(
+            id=await self._next_id(db),
+            livestream_id=stream.stream_id,
+            name=name[:NAME_LENGTH],
+            user_id=user_id,
+            location=location[:LOCATION_LENGTH] if location else None,
+            status=status
+        )
+        self._apply_put(stream, viewer)
+        await self._publish(stream.stream_id, {"event": "put", "viewers": [viewer.as_dict()]})
+        return viewer.as_dict()
+
+    async def leave(self, db: AsyncSession, viewer_id: int) -> Optional[dict]:
+        viewers = await self.leave_many(db, [viewer_id])
+        return viewers[0] if viewers else None
+
+    async def leave_many(self, db: AsyncSession, viewer_ids: List[int]) -> List[dict]:
+        removed = []
+        for stream, ids in await self._group_by_stream(db, viewer_ids):
+            removed.extend(self._apply_remove(stream, viewer_id).as_dict() for viewer_id in ids)
+            for start in range(0, len(ids), self.remove_batch_size):
+                await self._publish(stream.stream_id, {"event": "remove", "ids": ids[start:start + self.remove_batch_size]})
+        return removed
+
+    async def set_status(self, db: AsyncSession, viewer_id: int, status: str) -> Optional[dict]:
+        """Change a viewer's status and return the viewer as it was before the change."""
+        viewers = await self.set_status_many(db, [viewer_id], status)
+        return viewers[0] if viewers else None
+
+    async def set_status_many(self, db: AsyncSession, viewer_ids: List[int], status: str) -> List[dict]:
+        previous = []
+        for stream, ids in await self._group_by_stream(db, viewer_ids):
+            updated = []
+            for viewer_id in ids:
+                viewer = stream.viewers[viewer_id]
+                previous.append(viewer.as_dict())
+                viewer = Viewer(viewer.id, viewer.livestream_id, viewer.name, viewer.user_id, viewer.location, status, viewer.joined_at)
+                self._apply_put(stream, viewer)
+                updated.append(viewer.as_dict())
+            for start in range(0, len(updated), self.event_batch_size):
+                await self._publish(stream.stream_id, {"event": "put", "viewers": updated[start:start + self.event_batch_size]})
+        return previous
+
+    async def end_stream(self, db: AsyncSession, stream_id: str):
+        """Drop presence for a finished stream and persist its peak; the caller commits."""
+        stream_id = str(stream_id)
+        # Hold the flush lock so an in-flight flush cannot write this stream's rows back
+        async with self.flush_lock:
+            stream = self.streams.pop(stream_id, None)
+        if stream:
+            for viewer_id in stream.viewers:
+                self.viewer_streams.pop(viewer_id, None)
+            await db.execute(
+                update(Livestream)
+                .where(Livestream.id == stream_id)
+                .values(viewers=func.greatest(func.coalesce(Livestream.viewers, 0), stream.peak))
+            )
+        await db.execute(delete(StreamViewer).where(StreamViewer.livestream_id == stream_id))
+        await self._publish(stream_id, {"event": "end"})
+
+    async def bind(self, db: AsyncSession, websocket, stream_id: str, viewer_id: int):
+        """Tie a viewer to a socket so the viewer leaves when the socket closes."""
+        try:
+            stream = await self.ensure_loaded(db, stream_id)
+        except NotFoundException:
+            return
+        if viewer_id in stream.viewers:
+            self.sockets[websocket] = (stream.stream_id, viewer_id)
+
+    async def release(self, websocket):
+        binding = self.sockets.pop(websocket, None)
+        if not binding:
+            return
+        stream_id, viewer_id = binding
+        stream = self.streams.get(stream_id)
+        if stream and viewer_id in stream.viewers and stream.viewers[viewer_id].status == "active":
+            self._apply_remove(stream, viewer_id)
+            await self._publish(stream_id, {"event": "remove", "ids": [viewer_id]})
+
+    def _apply_put(self, stream: StreamPresence, viewer: Viewer):
+        stream.put(viewer)
+        stream.dirty.add(viewer.id)
+        stream.deleted.discard(viewer.id)
+        self.viewer_streams[viewer.id] = stream.stream_id
+
+    def _apply_remove(self, stream: StreamPresence, viewer_id: int) -> Optional[Viewer]:
+        viewer = stream.pop(viewer_id)
+        stream.dirty.discard(viewer_id)
+        stream.deleted.add(viewer_id)
+        self.viewer_streams.pop(viewer_id, None)
+        return viewer
+
+    async def _publish(self, stream_id: str, event: dict):
+        await manager.publish_event("presence", stream_id, json.dumps(event))
+
+    def on_remote_event(self, op: str, target: str, message):
+        if op != "presence":
+            return
+        event = json.loads(message.text)
+        if event["event"] == "end":
+            stream = self.streams.pop(target, None)
+            if stream:
+                for viewer_id in stream.viewers:
+                    self.viewer_streams.pop(viewer_id, None)
+            return
+
+        # Streams this worker has not loaded will read the persisted rows when first used
+        stream = self.streams.get(target)
+        if not stream:
+            return
+        if event["event"] == "put":
+            for data in event["viewers"]:
+                viewer = Viewer.from_dict(data)
+                stream.put(viewer)
+                self.viewer_streams[viewer.id] = target
+        elif event["event"] == "remove":
+            for viewer_id in event["ids"]:
+                stream.pop(viewer_id)
+                self.viewer_streams.pop(viewer_id, None)
+
+    async def flush(self):
+        async with self.flush_lock:
+            pending = []
+            for stream in list(self.streams.values()):
+                if not stream.dirty and not stream.deleted and not stream.peak_dirty:
+                    continue
+                rows = [stream.viewers[viewer_id].as_row() for viewer_id in stream.dirty if viewer_id in stream.viewers]
+                pending.append((stream, set(stream.dirty), set(stream.deleted), rows))
+                stream.dirty.clear()
+                stream.deleted.clear()
+                stream.peak_dirty = False
+            if not pending:
+                return
+
+            written = 0
+            try:
+                async with AsyncSessionLocal() as db:
+                    for stream, _, deleted, rows in pending:
+                        await self._write_stream(db, stream, deleted, rows)
+                        written += 1
+            except BaseException:
+                for stream, dirty, deleted, _ in pending[written:]:
+                    stream.dirty |= dirty - stream.deleted
+                    stream.deleted |= deleted - stream.dirty
+                    stream.peak_dirty = True
+                raise
+
+    async def _write_stream(self, db: AsyncSession, stream: StreamPresence, deleted: Set[int], rows: List[dict]):
+        try:
+            if rows:
+                await db.execute(self._upsert(rows))
+            await self._finish_stream(db, stream, deleted)
+            return
+        except (IntegrityError, DataError):
+            await db.rollback()
+
+        # One bad viewer row must not keep the rest of the stream from being written
+        for row in rows:
+            try:
+                await db.execute(self._upsert([row]))
+                await db.commit()
+            except (IntegrityError, DataError) as e:
+                await db.rollback()
+                print(f"Dropping viewer {row['id']}: {e.orig}")
+        await self._finish_stream(db, stream, deleted)
+
+    async def _finish_stream(self, db: AsyncSession, stream: StreamPresence, deleted: Set[int]):
+        if deleted:
+            await db.execute(delete(StreamViewer).where(StreamViewer.id.in_(deleted)))
+        await db.execute(
+            update(Livestream)
+            .where(Livestream.id == stream.stream_id)
+            .values(viewers=func.greatest(func.coalesce(Livestream.viewers, 0), stream.peak))
+        )
+        await db.commit()
+
+    def _upsert(self, rows: List[dict]):
+        stmt = insert(StreamViewer).values(rows)
+        return stmt.on_conflict_do_update(
+            index_elements=[StreamViewer.id],
+            set_={
+                "name": stmt.excluded.name,
+                "location": stmt.excluded.location,
+                "status": stmt.excluded.status
+            }
+        )
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"Presence flush error: {e}")
+
+    def start(self):
+        self.task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+        await self.flush()
+
+presence = PresenceRegistry()
+manager.remote_listeners.append(presence.on_remote_event)
@@ -0,0 +1,44 @@
+from typing import Dict, Hashable, List, Tuple
+import heapq
+import itertools
+
+class DeadlineQueue:
+    """Min-heap of one deadline per key.
+
+    Rescheduling or cancelling a key leaves its old heap entry behind; stale entries
+    are skipped when popped and compacted away once they outnumber live ones, so
+    ``pop_due`` costs O(due · log n) instead of a scan over every key.
+    """
+
+    def __init__(self):
+        self.heap: List[Tuple[float, int, Hashable]] = []
+        self.deadlines: Dict[Hashable, float] = {}
+        self.counter = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self.deadlines)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self.deadlines
+
+    def schedule(self, key: Hashable, deadline: float):
+        self.deadlines[key] = deadline
+        heapq.heappush(self.heap, (deadline, next(self.counter), key))
+        if len(self.heap) > 2 * len(self.deadlines) + 64:
+            self._compact()
+
+    def cancel(self, key: Hashable):
+        self.deadlines.pop(key, None)
+
+    def pop_due(self, now: float) -> List[Hashable]:
+        due = []
+        while self.heap and self.heap[0][0] <= now:
+            deadline, _, key = heapq.heappop(self.heap)
+            if self.deadlines.get(key) == deadline:
+                del self.deadlines[key]
+                due.append(key)
+        return due
+
+    def _compact(self):
+        self.heap = [entry for entry in self.heap if self.deadlines.get(entry[2]) == entry[0]]
+        heapq.heapify(self.heap)
@@ -0,0 +1,221 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func
+from typing import Dict, Iterable, Optional
+from datetime import datetime, timedelta
+import asyncio
+import time
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.livestream import Livestream, ChatMessage
+from app.models.stream import StreamViewer
+from app.websocket.presence import presence
+from app.websocket.icecast_monitor import icecast_monitor
+
+class StreamCounters:
+    def __init__(self, is_live: bool, start_time: Optional[datetime], current_viewers: int, peak_viewers: int, chat_messages: int):
+        self.is_live = is_live
+        self.start_time = start_time
+        self.current_viewers = current_viewers
+        self.peak_viewers = max(peak_viewers, current_viewers)
+        self.chat_messages = chat_messages
+        self.reconciled_at = datetime.utcnow()
+
+class StatsEngine:
+    """Keeps live stream counters in memory and publishes stats changes per stream per tick.
+
+    Viewer counts come from the presence registry when it has the stream loaded and
+    chat counters are moved by chat events; the database is only read when a stream
+    is first seen or its counters are older than ``reconcile_interval``.
+
+    Subscribers get the full published snapshot once (``stats``), then only fields
+    that changed (``stats-delta``); ``duration`` is advanced by the client. A field is
+    sent at most once per its minimum interval, and a full snapshot is re-sent every
+    ``resync_interval`` so clients that missed a delta converge.
+    """
+
+    def __init__(self):
+        self.counters: Dict[str, StreamCounters] = {}
+        # Last state published to subscribers, i.e. what their merged deltas add up to
+        self.snapshots: Dict[str, dict] = {}
+        self.field_sent_at: Dict[str, Dict[str, float]] = {}
+        self.resynced_at: Dict[str, float] = {}
+        self.reconcile_interval = timedelta(seconds=30)
+        self.min_interval = settings.WS_STATS_MIN_INTERVAL
+        self.field_intervals = settings.WS_STATS_FIELD_INTERVALS
+        self.resync_interval = settings.WS_STATS_RESYNC_INTERVAL
+        self.load_locks: Dict[str, asyncio.Lock] = {}
+
+    async def reconcile(self, db: AsyncSession, stream_id: str) -> Optional[StreamCounters]:
+        current_viewers = (
+            select(func.count(StreamViewer.id))
+            .where(StreamViewer.livestream_id == Livestream.id, StreamViewer.status == 'active')
+            .correlate(Livestream)
+            .scalar_subquery()
+        )
+        chat_messages = (
+            select(func.count(ChatMessage.id))
+            .where(ChatMessage.livestream_id == Livestream.id)
+            .correlate(Livestream)
+            .scalar_subquery()
+        )
+        result = await db.execute(
+            select(
+                Livestream.is_live,
+                Livestream.start_time,
+                func.coalesce(Livestream.viewers, 0).label('peak_viewers'),
+                current_viewers.label('current_viewers'),
+                chat_messages.label('chat_messages')
+            ).where(Livestream.id == stream_id)
+        )
+        row = result.first()
+        if not row:
+            self.counters.pop(stream_id, None)
+            return None
+
+        previous = self.counters.get(stream_id)
+        counters = StreamCounters(
+            is_live=bool(row.is_live),
+            start_time=row.start_time,
+            current_viewers=int(row.current_viewers),
+            peak_viewers=max(int(row.peak_viewers), previous.peak_viewers if previous else 0),
+            chat_messages=int(row.chat_messages)
+        )
+        self.counters[stream_id] = counters
+        return counters
+
+    def build_snapshot(self, stream_id: str, now: datetime = None) -> Optional[dict]:
+        counters = self.counters.get(stream_id)
+        if not counters or not counters.is_live:
+            return None
+
+        now = now or datetime.utcnow()
+        duration = 0
+        if counters.start_time:
+            duration = int((now - counters.start_time).total_seconds())
+
+        current_viewers, peak_viewers = counters.current_viewers, counters.peak_viewers
+        live_counts = presence.get_counts(stream_id)
+        if live_counts:
+            current_viewers = live_counts[0]
+            peak_viewers = max(peak_viewers, live_counts[1])
+        icecast = icecast_monitor.latest
+
+        return {
+            "current_viewers": current_viewers,
+            "peak_viewers": peak_viewers,
+            "duration": duration,
+            "chat_messages": counters.chat_messages,
+            "listeners": icecast.listeners if icecast else 0,
+            "is_live": counters.is_live
+        }
+
+    def published_snapshot(self, stream_id: str) -> Optional[dict]:
+        snapshot = self.snapshots.get(stream_id)
+        counters = self.counters.get(stream_id)
+        if snapshot is None or not counters or not counters.start_time:
+            return snapshot
+        return {**snapshot, "duration": int((datetime.utcnow() - counters.start_time).total_seconds())}
+
+    async def get_snapshot(self, db: AsyncSession, stream_id: str) -> Optional[dict]:
+        """Return the latest published snapshot, loading counters only for a cold stream."""
+        if stream_id in self.snapshots:
+            return self.published_snapshot(stream_id)
+        if stream_id not in self.counters:
+            # Sockets subscribing to a cold stream together share one reconcile query
+            lock = self.load_locks.setdefault(stream_id, asyncio.Lock())
+            async with lock:
+                if stream_id not in self.counters:
+                    await self.reconcile(db, stream_id)
+            self.load_locks.pop(stream_id, None)
+        return self.build_snapshot(stream_id)
+
+    def diff(self, stream_id: str, snapshot: dict, now: float) -> Optional[dict]:
+        """Message bringing subscribers from the published state to ``snapshot``, or None if nothing is due."""
+        published = self.snapshots.get(stream_id)
+        if published is None or now - self.resynced_at.get(stream_id, 0) >= self.resync_interval:
+            self.snapshots[stream_id] = dict(snapshot)
+            self.field_sent_at[stream_id] = dict.fromkeys(snapshot, now)
+            self.resynced_at[stream_id] = now
+            return {"type": "stats", "stats": snapshot}
+
+        sent_at = self.field_sent_at[stream_id]
+        changes = {}
+        for field, value in snapshot.items():
+            if field == "duration" or published.get(field) == value:
+                continue
+            if now - sent_at.get(field, 0) < self.field_intervals.get(field, self.min_interval):
+                continue
+            changes[field] = value
+            published[field] = value
+            sent_at[field] = now
+        if not changes:
+            return None
+        return {"type": "stats-delta", "stats": changes}
+
+    async def tick(self, stream_ids: Iterable[str]) -> Dict[str, dict]:
+        """Build each stream's snapshot and return the stats message due for it, if any."""
+        now = datetime.utcnow()
+        stream_ids = set(stream_ids)
+
+        for stream_id in list(self.counters.keys()):
+            if stream_id not in stream_ids:
+                del self.counters[stream_id]
+        for stream_id in list(self.snapshots.keys()):
+            if stream_id not in stream_ids:
+                self._forget(stream_id)
+
+        stale = [
+            stream_id for stream_id in stream_ids
+            if stream_id not in self.counters
+            or now - self.counters[stream_id].reconciled_at > self.reconcile_interval
+        ]
+        if stale:
+            async with AsyncSessionLocal() as db:
+                for stream_id in stale:
+                    try:
+                        await self.reconcile(db, stream_id)
+                    except Exception as e:
+                        await db.rollback()
+                        print(f"Stats reconcile error for {stream_id}: {e}")
+
+        messages = {}
+        monotonic_now = time.monotonic()
+        for stream_id in stream_ids:
+            snapshot = self.build_snapshot(stream_id, now)
+            if not snapshot:
+                self._forget(stream_id)
+                continue
+            message = self.diff(stream_id, snapshot, monotonic_now)
+            if message:
+                messages[stream_id] = message
+        return messages
+
+    def _forget(self, stream_id: str):
+        self.snapshots.pop(stream_id, None)
+        self.field_sent_at.pop(stream_id, None)
+        self.resynced_at.pop(stream_id, None)
+
+    def chat_message_added(self, stream_id: str):
+        counters = self.counters.get(str(stream_id))
+        if counters:
+            counters.chat_messages += 1
+
+    def chat_message_removed(self, stream_id: str):
+        counters = self.counters.get(str(stream_id))
+        if counters:
+            counters.chat_messages = max(0, counters.chat_messages - 1)
+
+    def stream_started(self, stream_id: str, start_time: datetime):
+        counters = self.counters.get(str(stream_id))
+        if counters:
+            counters.is_live = True
+            counters.start_time = start_time
+
+    def stream_ended(self, stream_id: str):
+        counters = self.counters.get(str(stream_id))
+        if counters:
+            counters.is_live = False
+            counters.current_viewers = 0
+        self._forget(str(stream_id))
+
+stats_engine = StatsEngine()
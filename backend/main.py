@@ -9,10 +9,18 @@ from app.middleware.security import SecurityHeadersMiddleware
 from app.routes import (
     auth, sermons, events, members, livestreams, prayers,
     announcements, giving, dashboard, content, settings as settings_route,
-    forms, playlists, health, websocket, users, profile, permissions, roles, series
+    forms, playlists, health, websocket, users, profile, permissions, roles, series, exports
 )
 from app.websocket.handlers import heartbeat_task, cleanup_task, stats_broadcast_task
+from app.websocket.manager import manager
+from app.websocket.chat_buffer import chat_buffer
+from app.websocket.presence import presence
 from app.services.token_blacklist_service import cleanup_expired_tokens
+from app.services.icecast_service import icecast_service
+from app.services.counter_service import counters
+from app.services.export_service import export_runner
+from app.utils import pdf_export
+from app.websocket.icecast_monitor import icecast_monitor
 
 async def token_cleanup_task():
     while True:
@@ -26,8 +34,7 @@ async def token_cleanup_task():
 async def stats_task():
     while True:
         try:
-            async with AsyncSessionLocal() as db:
-                await stats_broadcast_task(db)
+            await stats_broadcast_task()
         except Exception as e:
             print(f"Stats broadcast error: {e}")
         await asyncio.sleep(1)
@@ -35,15 +42,26 @@ async def stats_task():
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
+    await manager.start()
     asyncio.create_task(token_cleanup_task())
     asyncio.create_task(heartbeat_task())
     asyncio.create_task(cleanup_task())
     asyncio.create_task(stats_task())
+    chat_buffer.start()
+    presence.start()
+    icecast_monitor.start()
+    counters.start()
+    export_runner.start()
     print("Server starting...")
     print("WebSocket server ready")
     yield
-    # Shutdown
-    await engine.dispose()
+    # Shutdown; each step runs even if an earlier one fails, so no buffer is left unflushed
+    for stop in (icecast_monitor.stop, chat_buffer.stop, presence.stop, manager.stop, counters.stop,
+                 export_runner.stop, pdf_export.shutdown, icecast_service.close, engine.dispose):
+        try:
+            await stop()
+        except Exception as e:
+            print(f"Shutdown error in {stop.__qualname__}: {e}")
     print("Graceful shutdown completed")
 
 app = FastAPI(
@@ -60,7 +78,8 @@ app.add_middleware(
     allow_origins=["*"],
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE"],
-    allow_headers=["Content-Type", "Authorization"]
+    allow_headers=["Content-Type", "Authorization"],
+    expose_headers=["X-Next-Cursor"]
 )
 
 app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
@@ -88,4 +107,5 @@ app.include_router(profile.router, prefix="/api")
 app.include_router(permissions.router, prefix="/api")
 app.include_router(roles.router, prefix="/api")
 app.include_router(series.router, prefix="/api")
+app.include_router(exports.router, prefix="/api")
 app.include_router(websocket.router)
@@ -0,0 +1,41 @@
+"""
+Reporting rollup tables migration
+Creates the rollup tables and fills them from the existing giving and attendance rows
+"""
+import asyncio
+from app.core.database import Base, engine, AsyncSessionLocal
+from app import models
+from app.models.rollup import GivingDaily, GivingMemberTotal, AttendanceDaily, AttendanceMember, SermonDaily
+from app.services import rollup_service
+
+ROLLUP_TABLES = [model.__table__ for model in (GivingDaily, GivingMemberTotal, AttendanceDaily, AttendanceMember, SermonDaily)]
+
+async def upgrade():
+    """Create the rollup tables and rebuild them from the source tables"""
+    print("🔄 Starting migration: Create rollup tables...")
+    
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all, tables=ROLLUP_TABLES)
+        print("✅ Rollup tables created")
+        
+        print("📦 Rebuilding rollups from giving and attendance...")
+        async with AsyncSessionLocal() as db:
+            await rollup_service.rebuild(db)
+            await db.commit()
+        print("✅ Migration completed successfully!")
+        
+    except Exception as e:
+        print(f"❌ Migration failed: {e}")
+        raise
+
+async def downgrade():
+    """Drop the rollup tables"""
+    print("🔄 Rolling back migration...")
+    
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all, tables=ROLLUP_TABLES)
+    print("✅ Rollback completed")
+
+if __name__ == "__main__":
+    asyncio.run(upgrade())
@@ -0,0 +1,31 @@
+"""
+Announcement view counter migration
+Adds announcements.views, incremented by the counter buffer
+"""
+import asyncio
+from sqlalchemy import text
+from app.core.database import engine
+
+async def upgrade():
+    """Add the views column"""
+    print("🔄 Starting migration: Add announcements.views...")
+    
+    try:
+        async with engine.begin() as conn:
+            await conn.execute(text("ALTER TABLE announcements ADD COLUMN IF NOT EXISTS views INTEGER DEFAULT 0"))
+        print("✅ Migration completed successfully!")
+        
+    except Exception as e:
+        print(f"❌ Migration failed: {e}")
+        raise
+
+async def downgrade():
+    """Drop the views column"""
+    print("🔄 Rolling back migration...")
+    
+    async with engine.begin() as conn:
+        await conn.execute(text("ALTER TABLE announcements DROP COLUMN IF EXISTS views"))
+    print("✅ Rollback completed")
+
+if __name__ == "__main__":
+    asyncio.run(upgrade())
@@ -0,0 +1,43 @@
+"""
+Sermon full-text search migration
+Adds the generated search_vector column and the GIN indexes used by sermon search
+"""
+import asyncio
+from sqlalchemy import text
+from app.core.database import engine
+from app.models.sermon import Sermon, SEARCH_VECTOR_SQL
+
+async def upgrade():
+    """Add search_vector and the search indexes"""
+    print("🔄 Starting migration: Sermon full-text search...")
+    
+    try:
+        async with engine.begin() as conn:
+            await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+            await conn.execute(text(
+                f"ALTER TABLE sermons ADD COLUMN IF NOT EXISTS search_vector tsvector "
+                f"GENERATED ALWAYS AS ({SEARCH_VECTOR_SQL}) STORED"
+            ))
+            print("✅ search_vector added")
+            
+            print("📦 Building search indexes...")
+            for index in Sermon.__table__.indexes:
+                await conn.run_sync(lambda sync_conn, index=index: index.create(sync_conn, checkfirst=True))
+        print("✅ Migration completed successfully!")
+        
+    except Exception as e:
+        print(f"❌ Migration failed: {e}")
+        raise
+
+async def downgrade():
+    """Drop the search indexes and column"""
+    print("🔄 Rolling back migration...")
+    
+    async with engine.begin() as conn:
+        for name in ("ix_sermons_search_vector", "ix_sermons_speaker_trgm", "ix_sermons_tags"):
+            await conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+        await conn.execute(text("ALTER TABLE sermons DROP COLUMN IF EXISTS search_vector"))
+    print("✅ Rollback completed")
+
+if __name__ == "__main__":
+    asyncio.run(upgrade())
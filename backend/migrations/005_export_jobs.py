@@ -0,0 +1,32 @@
+"""
+Export jobs migration
+Creates the export_jobs table used by the background export runner
+"""
+import asyncio
+from app.core.database import Base, engine
+from app import models
+from app.models.export_job import ExportJob
+
+async def upgrade():
+    """Create the export_jobs table"""
+    print("🔄 Starting migration: Create export_jobs...")
+    
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all, tables=[ExportJob.__table__])
+        print("✅ Migration completed successfully!")
+        
+    except Exception as e:
+        print(f"❌ Migration failed: {e}")
+        raise
+
+async def downgrade():
+    """Drop the export_jobs table"""
+    print("🔄 Rolling back migration...")
+    
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all, tables=[ExportJob.__table__])
+    print("✅ Rollback completed")
+
+if __name__ == "__main__":
+    asyncio.run(upgrade())
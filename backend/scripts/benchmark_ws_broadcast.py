@@ -0,0 +1,119 @@
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.websocket import encoding
+from app.websocket.manager import ConnectionManager
+
+SUBSCRIBER_COUNTS = [100, 1000, 10000]
+ROUNDS = 20
+# Broadcasts sent back to back before waiting, as in a busy chat
+BURST = 10
+
+MESSAGE = {
+    "type": "new-message",
+    "message": {
+        "id": "6f1c1f0e-4b7a-4f43-9a57-1b0a6f4c2d11",
+        "livestream_id": "0b6f3f4e-2f43-4f1e-8a5c-5d2f6b7e8c90",
+        "user_id": None,
+        "user_name": "Grace",
+        "text": "Amen! Blessed service this morning, greetings from the family in Lagos.",
+        "created_at": "2026-10-18T10:15:00"
+    }
+}
+
+class Delivery:
+    def __init__(self, expected: int):
+        self.expected = expected
+        self.sent = 0
+        self.done = asyncio.Event()
+
+    def mark(self):
+        self.sent += 1
+        if self.sent == self.expected:
+            self.done.set()
+
+class FakeWebSocket:
+    def __init__(self):
+        self.delivery = None
+
+    async def send_json(self, data):
+        # Same work Starlette's WebSocket.send_json does before handing text to the server
+        await self.send_text(json.dumps(data, separators=(",", ":"), ensure_ascii=False))
+
+    async def send_text(self, data):
+        if self.delivery:
+            self.delivery.mark()
+
+    async def close(self):
+        pass
+
+def timed(func):
+    async def wrapper(*args):
+        start = time.perf_counter()
+        for _ in range(ROUNDS):
+            await func(*args)
+        return (time.perf_counter() - start) / ROUNDS
+    return wrapper
+
+@timed
+async def send_json_per_socket(websockets):
+    for websocket in websockets:
+        await websocket.send_json(MESSAGE)
+
+@timed
+async def encode_once(websockets):
+    payload = encoding.encode_message(MESSAGE).text
+    for websocket in websockets:
+        await websocket.send_text(payload)
+
+@timed
+async def queued_fan_out(manager, websockets):
+    delivery = Delivery(len(websockets))
+    for websocket in websockets:
+        websocket.delivery = delivery
+    await manager.broadcast_to_stream("bench", MESSAGE)
+    await delivery.done.wait()
+
+@timed
+async def queued_burst(manager, websockets):
+    delivery = Delivery(len(websockets) * BURST)
+    for websocket in websockets:
+        websocket.delivery = delivery
+    for _ in range(BURST):
+        await manager.broadcast_to_stream("bench", MESSAGE)
+    await delivery.done.wait()
+
+async def run(subscribers: int):
+    websockets = [FakeWebSocket() for _ in range(subscribers)]
+    results = {"send_json per socket": await send_json_per_socket(websockets)}
+
+    encoders = ["json"] + (["orjson"] if encoding.orjson else [])
+    for name in encoders:
+        encoding.dumps = encoding.get_encoder(name)
+        results[f"encode once ({name})"] = await encode_once(websockets)
+
+    manager = ConnectionManager()
+    manager.max_connections_per_stream = subscribers
+    for websocket in websockets:
+        await manager.connect_stream(websocket, "bench")
+    results[f"queued fan-out ({encoders[-1]})"] = await queued_fan_out(manager, websockets)
+    # Per broadcast, so it compares directly with the lines above
+    results[f"queued, burst of {BURST}"] = await queued_burst(manager, websockets) / BURST
+    for websocket in websockets:
+        manager.disconnect(websocket)
+
+    baseline = results["send_json per socket"]
+    print(f"\n{subscribers} subscribers (avg of {ROUNDS} broadcasts):")
+    for label, seconds in results.items():
+        print(f"  {label:<26} {seconds * 1000:9.3f} ms  ({baseline / seconds:5.2f}x)")
+
+async def main():
+    for subscribers in SUBSCRIBER_COUNTS:
+        await run(subscribers)
+
+if __name__ == "__main__":
+    asyncio.run(main())
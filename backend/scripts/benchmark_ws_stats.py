@@ -0,0 +1,96 @@
+import asyncio
+import random
+import sys
+import time
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.websocket.encoding import encode_message
+from app.websocket.manager import ConnectionManager
+from app.websocket.stats import StatsEngine
+
+SUBSCRIBERS = 1000
+TICKS = 300
+STREAM_ID = "bench"
+
+class FakeWebSocket:
+    def __init__(self, counter: "Egress"):
+        self.counter = counter
+
+    async def send_text(self, data):
+        self.counter.record(data)
+
+    async def close(self):
+        pass
+
+class Egress:
+    def __init__(self):
+        self.messages = 0
+        self.bytes = 0
+
+    def record(self, data: str):
+        self.messages += 1
+        self.bytes += len(data.encode())
+
+def simulated_snapshots():
+    # One second per tick: viewers drift slowly, chat is busy, listeners move with the Icecast poll
+    rng = random.Random(7)
+    viewers, peak, chat, listeners = 480, 480, 0, 350
+    for second in range(TICKS):
+        if rng.random() < 0.2:
+            viewers = max(0, viewers + rng.randint(-3, 3))
+            peak = max(peak, viewers)
+        if rng.random() < 0.5:
+            chat += rng.randint(1, 4)
+        if second % 5 == 0:
+            listeners = max(0, listeners + rng.randint(-5, 5))
+        yield {
+            "current_viewers": viewers,
+            "peak_viewers": peak,
+            "duration": 3600 + second,
+            "chat_messages": chat,
+            "listeners": listeners,
+            "is_live": True
+        }
+
+async def drain(manager: ConnectionManager):
+    while any(connection.buffer for connection in manager.connections.values()):
+        await asyncio.sleep(0)
+
+async def run(label: str, message_for):
+    egress = Egress()
+    manager = ConnectionManager()
+    manager.max_connections_per_stream = SUBSCRIBERS
+    for _ in range(SUBSCRIBERS):
+        await manager.connect_stream(FakeWebSocket(egress), STREAM_ID)
+
+    start = time.perf_counter()
+    for second, snapshot in enumerate(simulated_snapshots()):
+        message = message_for(snapshot, float(second))
+        if message:
+            await manager.broadcast_to_stream(STREAM_ID, encode_message(message), local=True)
+        await drain(manager)
+    elapsed = time.perf_counter() - start
+
+    for websocket in list(manager.subscriptions):
+        manager.disconnect(websocket)
+    return label, egress, elapsed
+
+async def main():
+    engine = StatsEngine()
+    results = [
+        await run("full snapshot every tick", lambda snapshot, now: {"type": "stats", "stats": snapshot}),
+        await run("delta + change suppression", lambda snapshot, now: engine.diff(STREAM_ID, snapshot, now)),
+    ]
+
+    _, baseline, baseline_time = results[0]
+    print(f"{SUBSCRIBERS} subscribers, {TICKS} one-second ticks, resync every {engine.resync_interval:g}s:")
+    for label, egress, elapsed in results:
+        print(
+            f"  {label:<28} {egress.messages:>8} msgs  {egress.bytes / 1024:9.1f} KiB "
+            f"({baseline.bytes / egress.bytes:5.2f}x less)  {elapsed * 1000:8.1f} ms "
+            f"({baseline_time / elapsed:5.2f}x faster)"
+        )
+
+if __name__ == "__main__":
+    asyncio.run(main())
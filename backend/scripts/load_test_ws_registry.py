@@ -0,0 +1,109 @@
+import asyncio
+import sys
+import time
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.websocket.encoding import encode_message
+from app.websocket.manager import ConnectionManager
+
+SOCKET_COUNTS = [1000, 10000, 50000]
+STREAMS = 50
+USERS_PER_STREAM = 200
+STALE_RATIO = 0.01
+
+class FakeWebSocket:
+    async def send_text(self, data):
+        pass
+
+    async def close(self):
+        pass
+
+def legacy_cleanup(stream_subscriptions, stream_status_subscribers, notification_subscribers, stale):
+    # The pre-registry algorithm: every stale socket scans every stream and notification set
+    for ws in stale:
+        for stream_id, clients in list(stream_subscriptions.items()):
+            if ws in clients:
+                clients.discard(ws)
+                if not clients:
+                    del stream_subscriptions[stream_id]
+        stream_status_subscribers.discard(ws)
+        for user_id, clients in list(notification_subscribers.items()):
+            if ws in clients:
+                clients.discard(ws)
+                if not clients:
+                    del notification_subscribers[user_id]
+
+def legacy_heartbeat(manager, ping, stream_subscriptions, stream_status_subscribers, notification_subscribers):
+    # The pre-registry heartbeat: rebuild the union of every socket, then ping all of them at once
+    all_websockets = set()
+    for clients in stream_subscriptions.values():
+        all_websockets.update(clients)
+    all_websockets.update(stream_status_subscribers)
+    for clients in notification_subscribers.values():
+        all_websockets.update(clients)
+    manager._fan_out(all_websockets, ping, "heartbeat")
+    return all_websockets
+
+def snapshot(manager: ConnectionManager):
+    return (
+        {key: set(clients) for key, clients in manager.stream_subscriptions.items()},
+        set(manager.stream_status_subscribers),
+        {key: set(clients) for key, clients in manager.notification_subscribers.items()}
+    )
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+async def run(sockets: int):
+    manager = ConnectionManager()
+    manager.max_connections_per_stream = sockets
+    websockets = [FakeWebSocket() for _ in range(sockets)]
+    for index, websocket in enumerate(websockets):
+        await manager.connect_stream(websocket, f"stream-{index % STREAMS}")
+        manager.connect_stream_status(websocket)
+        manager.connect_notifications(websocket, f"user-{index % (STREAMS * USERS_PER_STREAM)}")
+
+    stale = websockets[::int(1 / STALE_RATIO)]
+    results = {}
+
+    ping = encode_message({"type": "ping"})
+    legacy_state = snapshot(manager)
+    results["legacy cleanup"], _ = timed(legacy_cleanup, *legacy_state, stale)
+    results["legacy heartbeat"], union = timed(legacy_heartbeat, manager, ping, *snapshot(manager))
+    # Let the writer tasks drain the legacy pings before measuring the registry
+    await asyncio.sleep(0.1)
+
+    # Force the stale sockets' deadlines into the past; everyone else stays active
+    for websocket in stale:
+        manager.last_activity[websocket] = float("-inf")
+        manager.expiry.schedule(websocket, 0)
+    start = time.perf_counter()
+    await manager.cleanup_stale_connections()
+    results["registry cleanup"] = time.perf_counter() - start
+    assert len(manager.subscriptions) == sockets - len(stale)
+
+    now = time.monotonic()
+    # Spread heartbeat deadlines across the interval, as connections arriving over time would
+    for index, websocket in enumerate(manager.subscriptions):
+        manager.heartbeats.schedule(websocket, now + (index % manager.heartbeat_interval))
+    manager.heartbeats._compact()
+    results["registry heartbeat tick"], pinged = timed(manager.send_heartbeats, ping)
+
+    print(f"\n{sockets} sockets, {len(stale)} stale, legacy heartbeat pings {len(union)} at once:")
+    for label, seconds in results.items():
+        print(f"  {label:<24} {seconds * 1000:10.3f} ms")
+    print(f"  registry pinged {pinged} sockets this tick")
+
+    for websocket in websockets:
+        manager.disconnect(websocket)
+    await asyncio.sleep(0)
+
+async def main():
+    for sockets in SOCKET_COUNTS:
+        await run(sockets)
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,161 @@
+import asyncio
+import re
+import uuid
+from datetime import date, datetime, timedelta
+import pytest
+from sqlalchemy import create_engine, event, select, func, text
+from sqlalchemy.orm import Session
+from app.models.audit import AuditLog
+from app.models.livestream import ChatMessage
+from app.models.stream import StreamViewer
+from app.models.user import User
+from app.services import auth_service, dashboard_service, livestream_service, settings_service
+
+LIVESTREAM_ID = uuid.UUID("6f1c2a4e-9d0b-4c55-8a7e-3b2f1d0e9c88")
+
+# Only the columns the stats endpoints read; UUID columns hold 32-digit hex as on any non-Postgres backend
+TABLES = [
+    "CREATE TABLE users (id TEXT PRIMARY KEY, role TEXT, membership_status TEXT, status TEXT, date_joined DATE)",
+    "CREATE TABLE sermons (id TEXT PRIMARY KEY, downloads INTEGER)",
+    "CREATE TABLE events (id TEXT PRIMARY KEY, date DATE)",
+    "CREATE TABLE announcements (id TEXT PRIMARY KEY, status TEXT)",
+    "CREATE TABLE attendance (id TEXT PRIMARY KEY, user_id TEXT, date DATE, present BOOLEAN)",
+    "CREATE TABLE audit_logs (id TEXT PRIMARY KEY, event TEXT, created_at TIMESTAMP)",
+    "CREATE TABLE livestreams (id TEXT PRIMARY KEY, title TEXT, description TEXT, is_live BOOLEAN, stream_url TEXT, "
+    "viewers INTEGER, start_time TIMESTAMP, end_time TIMESTAMP, created_at TIMESTAMP)",
+    "CREATE TABLE chat_messages (id TEXT PRIMARY KEY, livestream_id TEXT)",
+    "CREATE TABLE stream_viewers (id INTEGER PRIMARY KEY, livestream_id TEXT, status TEXT)"
+]
+
+class SessionAdapter:
+    """Runs the service's awaited session calls on a synchronous SQLite session."""
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    async def execute(self, statement, *args, **kwargs):
+        return self.session.execute(statement, *args, **kwargs)
+
+    async def scalar(self, statement, *args, **kwargs):
+        return self.session.scalar(statement, *args, **kwargs)
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://")
+    today = date.today()
+    now = datetime.utcnow()
+    stream = LIVESTREAM_ID.hex
+    with engine.begin() as conn:
+        for ddl in TABLES:
+            conn.execute(text(ddl))
+        conn.execute(text(
+            "INSERT INTO users VALUES ('u1', 'member', 'active', 'active', :old), ('u2', 'member', 'active', 'active', :today), "
+            "('u3', 'admin', 'active', 'inactive', :today)"
+        ), {"old": today - timedelta(days=30), "today": today})
+        conn.execute(text("INSERT INTO sermons VALUES ('s1', 4), ('s2', 6)"))
+        conn.execute(text("INSERT INTO events VALUES ('e1', :past), ('e2', :future)"), {"past": today - timedelta(days=1), "future": today + timedelta(days=3)})
+        conn.execute(text("INSERT INTO announcements VALUES ('a1', 'published'), ('a2', 'draft')"))
+        conn.execute(text("INSERT INTO attendance VALUES ('t1', 'u1', :today, 1), ('t2', 'u1', :today, 1), ('t3', 'u2', :today, 0)"), {"today": today})
+        conn.execute(text(
+            "INSERT INTO audit_logs VALUES ('g1', 'failed_login', :now), ('g2', 'suspicious_activity', :now), ('g3', 'failed_login', :old), ('g4', 'login', :now)"
+        ), {"now": now, "old": now - timedelta(days=3)})
+        conn.execute(text("INSERT INTO livestreams (id, title, is_live, viewers, created_at) VALUES (:id, 'Sunday', 1, 12, :now)"), {"id": stream, "now": now})
+        conn.execute(text("INSERT INTO chat_messages VALUES ('c1', :id), ('c2', :id), ('c3', 'other')"), {"id": stream})
+        conn.execute(text("INSERT INTO stream_viewers VALUES (1, :id, 'active'), (2, :id, 'kicked'), (3, :id, 'active')"), {"id": stream})
+    return engine
+
+def count_statements(engine, load):
+    """Run ``load(db)`` and return its result and the SQL statements it sent."""
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        with Session(engine) as session:
+            result = asyncio.run(load(SessionAdapter(session)))
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    return result, statements
+
+# The implementations these endpoints had before AggregateQuery, kept to pin the before/after counts
+
+async def legacy_user_stats(db):
+    total = await db.execute(select(func.count()).select_from(User))
+    active = await db.execute(select(func.count()).select_from(User).where(User.status == "active"))
+    return {"total": total.scalar(), "active": active.scalar()}
+
+async def legacy_security_counts(db):
+    active_sessions = (await db.execute(select(func.count()).select_from(User).where(User.status == 'active'))).scalar() or 0
+    security_alerts = (await db.execute(
+        select(func.count()).select_from(AuditLog)
+        .where(AuditLog.event.in_(['failed_login', 'suspicious_activity']))
+        .where(AuditLog.created_at >= datetime.utcnow() - timedelta(hours=24))
+    )).scalar() or 0
+    blocked_attempts = (await db.execute(
+        select(func.count()).select_from(AuditLog).where(AuditLog.event == 'failed_login')
+    )).scalar() or 0
+    return {"activeSessions": active_sessions, "securityAlerts": security_alerts, "blockedAttempts": blocked_attempts}
+
+async def legacy_stream_stats(db, livestream_id):
+    livestream = await livestream_service.get_livestream(db, livestream_id)
+    current_viewers = (await db.execute(
+        select(func.count()).select_from(StreamViewer)
+        .where(StreamViewer.livestream_id == livestream_id).where(StreamViewer.status == 'active')
+    )).scalar()
+    chat_messages = (await db.execute(
+        select(func.count()).select_from(ChatMessage).where(ChatMessage.livestream_id == livestream_id)
+    )).scalar()
+    return {"current_viewers": current_viewers, "peak_viewers": livestream.viewers, "chat_messages": chat_messages, "is_live": livestream.is_live}
+
+def test_dashboard_stats_run_in_one_statement(engine):
+    dashboard_service.dashboard_cache.invalidate()
+
+    async def load(db):
+        first = await dashboard_service.get_dashboard_stats(db)
+        # Served from the cache
+        await dashboard_service.get_dashboard_stats(db)
+        return first
+
+    try:
+        stats, statements = count_statements(engine, load)
+    finally:
+        dashboard_service.dashboard_cache.invalidate()
+
+    # The original dashboard issued eight queries; now it is one statement scanning each table once
+    assert len(statements) == 1
+    for table in ("users", "sermons", "events", "announcements", "attendance"):
+        assert len(re.findall(rf"\bFROM {table}\b", statements[0])) == 1
+    assert stats == {
+        "totalMembers": 2,
+        "newMembersThisWeek": 1,
+        "weeklyAttendance": 1,
+        "sermonDownloads": 10,
+        "liveViewers": 12,
+        "isLive": True,
+        "totalSermons": 2,
+        "upcomingEvents": 1,
+        "activeAnnouncements": 1
+    }
+
+def test_user_stats_run_in_one_statement(engine):
+    before, before_statements = count_statements(engine, legacy_user_stats)
+    after, after_statements = count_statements(engine, auth_service.get_user_stats)
+
+    assert len(before_statements) == 2
+    assert len(after_statements) == 1
+    assert after == before == {"total": 3, "active": 2}
+
+def test_security_stats_run_in_one_statement(engine):
+    before, before_statements = count_statements(engine, legacy_security_counts)
+    after, after_statements = count_statements(engine, settings_service.get_security_stats)
+
+    assert len(before_statements) == 3
+    assert len(after_statements) == 1
+    assert {key: after[key] for key in before} == before == {"activeSessions": 2, "securityAlerts": 2, "blockedAttempts": 2}
+
+def test_stream_stats_run_in_one_statement(engine):
+    before, before_statements = count_statements(engine, lambda db: legacy_stream_stats(db, LIVESTREAM_ID))
+    after, after_statements = count_statements(engine, lambda db: livestream_service.get_stream_stats(db, LIVESTREAM_ID))
+
+    assert len(before_statements) == 3
+    assert len(after_statements) == 1
+    assert after == before == {"current_viewers": 2, "peak_viewers": 12, "chat_messages": 2, "is_live": True}
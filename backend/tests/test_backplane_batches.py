@@ -0,0 +1,51 @@
+import asyncio
+import json
+import uuid
+from app.websocket import handlers
+from app.websocket.backplane import Backplane, MAX_NOTIFY_PAYLOAD, unpack_envelope
+from app.websocket.manager import ConnectionManager
+from app.websocket.presence import PresenceRegistry, StreamPresence, Viewer
+
+class RecordingBackplane(Backplane):
+    def __init__(self):
+        self.envelopes = []
+
+    async def start(self, handler):
+        pass
+
+    async def publish(self, envelope: str):
+        self.envelopes.append(envelope)
+
+def largest(envelopes) -> int:
+    return max(len(envelope.encode()) for envelope in envelopes)
+
+def test_bulk_kick_is_split_under_notify_limit(monkeypatch):
+    backplane = RecordingBackplane()
+    monkeypatch.setattr(handlers, "manager", ConnectionManager(backplane))
+    user_ids = [str(uuid.uuid4()) for _ in range(500)]
+
+    asyncio.run(handlers.broadcast_viewers_kicked(user_ids))
+
+    assert len(backplane.envelopes) > 1
+    assert largest(backplane.envelopes) <= MAX_NOTIFY_PAYLOAD
+    sent = [user_id for envelope in backplane.envelopes for user_id in json.loads(unpack_envelope(envelope)[4])["userIds"]]
+    assert sent == user_ids
+
+def test_bulk_leave_is_split_under_notify_limit(monkeypatch):
+    backplane = RecordingBackplane()
+    monkeypatch.setattr("app.websocket.presence.manager", ConnectionManager(backplane))
+    presence = PresenceRegistry()
+    stream_id = str(uuid.uuid4())
+    stream = StreamPresence(stream_id)
+    # Worst case: bigint viewer ids
+    viewer_ids = [2 ** 63 - 1 - n for n in range(1000)]
+    for viewer_id in viewer_ids:
+        presence._apply_put(stream, Viewer(viewer_id, stream_id, "Viewer", str(uuid.uuid4())))
+    presence.streams[stream_id] = stream
+
+    removed = asyncio.run(presence.leave_many(None, viewer_ids))
+
+    assert len(removed) == len(viewer_ids)
+    assert largest(backplane.envelopes) <= MAX_NOTIFY_PAYLOAD
+    sent = [viewer_id for envelope in backplane.envelopes for viewer_id in json.loads(unpack_envelope(envelope)[4])["ids"]]
+    assert sent == viewer_ids
@@ -0,0 +1,94 @@
+import asyncio
+import uuid
+import pytest
+from sqlalchemy.exc import DataError, IntegrityError, OperationalError
+from app.websocket import chat_buffer as chat_buffer_module
+from app.websocket.chat_buffer import ChatWriteBuffer, USER_NAME_LENGTH
+
+STREAM_ID = str(uuid.uuid4())
+
+class FakeSession:
+    """Accepts inserts unless a row's text names the error to raise."""
+
+    errors = {"bad-data": DataError, "bad-fk": IntegrityError, "db-down": OperationalError}
+
+    def __init__(self, written):
+        self.written = written
+        self.staged = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        pass
+
+    async def execute(self, statement):
+        rows = statement.compile().params
+        texts = [value for key, value in rows.items() if key.startswith("text")]
+        for text in texts:
+            if text in self.errors:
+                raise self.errors[text]("INSERT", {}, Exception(text))
+        self.staged.extend(texts)
+
+    async def commit(self):
+        self.written.extend(self.staged)
+        self.staged = []
+
+    async def rollback(self):
+        self.staged = []
+
+@pytest.fixture
+def written(monkeypatch):
+    written = []
+    monkeypatch.setattr(chat_buffer_module, "AsyncSessionLocal", lambda: FakeSession(written))
+    return written
+
+def test_rows_the_database_rejects_are_dropped(written):
+    buffer = ChatWriteBuffer()
+
+    async def run():
+        for text in ("one", "bad-data", "two", "bad-fk", "three"):
+            await buffer.add(STREAM_ID, "Grace", text)
+        await buffer.flush()
+
+    asyncio.run(run())
+
+    assert written == ["one", "two", "three"]
+    assert buffer.pending == []
+
+def test_unwritten_rows_are_kept_when_the_database_is_down(written):
+    buffer = ChatWriteBuffer()
+
+    async def run():
+        for text in ("one", "db-down", "two"):
+            await buffer.add(STREAM_ID, "Grace", text)
+        with pytest.raises(OperationalError):
+            await buffer.flush()
+
+    asyncio.run(run())
+
+    assert written == ["one"]
+    assert [row["text"] for row in buffer.pending] == ["db-down", "two"]
+
+@pytest.mark.parametrize("stream_id, user_name, text", [
+    ("not-a-uuid", "Grace", "hello"),
+    (STREAM_ID, None, "hello"),
+    (STREAM_ID, "Grace", {"text": "hello"}),
+    (STREAM_ID, "Grace", "  ")
+])
+def test_unwritable_messages_are_rejected(stream_id, user_name, text):
+    buffer = ChatWriteBuffer()
+
+    with pytest.raises(ValueError):
+        asyncio.run(buffer.add(stream_id, user_name, text))
+
+    assert buffer.pending == []
+
+def test_fields_are_made_to_fit_their_columns():
+    buffer = ChatWriteBuffer()
+
+    row = asyncio.run(buffer.add(STREAM_ID, "G" * 300 + "\x00", "hi\x00", user_id="nobody"))
+
+    assert row["user_name"] == "G" * USER_NAME_LENGTH
+    assert row["text"] == "hi"
+    assert row["user_id"] is None
@@ -0,0 +1,130 @@
+import asyncio
+import json
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from app.services.icecast_service import IcecastService
+
+STATUS_JSON = {
+    "icestats": {
+        "source": [
+            {"listenurl": "http://localhost:8001/backup", "listeners": 3},
+            {"listenurl": "http://localhost:8001/live", "listeners": 7}
+        ]
+    }
+}
+STATS_XML = '<icestats><source mount="/backup"></source><source mount="/live"><listeners>7</listeners></source></icestats>'
+
+class FakeIcecastHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        server = self.server
+        server.requests.append(self.path)
+        if server.delay:
+            time.sleep(server.delay)
+        if self.path == "/status-json.xsl":
+            body, content_type = json.dumps(server.status_json).encode(), "application/json"
+        elif self.path == "/admin/stats.xml":
+            body, content_type = server.stats_xml.encode(), "text/xml"
+        else:
+            body, content_type = b"", "text/plain"
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+@pytest.fixture
+def fake_icecast():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeIcecastHandler)
+    server.daemon_threads = True
+    server.requests = []
+    server.delay = 0
+    server.status_json = STATUS_JSON
+    server.stats_xml = STATS_XML
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+def make_service(port: int) -> IcecastService:
+    service = IcecastService()
+    service.icecast_host = "127.0.0.1"
+    service.icecast_port = str(port)
+    return service
+
+def run(service: IcecastService, coro):
+    async def main():
+        try:
+            return await coro
+        finally:
+            await service.close()
+    return asyncio.run(main())
+
+def test_parses_listeners_and_source_from_multiple_sources(fake_icecast):
+    service = make_service(fake_icecast.server_port)
+
+    status = run(service, service.get_status())
+
+    assert status.reachable
+    assert status.listeners == 7
+    assert status.source_connected
+
+def test_single_source_and_missing_mount(fake_icecast):
+    fake_icecast.status_json = {"icestats": {"source": {"listenurl": "http://localhost:8001/backup", "listeners": 4}}}
+    fake_icecast.stats_xml = '<icestats><source mount="/backup"></source></icestats>'
+    service = make_service(fake_icecast.server_port)
+
+    status = run(service, service.get_status())
+
+    assert status.reachable
+    assert status.listeners == 0
+    assert not status.source_connected
+
+def test_status_is_cached_for_ttl(fake_icecast):
+    service = make_service(fake_icecast.server_port)
+    service.status_ttl = 60
+
+    async def checks():
+        await asyncio.gather(*(service.get_listener_count() for _ in range(5)))
+        await service.is_source_connected()
+        await service.check_connection()
+        cached = len(fake_icecast.requests)
+        await service.get_status(max_age=0)
+        return cached
+
+    cached = run(service, checks())
+
+    # One refresh (both status endpoints) served every concurrent and later caller
+    assert cached == 2
+    assert len(fake_icecast.requests) == 4
+
+def test_timeout_reports_unreachable(fake_icecast):
+    fake_icecast.delay = 1
+    service = make_service(fake_icecast.server_port)
+    service.timeout = 0.2
+
+    started = time.monotonic()
+    status = run(service, service.get_status())
+
+    assert time.monotonic() - started < 1
+    assert not status.reachable
+    assert status.listeners == 0
+    assert not status.source_connected
+
+def test_down_server_reports_unreachable():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    service = make_service(port)
+
+    status = run(service, service.get_status())
+
+    assert not status.reachable
+    assert status.listeners == 0
+    assert not status.source_connected
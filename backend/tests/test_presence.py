@@ -0,0 +1,102 @@
+import asyncio
+import uuid
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import DataError
+from app.websocket import presence as presence_module
+from app.websocket.presence import NAME_LENGTH, PresenceRegistry, StreamPresence, Viewer
+
+STREAM_ID = str(uuid.uuid4())
+OTHER_STREAM_ID = str(uuid.uuid4())
+
+class FakeSession:
+    """Commits statements unless one carries the value "bad-row"."""
+
+    def __init__(self, committed):
+        self.committed = committed
+        self.staged = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        pass
+
+    async def execute(self, statement):
+        params = statement.compile(dialect=postgresql.dialect()).params
+        if "bad-row" in params.values():
+            raise DataError("INSERT", {}, Exception("bad-row"))
+        self.staged.append(params)
+
+    async def scalar(self, statement):
+        # Only the livestream lookup in ensure_loaded; no such livestream
+        return None
+
+    async def commit(self):
+        self.committed.extend(self.staged)
+        self.staged = []
+
+    async def rollback(self):
+        self.staged = []
+
+def registry_with(*viewers) -> PresenceRegistry:
+    registry = PresenceRegistry()
+    for viewer in viewers:
+        stream = registry.streams.setdefault(viewer.livestream_id, StreamPresence(viewer.livestream_id))
+        registry._apply_put(stream, viewer)
+    return registry
+
+def written_names(committed):
+    return sorted(value for params in committed for key, value in params.items() if key.startswith("name"))
+
+def test_bad_viewer_row_is_dropped_and_other_streams_are_written(monkeypatch):
+    committed = []
+    monkeypatch.setattr(presence_module, "AsyncSessionLocal", lambda: FakeSession(committed))
+    registry = registry_with(
+        Viewer(1, STREAM_ID, "Grace"), Viewer(2, STREAM_ID, "bad-row"), Viewer(3, OTHER_STREAM_ID, "Ruth")
+    )
+
+    asyncio.run(registry.flush())
+
+    assert written_names(committed) == ["Grace", "Ruth"]
+    # The dropped row is not retried forever
+    assert all(not stream.dirty for stream in registry.streams.values())
+
+@pytest.mark.parametrize("data", [
+    {},
+    {"name": {"first": "Grace"}},
+    {"name": "Grace", "status": "banned"},
+    {"name": "Grace", "user_id": "not-a-uuid"},
+    {"name": "Grace", "location": 7}
+])
+def test_join_rejects_invalid_viewers(data):
+    registry = registry_with(Viewer(1, STREAM_ID, "Grace"))
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(registry.join(None, STREAM_ID, data))
+
+    assert error.value.status_code == 400
+    assert list(registry.streams[STREAM_ID].viewers) == [1]
+
+def test_join_truncates_the_name():
+    registry = registry_with(Viewer(1, STREAM_ID, "Grace"))
+    registry.reserved_ids = [2]
+
+    async def join():
+        registry._publish = lambda *args: asyncio.sleep(0)
+        return await registry.join(None, STREAM_ID, {"name": "G" * 300})
+
+    viewer = asyncio.run(join())
+
+    assert viewer["name"] == "G" * NAME_LENGTH
+
+@pytest.mark.parametrize("stream_id", ["not-a-uuid", OTHER_STREAM_ID])
+def test_join_rejects_unknown_livestreams(stream_id):
+    registry = PresenceRegistry()
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(registry.join(FakeSession([]), stream_id, {"name": "Grace"}))
+
+    assert error.value.status_code == 404
+    assert registry.streams == {} and registry.load_locks == {}
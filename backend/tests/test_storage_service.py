@@ -0,0 +1,35 @@
+import asyncio
+import io
+import pytest
+from fastapi import HTTPException, UploadFile
+from starlette.datastructures import Headers
+from app.middleware.file_validation import IMAGE_RULE
+from app.services import storage_service
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 32
+
+def upload(data: bytes, filename: str, content_type: str) -> UploadFile:
+    return UploadFile(io.BytesIO(data), size=len(data), filename=filename, headers=Headers({"content-type": content_type}))
+
+@pytest.fixture
+def upload_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage_service, "UPLOAD_DIR", tmp_path)
+    return tmp_path
+
+def test_image_is_stored_with_its_sniffed_extension(upload_dir):
+    url = asyncio.run(storage_service.save_file(upload(PNG, "photo.html", "image/png"), "profiles", IMAGE_RULE))
+
+    assert url.endswith(".png")
+    [stored] = (upload_dir / "profiles").iterdir()
+    assert stored.read_bytes() == PNG
+
+@pytest.mark.parametrize("data, content_type", [
+    (b"<html><script>alert(1)</script></html>", "image/png"),
+    (PNG, "text/html"),
+    (b"", "image/png")
+])
+def test_image_rule_rejects_spoofed_uploads(upload_dir, data, content_type):
+    with pytest.raises(HTTPException):
+        asyncio.run(storage_service.save_file(upload(data, "photo.png", content_type), "profiles", IMAGE_RULE))
+
+    assert [path for path in upload_dir.rglob("*") if path.is_file()] == []
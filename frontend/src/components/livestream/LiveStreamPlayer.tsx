@@ -19,6 +19,7 @@ export default function LiveStreamPlayer({ isLive, title, description, streamId
   const [hasJoined, setHasJoined] = useState(false);
   const audioRef = useRef<HTMLAudioElement>(null);
   const reconnectTimeoutRef = useRef<number | null>(null);
+  const wsRef = useRef<WebSocket | null>(null);
 
   useEffect(() => {
     if (isLive && streamId && audioRef.current) {
@@ -73,6 +74,7 @@ export default function LiveStreamPlayer({ isLive, title, description, streamId
     
     const wsUrl = import.meta.env.VITE_WS_URL || 'ws://localhost:8000';
     const ws = new WebSocket(wsUrl);
+    wsRef.current = ws;
     
     ws.onopen = () => {
       ws.send(JSON.stringify({ type: 'subscribe-stream-status' }));
@@ -81,7 +83,7 @@ export default function LiveStreamPlayer({ isLive, title, description, streamId
     ws.onmessage = (event) => {
       try {
         const data = JSON.parse(event.data);
-        if (data.type === 'viewer-kicked' && data.userId === user?.id) {
+        if (data.type === 'viewer-kicked' && user && (data.userId === user.id || data.userIds?.includes(user.id))) {
           setIsPlaying(false);
           setHasJoined(false);
           delete (window as any).currentViewerId;
@@ -92,7 +94,10 @@ export default function LiveStreamPlayer({ isLive, title, description, streamId
       }
     };
     
-    return () => ws.close();
+    return () => {
+      wsRef.current = null;
+      ws.close();
+    };
   }, [streamId, isLive, user]);
 
   const handlePlay = async () => {
@@ -108,6 +113,10 @@ export default function LiveStreamPlayer({ isLive, title, description, streamId
         setHasJoined(true);
         if (result?.id) {
           (window as any).currentViewerId = result.id;
+          // Tie the viewer to this socket so closing the tab ends the session
+          if (wsRef.current?.readyState === WebSocket.OPEN) {
+            wsRef.current.send(JSON.stringify({ type: 'watch', streamId, viewerId: result.id, viewerToken: result.viewer_token }));
+          }
         }
       } catch (error) {
         console.error('Error adding viewer:', error);
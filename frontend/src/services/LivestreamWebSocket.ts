@@ -7,6 +7,9 @@ class LivestreamWebSocket {
   private streamId: string | null = null;
   private onStatsUpdate: ((stats: any) => void) | null = null;
   private isIntentionallyClosed = false;
+  private stats: any = null;
+  private statsReceivedAt = 0;
+  private durationInterval: number | null = null;
 
   connect(streamId: string, onStatsUpdate: (stats: any) => void) {
     this.streamId = streamId;
@@ -32,8 +35,15 @@ class LivestreamWebSocket {
     this.ws.onmessage = (event) => {
       try {
         const data = JSON.parse(event.data);
-        if (data.type === 'stats' && this.onStatsUpdate) {
-          this.onStatsUpdate(data.stats);
+        if (data.type === 'stats') {
+          // Full snapshot: sent on subscribe and periodically to resync
+          this.stats = data.stats;
+          this.statsReceivedAt = Date.now();
+          this.emitStats();
+        } else if (data.type === 'stats-delta' && this.stats) {
+          // Only the fields that changed; duration is advanced locally
+          this.stats = { ...this.stats, ...data.stats };
+          this.emitStats();
         }
       } catch (error) {
         console.error('Error parsing WebSocket message:', error);
@@ -47,12 +57,36 @@ class LivestreamWebSocket {
     this.ws.onclose = () => {
       console.log('WebSocket closed');
       this.stopHeartbeat();
+      this.stopDurationTimer();
+      this.stats = null;
       if (!this.isIntentionallyClosed) {
         this.attemptReconnect();
       }
     };
   }
 
+  private currentStats() {
+    const elapsed = Math.floor((Date.now() - this.statsReceivedAt) / 1000);
+    return { ...this.stats, duration: this.stats.is_live ? this.stats.duration + elapsed : this.stats.duration };
+  }
+
+  private emitStats() {
+    if (!this.stats || !this.onStatsUpdate) return;
+    this.onStatsUpdate(this.currentStats());
+    if (this.stats.is_live && !this.durationInterval) {
+      this.durationInterval = window.setInterval(() => this.emitStats(), 1000);
+    } else if (!this.stats.is_live) {
+      this.stopDurationTimer();
+    }
+  }
+
+  private stopDurationTimer() {
+    if (this.durationInterval) {
+      clearInterval(this.durationInterval);
+      this.durationInterval = null;
+    }
+  }
+
   private attemptReconnect() {
     if (this.reconnectAttempts >= this.maxReconnectAttempts) {
       console.error('Max reconnection attempts reached');
@@ -93,6 +127,8 @@ class LivestreamWebSocket {
   disconnect() {
     this.isIntentionallyClosed = true;
     this.stopHeartbeat();
+    this.stopDurationTimer();
+    this.stats = null;
     if (this.reconnectTimeout) {
       clearTimeout(this.reconnectTimeout);
       this.reconnectTimeout = null;